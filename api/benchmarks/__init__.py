@@ -0,0 +1,13 @@
+"""Benchmark suite for the tile, recompute and import paths.
+
+Everything runs against the bench stack in docker-compose.bench.yml (PostGIS and
+MinIO on their own ports, so the dev stack can stay up) and a synthetic map built
+by benchmarks.fixtures. Each benchmark writes a JSON result file to
+benchmarks/results/; benchmarks.compare diffs two of them and exits non-zero on
+regressions.
+
+Usage:
+    cd api && make bench-up
+    poetry run dotenv -f .env.bench run python -m benchmarks.tiles --zips 10000 --layers 4
+    poetry run dotenv -f .env.bench run python -m benchmarks.compare before.json after.json
+"""
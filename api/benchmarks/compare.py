@@ -0,0 +1,82 @@
+"""Compare two benchmark result files and flag regressions.
+
+Walks both result trees and compares, at matching paths, every p50_ms / p95_ms /
+wall_ms latency and peak_rss_kb (higher is worse) and requests_per_s throughput
+(lower is worse). A change is a regression when it is worse by more than
+--threshold percent and, for latencies, by more than --min-delta-ms, so
+sub-millisecond noise on fast paths does not fail the run. Exits 1 when
+anything regressed.
+
+Usage:
+    cd api && poetry run python -m benchmarks.compare before.json after.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+_LATENCY_KEYS = ("p50_ms", "p95_ms", "wall_ms")
+_MEMORY_KEYS = ("peak_rss_kb",)
+_THROUGHPUT_KEYS = ("requests_per_s",)
+
+
+def _walk(node: Any, path: tuple[str, ...] = ()) -> Iterator[tuple[tuple[str, ...], float]]:
+    if isinstance(node, dict):
+        for key, value in node.items():  # type: ignore[reportUnknownVariableType]
+            yield from _walk(value, (*path, str(key)))  # type: ignore[reportUnknownArgumentType]
+    elif (
+        isinstance(node, (int, float))
+        and not isinstance(node, bool)
+        and path[-1] in _LATENCY_KEYS + _MEMORY_KEYS + _THROUGHPUT_KEYS
+    ):
+        yield path, float(node)
+
+
+def compare(before: dict[str, Any], after: dict[str, Any], threshold: float, min_delta_ms: float) -> list[str]:
+    """Return one line per regressed metric."""
+    old = dict(_walk(before["results"]))
+    regressions: list[str] = []
+    for path, new_value in _walk(after["results"]):
+        old_value = old.get(path)
+        if old_value is None or old_value == 0:
+            continue
+        change = (new_value - old_value) / old_value * 100
+        if path[-1] in _LATENCY_KEYS:
+            regressed = change > threshold and new_value - old_value > min_delta_ms
+        elif path[-1] in _MEMORY_KEYS:
+            regressed = change > threshold
+        else:
+            regressed = -change > threshold
+        if regressed:
+            regressions.append(f"{'.'.join(path)}: {old_value:g} -> {new_value:g} ({change:+.1f}%)")
+    return regressions
+
+
+def main() -> None:
+    """Compare two result files given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent.")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore latency changes smaller than this.")
+    args = parser.parse_args()
+
+    before = json.loads(args.before.read_text())
+    after = json.loads(args.after.read_text())
+    if before["benchmark"] != after["benchmark"]:
+        sys.exit(f"cannot compare a {before['benchmark']!r} run with a {after['benchmark']!r} run")
+    if before["params"] != after["params"]:
+        print("warning: runs used different parameters, the diff may not mean much")
+
+    regressions = compare(before, after, args.threshold, args.min_delta_ms)
+    for line in regressions:
+        print(line)
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:g}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Recompute and aggregation benchmark for ComputationService.
+
+Builds a synthetic national map, then times each scenario ``--repeat`` times:
+  reassign_<n>         — move n contiguous zips to another territory, then
+                         recompute_from and compute_data_from on the old and new
+                         parents, as recompute_nodes_task does (1, 100, 5k zips)
+  recompute_all_layers — full geometry rebuild, as at import
+  data_for_map_<f>     — compute_data_for_map with f configured fields (1/10/30),
+                         on one connection and split across four
+  layer_data_stats     — compute_layer_data_stats for every layer
+
+Every scenario runs in a transaction that is rolled back, so repeats see the
+same map. Alongside wall time, each scenario reports every statement it issued
+with call count, total time and rows touched (cursor rowcount).
+
+Usage:
+    cd api && poetry run dotenv -f .env.bench run python -m benchmarks.computation --zips 10000 --layers 4
+"""
+
+import argparse
+import random
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, select, update
+from sqlalchemy.orm import Session
+
+from benchmarks.fixtures import SyntheticMap, build_map, field_config, reset_database, seed_geography
+from benchmarks.harness import QueryRecorder, prepare_database, stopwatch, summarize, write_results
+from src.app.database import engine as app_engine
+from src.models import LayerModel, MapModel, ZipAssignmentModel
+from src.services.computation import ComputationService
+
+_REASSIGN_SIZES = (1, 100, 5_000)
+_FIELD_COUNTS = (1, 10, 30)
+
+
+def _run_scenario(
+    engine: Engine, repeat: int, body: Callable[[Session, ComputationService, int], dict[str, float]]
+) -> dict[str, Any]:
+    """Run ``body`` ``repeat`` times, each in a rolled-back session, and report timings and statements.
+
+    ``body`` returns the wall times (ms) of the phases it measured, keyed by phase name.
+    """
+    recorder = QueryRecorder(engine)
+    phases: dict[str, list[float]] = {}
+    for i in range(repeat):
+        with Session(engine) as db:
+            try:
+                with recorder.attach():
+                    for phase, ms in body(db, ComputationService(db=db), i).items():
+                        phases.setdefault(phase, []).append(ms)
+            finally:
+                db.rollback()
+    return {"phases": {phase: summarize(samples) for phase, samples in phases.items()}, "queries": recorder.report()}
+
+
+def _reassign(synthetic: SyntheticMap, parents: dict[str, int], n: int, seed: int) -> Callable[..., dict[str, float]]:
+    zip_layer_id = synthetic.layer_ids[0]
+    zips = synthetic.grid.zips
+
+    def body(db: Session, computation: ComputationService, i: int) -> dict[str, float]:
+        rng = random.Random(seed * 1_000 + i)  # noqa: S311
+        start = rng.randrange(zips - n + 1)
+        moved = [synthetic.grid.zip_code(j) for j in range(start, start + n)]
+        old_parents = {parents[z] for z in moved if z in parents}
+        candidates = sorted(set(parents.values()) - old_parents)
+        if not candidates:
+            raise RuntimeError(f"every territory owns one of the {n} moved zips; generate more zips")
+        target = rng.choice(candidates)
+
+        db.execute(
+            update(ZipAssignmentModel)
+            .where(ZipAssignmentModel.layer_id == zip_layer_id, ZipAssignmentModel.zip_code.in_(moved))
+            .values(parent_node_id=target)
+        )
+        db.flush()
+        affected = old_parents | {target}
+        with stopwatch() as geometry:
+            computation.recompute_from(affected)
+        with stopwatch() as data:
+            computation.compute_data_from(affected, synthetic.map_id)
+        return {"recompute_from": geometry[0], "compute_data_from": data[0]}
+
+    return body
+
+
+def _recompute_all(synthetic: SyntheticMap) -> Callable[..., dict[str, float]]:
+    def body(db: Session, computation: ComputationService, i: int) -> dict[str, float]:
+        with stopwatch() as elapsed:
+            computation.recompute_all_layers(synthetic.map_id)
+        return {"recompute_all_layers": elapsed[0]}
+
+    return body
+
+
+def _data_for_map(synthetic: SyntheticMap, fields: int) -> Callable[..., dict[str, float]]:
+    def body(db: Session, computation: ComputationService, i: int) -> dict[str, float]:
+        map_model = db.get(MapModel, synthetic.map_id)
+        if map_model is None:
+            raise RuntimeError(f"map {synthetic.map_id} vanished mid-benchmark")
+        map_model.data_field_config = field_config(fields)
+        db.flush()
+        with stopwatch() as single:
+            computation.compute_data_for_map(synthetic.map_id)
+        with stopwatch() as split:
+            computation.compute_data_for_map(synthetic.map_id, max_connections=4)
+        return {"max_connections_1": single[0], "max_connections_4": split[0]}
+
+    return body
+
+
+def _layer_data_stats(synthetic: SyntheticMap) -> Callable[..., dict[str, float]]:
+    def body(db: Session, computation: ComputationService, i: int) -> dict[str, float]:
+        map_model = db.get(MapModel, synthetic.map_id)
+        fields = (map_model.data_field_config if map_model else None) or []
+        timings: dict[str, float] = {}
+        for layer in db.execute(select(LayerModel).where(LayerModel.map_id == synthetic.map_id)).scalars():
+            with stopwatch() as elapsed:
+                computation.compute_layer_data_stats(layer.id, layer.order, fields)
+            timings[f"order_{layer.order}"] = elapsed[0]
+        return timings
+
+    return body
+
+
+def main() -> None:
+    """Run the computation benchmark and write its result file."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zips", type=int, default=10_000, help="Zip geographies to generate.")
+    parser.add_argument("--layers", type=int, default=4, help="Layers including the zip layer (3-5).")
+    parser.add_argument("--vertices", type=int, default=8, help="Vertices per zip edge.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per scenario.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--i-know", action="store_true", help="Allow wiping a database other than the bench one.")
+    args = parser.parse_args()
+
+    prepare_database(app_engine)
+    reset_database(app_engine, force=args.i_know)
+    with stopwatch() as setup:
+        grid = seed_geography(app_engine, args.zips, vertices_per_edge=args.vertices, seed=args.seed)
+        # Zips carry every field the widest data scenario configures.
+        synthetic = build_map(app_engine, grid, layers=args.layers, fields=max(_FIELD_COUNTS), seed=args.seed)
+
+    with Session(app_engine) as db:
+        parents = {
+            zip_code: parent_id
+            for zip_code, parent_id in db.execute(
+                select(ZipAssignmentModel.zip_code, ZipAssignmentModel.parent_node_id).where(
+                    ZipAssignmentModel.layer_id == synthetic.layer_ids[0],
+                    ZipAssignmentModel.parent_node_id.isnot(None),
+                )
+            ).tuples()
+            if parent_id is not None
+        }
+
+    scenarios: dict[str, Callable[..., dict[str, float]]] = {
+        f"reassign_{n}": _reassign(synthetic, parents, n, args.seed) for n in _REASSIGN_SIZES if n <= args.zips
+    }
+    scenarios["recompute_all_layers"] = _recompute_all(synthetic)
+    scenarios.update({f"data_for_map_{f}": _data_for_map(synthetic, f) for f in _FIELD_COUNTS})
+    scenarios["layer_data_stats"] = _layer_data_stats(synthetic)
+
+    results: dict[str, Any] = {"setup_ms": round(setup[0])}
+    for name, body in scenarios.items():
+        print(f"running {name}")
+        results[name] = _run_scenario(app_engine, args.repeat, body)
+
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    path = write_results("computation", params, results, args.output)
+    print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Synthetic national map fixture.
+
+Zip geographies are a grid of cells over the continental US. Cell edges are
+subdivided and wobbled deterministically from their grid position, so
+neighbouring zips share identical borders (unions stay clean) while carrying a
+realistic vertex count for the snap tiers to chew on. Territories are square
+blocks of zips; every layer above groups a square block of the one below, so
+each layer is spatially contiguous like a real sales hierarchy.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Engine, insert, text
+from sqlalchemy.orm import Session
+
+from src.models import Base, LayerModel, MapModel, NodeModel, ZipAssignmentModel
+from src.models.geometry import GEOMETRY_TIERS
+from src.services.computation import ComputationService
+
+# Continental US, (lon_min, lat_min, lon_max, lat_max), WGS84.
+_CONUS = (-124.0, 25.0, -67.0, 49.0)
+
+# Zips per side of an order-1 block, and order-k blocks per side of an order-k+1 block.
+# 25 zips per territory and 9 children per parent above that.
+_BLOCK = 5
+_FANOUT = 3
+
+_ZIP_PALETTE = ("#E05252", "#52A3E0", "#5EC45E", "#E0C452", "#A352E0", "#E08A52")
+_NODE_PALETTE = ("#E41A1C", "#377EB8", "#4DAF4A", "#984EA3", "#FF7F00", "#A65628")
+
+_LAYER_NAMES = ("Zip", "Territory", "Area", "Region", "Division", "Country")
+
+_INSERT_CHUNK = 5_000
+
+BENCH_DATABASE = "bench"
+"""DB_NAME in .env.bench; the only database reset_database truncates unprompted."""
+
+
+@dataclass(frozen=True)
+class SyntheticGrid:
+    """Where the generated zips sit. Zip ``i`` is cell ``(i % cols, i // cols)``."""
+
+    zips: int
+    cols: int
+    rows: int
+
+    @property
+    def cell_deg(self) -> tuple[float, float]:
+        """Cell width and height in degrees."""
+        return (_CONUS[2] - _CONUS[0]) / self.cols, (_CONUS[3] - _CONUS[1]) / self.rows
+
+    def zip_code(self, i: int) -> str:
+        """Zip code of cell ``i``."""
+        return f"{i:05d}"
+
+    def cell(self, i: int) -> tuple[int, int]:
+        """(col, row) of zip ``i``; row 0 is the southern edge."""
+        return i % self.cols, i // self.cols
+
+    def center(self, i: int) -> tuple[float, float]:
+        """(lon, lat) of the centre of zip ``i``."""
+        col, row = self.cell(i)
+        dx, dy = self.cell_deg
+        return _CONUS[0] + (col + 0.5) * dx, _CONUS[1] + (row + 0.5) * dy
+
+    def block(self, i: int, order: int) -> tuple[int, int]:
+        """Block holding zip ``i`` at layer ``order`` (>= 1); one node per block."""
+        col, row = self.cell(i)
+        side = _BLOCK * _FANOUT ** (order - 1)
+        return col // side, row // side
+
+
+@dataclass(frozen=True)
+class SyntheticMap:
+    """A generated map. ``layer_ids`` is indexed by layer order; order 0 is the zip layer."""
+
+    map_id: str
+    layer_ids: tuple[int, ...]
+    node_ids_by_order: dict[int, tuple[int, ...]]
+    field_names: tuple[str, ...]
+    grid: SyntheticGrid
+
+
+def layer_name(order: int) -> str:
+    """Name of the generated layer at ``order``."""
+    return _LAYER_NAMES[order]
+
+
+def node_name(order: int, block: tuple[int, int]) -> str:
+    """Name of the generated node for a block at ``order``."""
+    return f"{_LAYER_NAMES[order]} {block[0]}-{block[1]}"
+
+
+def reset_database(engine: Engine, keep: tuple[str, ...] = (), *, force: bool = False) -> None:
+    """Truncate every model table except ``keep`` so a run starts from nothing.
+
+    Refuses unless the engine points at the bench database (DB_NAME in
+    .env.bench) or ``force`` is set, so a run under the wrong env file cannot
+    wipe a development database.
+    """
+    if engine.url.database != BENCH_DATABASE and not force:
+        raise SystemExit(
+            f"Refusing to truncate database {engine.url.database!r}: benchmarks run against "
+            f"{BENCH_DATABASE!r} (dotenv -f .env.bench). Pass --i-know to wipe it anyway."
+        )
+    tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables if table.name not in keep)
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+def _noise(seed: int, *key: int) -> float:
+    """Deterministic pseudo-random value in (-1, 1) for a grid position."""
+    h = math.sin(seed * 11.131 + sum(k * m for k, m in zip(key, (12.9898, 78.233, 37.719, 93.989), strict=True)))
+    return math.modf(h * 43758.5453)[0]
+
+
+def zip_color(grid: SyntheticGrid, i: int) -> str:
+    """Colour of zip ``i``; neighbours in a row or column never match."""
+    col, row = grid.cell(i)
+    return _ZIP_PALETTE[(col + 2 * row) % len(_ZIP_PALETTE)]
+
+
+def _cell_wkt(grid: SyntheticGrid, col: int, row: int, vertices_per_edge: int, seed: int) -> str:
+    n = vertices_per_edge
+    dx, dy = grid.cell_deg
+    # Keeps a wobbled vertex from crossing the neighbouring edge near a corner.
+    amp = 0.4 / n
+
+    def horizontal(r: int, c: int) -> list[tuple[float, float]]:
+        y = _CONUS[1] + r * dy
+        return [
+            (_CONUS[0] + (c + s / n) * dx, y + (amp * dy * _noise(seed, 0, r, c, s) if 0 < s < n else 0.0))
+            for s in range(n + 1)
+        ]
+
+    def vertical(c: int, r: int) -> list[tuple[float, float]]:
+        x = _CONUS[0] + c * dx
+        return [
+            (x + (amp * dx * _noise(seed, 1, c, r, s) if 0 < s < n else 0.0), _CONUS[1] + (r + s / n) * dy)
+            for s in range(n + 1)
+        ]
+
+    ring = (
+        horizontal(row, col)
+        + vertical(col + 1, row)[1:]
+        + horizontal(row + 1, col)[::-1][1:]
+        + vertical(col, row)[::-1][1:]
+    )
+    return "POLYGON((" + ",".join(f"{x:.6f} {y:.6f}" for x, y in ring) + "))"
+
+
+def seed_geography(engine: Engine, zips: int, vertices_per_edge: int = 8, seed: int = 0) -> SyntheticGrid:
+    """Replace geography_zip_codes with a ``zips``-cell grid and build every snap tier.
+
+    The grid keeps roughly square cells in degrees. Tier columns are snapped from
+    the 4326 master exactly like migrations 0004 and 0007 do it, and the boxes
+    are taken from it as in 0012.
+    """
+    if not 1 <= zips <= 99_999:
+        raise ValueError("zips must fit in a 5-digit zip code")
+    aspect = (_CONUS[2] - _CONUS[0]) / (_CONUS[3] - _CONUS[1])
+    cols = max(1, math.ceil(math.sqrt(zips * aspect)))
+    grid = SyntheticGrid(zips=zips, cols=cols, rows=math.ceil(zips / cols))
+
+    insert_sql = text("""
+        INSERT INTO geography_zip_codes (zip_code, color, geom)
+        VALUES (:zip_code, :color, ST_GeomFromText(:wkt, 4326))
+    """)
+    snaps = ", ".join(
+        f"{tier.column} = ST_MakeValid(ST_SnapToGrid(ST_Transform(geom, 3857), {tier.snap_m}))"
+        for tier in GEOMETRY_TIERS
+    )
+    snaps += (
+        ", bbox_min_lng = ST_XMin(geom), bbox_min_lat = ST_YMin(geom),"
+        " bbox_max_lng = ST_XMax(geom), bbox_max_lat = ST_YMax(geom)"
+    )
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE geography_zip_codes CASCADE"))
+        for start in range(0, zips, _INSERT_CHUNK):
+            rows: list[dict[str, Any]] = []
+            for i in range(start, min(start + _INSERT_CHUNK, zips)):
+                col, row = grid.cell(i)
+                rows.append({
+                    "zip_code": grid.zip_code(i),
+                    "color": zip_color(grid, i),
+                    "wkt": _cell_wkt(grid, col, row, vertices_per_edge, seed),
+                })
+            conn.execute(insert_sql, rows)
+        conn.execute(text(f"UPDATE geography_zip_codes SET {snaps}"))  # noqa: S608
+        conn.execute(text("ANALYZE geography_zip_codes"))
+    return grid
+
+
+def field_config(fields: int) -> list[dict[str, Any]]:
+    """data_field_config for ``fields`` numeric fields, each rolled up as sum and avg."""
+    return [
+        {
+            "field": f"metric_{j}",
+            "name": f"metric_{j}",
+            "type": "number",
+            "aggregations": ["sum", "avg"],
+            "precision": 2,
+        }
+        for j in range(fields)
+    ]
+
+
+def build_map(
+    engine: Engine,
+    grid: SyntheticGrid,
+    layers: int = 4,
+    fields: int = 3,
+    seed: int = 0,
+    name: str = "Synthetic national map",
+) -> SyntheticMap:
+    """Create a map over every zip in ``grid`` and run the full geometry and data rollup.
+
+    ``layers`` counts the zip layer, so 4 means zips, territories and two layers
+    above them. Nodes are inserted top-down so parent ids are known; geometry and
+    data are then computed with ComputationService, the same as an import.
+    """
+    if not 2 <= layers <= len(_LAYER_NAMES):
+        raise ValueError(f"layers must be between 2 and {len(_LAYER_NAMES)}")
+    rng = random.Random(seed)  # noqa: S311
+    config = field_config(fields)
+    field_names = tuple(f["field"] for f in config)
+
+    with Session(engine) as db:
+        map_model = MapModel(name=name, data_field_config=config)
+        db.add(map_model)
+        db.flush()
+        layer_models = [LayerModel(map_id=map_model.id, name=layer_name(order), order=order) for order in range(layers)]
+        db.add_all(layer_models)
+        db.flush()
+
+        # block (bx, by) -> node id, per order; filled top-down.
+        node_ids: dict[int, dict[tuple[int, int], int]] = {}
+        for order in range(layers - 1, 0, -1):
+            blocks = sorted({grid.block(i, order) for i in range(grid.zips)})
+            parents = node_ids.get(order + 1)
+            rows: list[dict[str, Any]] = [
+                {
+                    "layer_id": layer_models[order].id,
+                    "name": node_name(order, (bx, by)),
+                    "color": _NODE_PALETTE[(bx + by) % len(_NODE_PALETTE)],
+                    "parent_node_id": parents[bx // _FANOUT, by // _FANOUT] if parents else None,
+                }
+                for bx, by in blocks
+            ]
+            ids = db.execute(insert(NodeModel).values(rows).returning(NodeModel.id)).scalars().all()
+            node_ids[order] = dict(zip(blocks, ids, strict=True))
+
+        territories = node_ids.get(1, {})
+        zip_rows = [
+            {
+                "layer_id": layer_models[0].id,
+                "zip_code": grid.zip_code(i),
+                "parent_node_id": territories.get(grid.block(i, 1)),
+                "color": zip_color(grid, i),
+                "data": {name: rng.randint(0, 10_000) for name in field_names} or None,
+            }
+            for i in range(grid.zips)
+        ]
+        for start in range(0, len(zip_rows), _INSERT_CHUNK):
+            db.execute(insert(ZipAssignmentModel).values(zip_rows[start : start + _INSERT_CHUNK]))
+        db.commit()
+
+        computation = ComputationService(db=db)
+        computation.recompute_all_layers(map_model.id)
+        db.commit()
+        computation.compute_data_for_map(map_model.id)
+        db.commit()
+
+        for table in ("zip_assignments", "nodes"):
+            db.execute(text(f"ANALYZE {table}"))
+        db.commit()
+
+        return SyntheticMap(
+            map_id=map_model.id,
+            layer_ids=tuple(layer.id for layer in layer_models),
+            node_ids_by_order={order: tuple(ids.values()) for order, ids in node_ids.items()},
+            field_names=field_names,
+            grid=grid,
+        )
@@ -0,0 +1,174 @@
+"""Shared benchmark plumbing: database setup, timing, query recording and JSON results."""
+
+import json
+import platform
+import re
+import statistics
+import subprocess  # noqa: S404
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, event, text
+
+from src.models import Base
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def prepare_database(engine: Engine) -> None:
+    """Enable the extensions the models need and create any missing tables.
+
+    The bench database is built from the models rather than the migration chain:
+    0004 loads zip boundaries from a private SQL dump, and the generator replaces
+    that data anyway. The models declare the same GIST indexes as the migrations.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS citext"))
+    Base.metadata.create_all(engine)
+
+
+def summarize(samples_ms: list[float]) -> dict[str, Any]:
+    """Return count, mean and the usual percentiles of a list of millisecond samples."""
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, round(p * (len(ordered) - 1)))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": round(pct(0.50), 3),
+        "p95_ms": round(pct(0.95), 3),
+        "p99_ms": round(pct(0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+@contextmanager
+def stopwatch() -> Generator[list[float]]:
+    """Yield a one-element list that holds the elapsed milliseconds once the block exits."""
+    elapsed = [0.0]
+    t0 = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed[0] = (time.perf_counter() - t0) * 1000
+
+
+@dataclass
+class QueryTiming:
+    """One statement seen by a QueryRecorder."""
+
+    sql: str
+    """Statement text with whitespace collapsed, truncated to 160 characters."""
+    ms: float
+    rows: int
+    """cursor.rowcount — rows returned or touched; -1 when the driver does not know."""
+
+
+@dataclass
+class QueryRecorder:
+    """Records every statement executed on an engine while attached.
+
+    Uses the same cursor execute events as the import profiler, so the numbers
+    include flushes and commits issued inside the measured block.
+    """
+
+    engine: Engine
+    queries: list[QueryTiming] = field(default_factory=list[QueryTiming])
+
+    def _before_cursor_execute(self, conn: Any, *args: Any) -> None:
+        conn.info["bench_query_t0"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        t0 = conn.info.pop("bench_query_t0", None)
+        if t0 is None:
+            return
+        sql = _WHITESPACE_RE.sub(" ", statement).strip()[:160]
+        self.queries.append(QueryTiming(sql=sql, ms=(time.perf_counter() - t0) * 1000, rows=cursor.rowcount))
+
+    @contextmanager
+    def attach(self) -> Generator["QueryRecorder"]:
+        """Record statements for the duration of the block."""
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(self.engine, "after_cursor_execute", self._after_cursor_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(self.engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def clear(self) -> None:
+        """Forget everything recorded so far."""
+        self.queries.clear()
+
+    def report(self) -> dict[str, Any]:
+        """Totals plus a per-statement breakdown, slowest first."""
+        grouped: dict[str, list[QueryTiming]] = {}
+        for q in self.queries:
+            grouped.setdefault(q.sql, []).append(q)
+        statements = [
+            {
+                "sql": sql,
+                "calls": len(qs),
+                "total_ms": round(sum(q.ms for q in qs), 3),
+                "rows": sum(max(q.rows, 0) for q in qs),
+            }
+            for sql, qs in grouped.items()
+        ]
+        statements.sort(key=lambda s: s["total_ms"], reverse=True)
+        return {
+            "statements": len(self.queries),
+            "db_ms": round(sum(q.ms for q in self.queries), 3),
+            "rows": sum(max(q.rows, 0) for q in self.queries),
+            "by_statement": statements,
+        }
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def write_results(benchmark: str, params: dict[str, Any], results: dict[str, Any], output: Path | None = None) -> Path:
+    """Write a result file and return its path.
+
+    Defaults to benchmarks/results/<benchmark>-<git rev>-<utc timestamp>.json.
+    benchmarks.compare refuses to diff runs of different benchmarks and warns
+    when their ``params`` differ.
+    """
+    now = datetime.now(UTC)
+    revision = _git_revision()
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"{benchmark}-{revision or 'unknown'}-{now:%Y%m%dT%H%M%SZ}.json"
+    payload = {
+        "benchmark": benchmark,
+        "created_at": now.isoformat(),
+        "git_revision": revision,
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "params": params,
+        "results": results,
+    }
+    output.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+    return output
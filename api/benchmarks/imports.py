@@ -0,0 +1,181 @@
+"""Import pipeline benchmark.
+
+For each requested row count, generates an XLSX workbook, uploads it to the bench
+MinIO, then runs process_upload_task and import_map_task in-process exactly as the
+worker would. Per-stage wall time, DB time, statements, rows and peak RSS come
+from the import profile the task stores on the upload; process_upload_task is
+timed as one stage.
+
+Rows cycle over the generated zips, so row counts past ``--zips`` repeat zips
+with the same hierarchy (as line-item exports do). Parsing scales with rows;
+node and zip inserts scale with distinct zips.
+
+Usage:
+    cd api && poetry run dotenv -f .env.bench run python -m benchmarks.imports --rows 10000,100000,500000 --depth 4
+"""
+
+import argparse
+import io
+import random
+from pathlib import Path
+from typing import Any
+
+from openpyxl import Workbook
+from sqlalchemy import Engine, insert
+from sqlalchemy.orm import Session
+
+from benchmarks.fixtures import SyntheticGrid, layer_name, node_name, reset_database, seed_geography
+from benchmarks.harness import prepare_database, stopwatch, write_results
+from src.app.database import engine as app_engine
+from src.models import LayerModel, MapModel, MapUploadModel
+from src.services.s3 import S3Service
+from src.workers import init_db_pool
+from src.workers.tasks.maps import _peak_rss_kb, _reset_peak_rss, import_map_task  # type: ignore[reportPrivateUsage]
+from src.workers.tasks.uploads import process_upload_task
+
+_XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _metric_header(j: int) -> str:
+    return f"Metric {j}"
+
+
+def build_workbook(grid: SyntheticGrid, rows: int, depth: int, numeric: int, seed: int) -> bytes:
+    """Return an XLSX with one header row and ``rows`` data rows.
+
+    Columns run top layer first down to the zip column, then ``numeric`` number
+    columns with two decimals. Zips are written as integers, the way they come
+    out of most spreadsheets, so the importer's zero-padding runs too.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([layer_name(order) for order in range(depth - 1, -1, -1)] + [_metric_header(j) for j in range(numeric)])
+    for r in range(rows):
+        i = r % grid.zips
+        ws.append(
+            [node_name(order, grid.block(i, order)) for order in range(depth - 1, 0, -1)]
+            + [i]
+            + [round(rng.uniform(0, 10_000), 2) for _ in range(numeric)]
+        )
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _create_upload(engine: Engine, s3: S3Service, workbook: bytes, rows: int) -> tuple[str, float]:
+    """Insert a parsing upload, put the workbook in MinIO under its key; return (upload_id, upload_ms)."""
+    with Session(engine) as db:
+        upload = MapUploadModel(s3_key="", original_filename=f"bench-{rows}.xlsx", tab_index=0, status="parsing")
+        db.add(upload)
+        db.flush()
+        upload.s3_key = f"map-uploads/{upload.id}.xlsx"
+        with stopwatch() as elapsed:
+            s3.upload_private_file(file=io.BytesIO(workbook), content_type=_XLSX_CONTENT_TYPE, key=upload.s3_key)
+        db.commit()
+        return upload.id, elapsed[0]
+
+
+def _create_map(engine: Engine, upload_id: str, depth: int, numeric: int) -> str:
+    """Claim the upload for a new map the way POST /maps does and return the map id."""
+    layers = [{"name": layer_name(order), "header": layer_name(order)} for order in range(depth)]
+    data_fields = [
+        {"name": _metric_header(j), "header": _metric_header(j), "type": "number", "aggregations": ["sum", "avg"]}
+        for j in range(numeric)
+    ]
+    with Session(engine) as db:
+        upload = db.get(MapUploadModel, upload_id)
+        if upload is None or upload.status != "ready":
+            raise RuntimeError(f"upload {upload_id} did not parse: {upload.error_reason if upload else 'missing'}")
+        map_model = MapModel(
+            name=f"Import benchmark ({upload.row_count} rows)",
+            data_field_config=[
+                {"field": f"metric_{j}", "label": _metric_header(j), "type": "number", "aggregations": ["sum", "avg"]}
+                for j in range(numeric)
+            ]
+            or None,
+            source_upload_id=upload.id,
+        )
+        db.add(map_model)
+        db.flush()
+        db.execute(
+            insert(LayerModel).values([
+                {"map_id": map_model.id, "name": layer["name"], "order": order} for order, layer in enumerate(layers)
+            ])
+        )
+        upload.layer_config = layers
+        upload.data_config = data_fields
+        upload.status = "importing"
+        db.commit()
+        return map_model.id
+
+
+def bench_import(
+    engine: Engine, s3: S3Service, grid: SyntheticGrid, rows: int, depth: int, numeric: int, seed: int
+) -> dict[str, Any]:
+    """Generate, upload, parse and import one workbook; return its timings."""
+    with stopwatch() as generate:
+        workbook = build_workbook(grid, rows, depth, numeric, seed)
+    upload_id, upload_ms = _create_upload(engine, s3, workbook, rows)
+
+    # Same peak-RSS probes as the import profile, so parse and import numbers line up.
+    _reset_peak_rss()
+    with stopwatch() as parse:
+        process_upload_task.apply(args=[upload_id], throw=True)
+    parse_peak_rss_kb = _peak_rss_kb()
+
+    map_id = _create_map(engine, upload_id, depth, numeric)
+    with stopwatch() as imported:
+        import_map_task.apply(args=[map_id], throw=True)
+
+    with Session(engine) as db:
+        upload = db.get(MapUploadModel, upload_id)
+        stages: list[dict[str, Any]] = list((upload.import_profile if upload else None) or [])
+        status = upload.status if upload else None
+    return {
+        "status": status,
+        "workbook_bytes": len(workbook),
+        "generate_ms": round(generate[0]),
+        "s3_upload_ms": round(upload_ms),
+        "process_upload": {"wall_ms": round(parse[0]), "peak_rss_kb": parse_peak_rss_kb},
+        "import": {
+            "wall_ms": round(imported[0]),
+            "peak_rss_kb": max((s.get("peak_rss_kb") or 0 for s in stages), default=0),
+            "stages": {s["step"]: {k: v for k, v in s.items() if k != "step"} for s in stages},
+        },
+    }
+
+
+def main() -> None:
+    """Run the import benchmark and write its result file."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,100000,500000", help="Comma-separated workbook row counts.")
+    parser.add_argument("--zips", type=int, default=40_000, help="Zip geographies to generate.")
+    parser.add_argument("--depth", type=int, default=4, help="Hierarchy columns including the zip column (2-6).")
+    parser.add_argument("--numeric", type=int, default=5, help="Numeric data columns.")
+    parser.add_argument("--vertices", type=int, default=8, help="Vertices per zip edge.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--i-know", action="store_true", help="Allow wiping a database other than the bench one.")
+    args = parser.parse_args()
+
+    prepare_database(app_engine)
+    reset_database(app_engine, force=args.i_know)
+    grid = seed_geography(app_engine, args.zips, vertices_per_edge=args.vertices, seed=args.seed)
+    # The tasks take their sessions from the worker pool, as under a real worker.
+    init_db_pool()
+    s3 = S3Service()
+
+    results: dict[str, Any] = {}
+    for rows in (int(r) for r in args.rows.split(",")):
+        print(f"importing {rows} rows")
+        reset_database(app_engine, keep=("geography_zip_codes",), force=args.i_know)
+        results[f"rows_{rows}"] = bench_import(app_engine, s3, grid, rows, args.depth, args.numeric, args.seed)
+
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    path = write_results("imports", params, results, args.output)
+    print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
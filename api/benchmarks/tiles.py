@@ -0,0 +1,211 @@
+"""Tile rendering benchmark.
+
+Builds a synthetic national map, then measures:
+  render  — mvt_service.render_tile latency per layer and zoom, plus latency
+            bucketed by encoded tile size, called directly on a session.
+  routes  — cache miss and cache hit latency and throughput through the
+            /tiles routes (per-layer, map-level and batch) via the ASGI app.
+
+Sample tiles are the tiles under randomly chosen zip centroids, so every sample
+has features and higher zooms do not just measure empty tiles.
+
+Usage:
+    cd api && poetry run dotenv -f .env.bench run python -m benchmarks.tiles --zips 10000 --layers 4
+"""
+
+import argparse
+import math
+import random
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, delete
+from sqlalchemy.orm import Session
+
+from benchmarks.fixtures import SyntheticGrid, SyntheticMap, build_map, reset_database, seed_geography
+from benchmarks.harness import prepare_database, stopwatch, summarize, write_results
+from src import app
+from src.app.database import engine as app_engine
+from src.models import LayerModel, MapModel, MvtMapTileCacheModel, MvtTileCacheModel
+from src.services import mvt as mvt_service
+
+type Tile = tuple[int, int, int]
+
+# (exclusive upper bound in bytes, name) of the tile size buckets; anything larger is "gte_128k".
+_SIZE_BUCKETS = ((4_096, "lt_4k"), (32_768, "4k_32k"), (131_072, "32k_128k"))
+
+_BATCH_TILES = 16
+
+
+def lonlat_to_tile(lon: float, lat: float, z: int) -> Tile:
+    """Return the (z, x, y) slippy-map tile containing a WGS84 point."""
+    n = 2**z
+    lat_rad = math.radians(lat)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return z, x, y
+
+
+def sample_tiles(grid: SyntheticGrid, zooms: list[int], per_zoom: int, seed: int) -> dict[int, list[Tile]]:
+    """Pick up to ``per_zoom`` distinct tiles per zoom, each under a random zip centroid."""
+    rng = random.Random(seed)  # noqa: S311
+    out: dict[int, list[Tile]] = {}
+    for z in zooms:
+        tiles: dict[Tile, None] = {}
+        for _ in range(per_zoom * 20):
+            if len(tiles) >= per_zoom:
+                break
+            tiles[lonlat_to_tile(*grid.center(rng.randrange(grid.zips)), z)] = None
+        out[z] = list(tiles)
+    return out
+
+
+def _size_bucket(size: int) -> str:
+    for limit, name in _SIZE_BUCKETS:
+        if size < limit:
+            return name
+    return "gte_128k"
+
+
+def bench_render(engine: Engine, synthetic: SyntheticMap, tiles: dict[int, list[Tile]], warmup: int) -> dict[str, Any]:
+    """render_tile latency per layer order and zoom, and per encoded size bucket."""
+    results: dict[str, Any] = {}
+    with Session(engine) as db:
+        map_model = db.get(MapModel, synthetic.map_id)
+        for order, layer_id in enumerate(synthetic.layer_ids):
+            layer = db.get(LayerModel, layer_id)
+            if layer is None:
+                raise RuntimeError(f"layer {layer_id} vanished mid-benchmark")
+            by_zoom: dict[str, Any] = {}
+            by_size: dict[str, list[float]] = {}
+            for z, zoom_tiles in tiles.items():
+                for _, x, y in zoom_tiles[:warmup]:
+                    mvt_service.render_tile(db, layer, map_model, z, x, y)
+                latencies: list[float] = []
+                sizes: list[int] = []
+                for _, x, y in zoom_tiles:
+                    with stopwatch() as elapsed:
+                        tile_bytes = mvt_service.render_tile(db, layer, map_model, z, x, y)
+                    latencies.append(elapsed[0])
+                    sizes.append(len(tile_bytes))
+                    by_size.setdefault(_size_bucket(len(tile_bytes)), []).append(elapsed[0])
+                sizes.sort()
+                by_zoom[f"z{z}"] = {
+                    **summarize(latencies),
+                    "bytes_p50": sizes[len(sizes) // 2] if sizes else 0,
+                    "bytes_max": sizes[-1] if sizes else 0,
+                }
+            results[f"order_{order}"] = {
+                "by_zoom": by_zoom,
+                "by_size": {bucket: summarize(samples) for bucket, samples in sorted(by_size.items())},
+            }
+    return results
+
+
+def _clear_tile_cache(engine: Engine, synthetic: SyntheticMap) -> None:
+    with Session(engine) as db:
+        db.execute(delete(MvtTileCacheModel).where(MvtTileCacheModel.layer_id.in_(synthetic.layer_ids)))
+        db.execute(delete(MvtMapTileCacheModel).where(MvtMapTileCacheModel.map_id == synthetic.map_id))
+        db.commit()
+
+
+def _run_requests(requests: list[Callable[[], int]], concurrency: int) -> dict[str, Any]:
+    """Run request thunks, each returning a status code, and report latency and throughput."""
+
+    def timed(request: Callable[[], int]) -> tuple[float, int]:
+        with stopwatch() as elapsed:
+            status = request()
+        return elapsed[0], status
+
+    with stopwatch() as wall, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, requests))
+    errors = sum(1 for _, status in outcomes if status >= 400)
+    return {
+        **summarize([ms for ms, _ in outcomes]),
+        "errors": errors,
+        "requests_per_s": round(len(outcomes) / (wall[0] / 1000), 2) if wall[0] else None,
+    }
+
+
+def bench_routes(
+    engine: Engine, synthetic: SyntheticMap, tiles: dict[int, list[Tile]], concurrency: int
+) -> dict[str, Any]:
+    """Cold (every request a miss) then warm (every request a hit) passes per tile route."""
+    client = TestClient(app)
+    all_tiles = [tile for zoom_tiles in tiles.values() for tile in zoom_tiles]
+
+    def get(url: str) -> Callable[[], int]:
+        return lambda: client.get(url).status_code
+
+    def post(url: str, body: dict[str, Any]) -> Callable[[], int]:
+        return lambda: client.post(url, json=body).status_code
+
+    routes: dict[str, list[Callable[[], int]]] = {
+        "layer": [
+            get(f"/tiles/{layer_id}/{z}/{x}/{y}.pbf") for layer_id in synthetic.layer_ids for z, x, y in all_tiles
+        ],
+        "map": [get(f"/tiles/maps/{synthetic.map_id}/{z}/{x}/{y}.pbf") for z, x, y in all_tiles],
+        "batch": [
+            post(
+                "/tiles/batch",
+                {
+                    "layer_ids": list(synthetic.layer_ids),
+                    "tiles": [{"z": z, "x": x, "y": y} for z, x, y in all_tiles[i : i + _BATCH_TILES]],
+                },
+            )
+            for i in range(0, len(all_tiles), _BATCH_TILES)
+        ],
+    }
+
+    results: dict[str, Any] = {}
+    for name, requests in routes.items():
+        _clear_tile_cache(engine, synthetic)
+        miss = _run_requests(requests, concurrency)
+        hit = _run_requests(requests, concurrency)
+        results[name] = {"miss": miss, "hit": hit}
+    _clear_tile_cache(engine, synthetic)
+    return results
+
+
+def main() -> None:
+    """Run the tile benchmark and write its result file."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zips", type=int, default=10_000, help="Zip geographies to generate (1k, 10k, 40k).")
+    parser.add_argument("--layers", type=int, default=4, help="Layers including the zip layer (3-5).")
+    parser.add_argument("--fields", type=int, default=3, help="Numeric data fields per zip.")
+    parser.add_argument("--vertices", type=int, default=8, help="Vertices per zip edge.")
+    parser.add_argument("--zooms", default="4,6,8,10,12,14", help="Comma-separated zoom levels.")
+    parser.add_argument("--tiles-per-zoom", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed renders per zoom before sampling.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent requests in the route passes.")
+    parser.add_argument("--skip-routes", action="store_true", help="Only measure render_tile.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--i-know", action="store_true", help="Allow wiping a database other than the bench one.")
+    args = parser.parse_args()
+
+    zooms = [int(z) for z in args.zooms.split(",")]
+    prepare_database(app_engine)
+    reset_database(app_engine, force=args.i_know)
+    with stopwatch() as setup:
+        grid = seed_geography(app_engine, args.zips, vertices_per_edge=args.vertices, seed=args.seed)
+        synthetic = build_map(app_engine, grid, layers=args.layers, fields=args.fields, seed=args.seed)
+    tiles = sample_tiles(grid, zooms, args.tiles_per_zoom, args.seed)
+
+    results: dict[str, Any] = {
+        "setup_ms": round(setup[0]),
+        "render": bench_render(app_engine, synthetic, tiles, args.warmup),
+    }
+    if not args.skip_routes:
+        results["routes"] = bench_routes(app_engine, synthetic, tiles, args.concurrency)
+
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    path = write_results("tiles", params, results, args.output)
+    print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
+from .instrumentation import track_queries
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -18,14 +20,16 @@ class _ResponseTimeMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
 
     async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-        """Measure the response time of the request."""
+        """Measure the response time and SQL work of the request and report both in Server-Timing."""
         start_time: float = time.perf_counter()
-        response: Response = await call_next(request)
+        with track_queries() as stats:
+            response: Response = await call_next(request)
         end_time: float = time.perf_counter()
         duration: float = (end_time - start_time) * 1000  # Convert to milliseconds
 
+        response.headers.append("Server-Timing", f"app;dur={duration:.1f}, {stats.server_timing()}")
         logger.debug(
-            f"{request.method} {request.url.path}{f"?{request.url.query}" if request.url.query else ""} returned {response.status_code} in {duration:.2f}ms"
+            f"{request.method} {request.url.path}{f"?{request.url.query}" if request.url.query else ""} returned {response.status_code} in {duration:.2f}ms {stats.log_fields()}"
         )
 
         return response
@@ -18,12 +18,35 @@ class DatabaseSettings(BaseSettings, env_prefix="DB_"):
     port: int = 5432
     password: str = Field(default=...)
     echo: bool = False
+    slow_query_ms: float | None = 500.0
+    """Statements at least this slow are logged with their bind parameters. None disables."""
+    pgbouncer: bool = False
+    """Connect through a transaction-pooling proxy such as PgBouncer (pool_mode=transaction).
+
+    Disables psycopg 3's automatic server-side prepared statements, which would
+    land on whichever server connection the proxy hands out next.
+    """
+    api_pool_size: int = 10
+    """Kept-open connections per API process for sync routes. Sizing guidance is in database.py."""
+    api_max_overflow: int = 10
+    api_async_pool_size: int = 10
+    """Kept-open connections per API process for async routes."""
+    api_async_max_overflow: int = 10
+    worker_pool_size: int = 1
+    """Kept-open connections per Celery worker process: the task's own session."""
+    worker_max_overflow: int = 4
+    """Extra connections per Celery worker process, for fanned-out work like compute_data_for_map."""
 
     @property
     def db_url(self) -> str:
         """Database string based on inputs."""
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
 
+    @property
+    def async_db_url(self) -> str:
+        """Database string for the asyncio engine, driven by psycopg 3."""
+        return f"postgresql+psycopg://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
+
 
 class JWTSettings(BaseSettings, env_prefix="JWT_"):
     """JWT authentication settings."""
@@ -46,6 +69,42 @@ class CelerySettings(BaseSettings, env_prefix="CELERY_"):
     """Celery settings."""
 
     broker_url: str = "amqp://rabbitmq:5672"
+    recompute_debounce_s: float = 2.0
+    """Quiet period after the last edit folded into a pending recompute before it may start."""
+    recompute_max_delay_s: float = 30.0
+    """Upper bound on how long continuous edits can hold back a pending recompute."""
+
+
+class PermissionsSettings(BaseSettings, env_prefix="PERMISSIONS_"):
+    """Permission check settings."""
+
+    role_cache_ttl_s: float = 30.0
+    """How long a process trusts a user's cached map roles. 0 disables the cache."""
+
+
+class SearchSettings(BaseSettings, env_prefix="SEARCH_"):
+    """Map search settings."""
+
+    cache_ttl_s: float = 30.0
+    """How long a process reuses a search's results. 0 disables the cache."""
+    cache_max_entries: int = 2048
+    """Searches kept per process; the least recently used are dropped first."""
+
+
+class SpatialSettings(BaseSettings, env_prefix="SPATIAL_"):
+    """Spatial selection settings."""
+
+    selection_ttl_s: int = 900
+    """How long a lasso selection's token stays usable."""
+
+
+class MetricsSettings(BaseSettings, env_prefix="METRICS_"):
+    """Prometheus metrics settings. The multiprocess directory is PROMETHEUS_MULTIPROC_DIR (see metrics.py)."""
+
+    enabled: bool = False
+    """Serve GET /metrics on the API. Off by default: the route is unauthenticated and queries map_jobs."""
+    worker_port: int | None = None
+    """Port a Celery worker serves its metrics on. None keeps worker metrics unexported."""
 
 
 class S3Settings(BaseSettings, env_prefix="S3_"):
@@ -53,6 +112,8 @@ class S3Settings(BaseSettings, env_prefix="S3_"):
 
     bucket: str = "terramaps"
     url_template: str = "https://{bucket}.s3.us-east-1.amazonaws.com/{key}"
+    prefetch_workers: int = 8
+    """Concurrent slide image downloads while assembling a PPT export. Keep at or below boto3's pool of 10."""
 
     # Only set for local development (MinIO override).
     minio_endpoint_url: str | None = Field(default=None)
@@ -92,6 +153,10 @@ class AppSettings(BaseSettings):
     cors: CORSSettings = CORSSettings()
     celery: CelerySettings = CelerySettings()
     s3: S3Settings = S3Settings()
+    metrics: MetricsSettings = MetricsSettings()
+    permissions: PermissionsSettings = PermissionsSettings()
+    search: SearchSettings = SearchSettings()
+    spatial: SpatialSettings = SpatialSettings()
     log_level: Literal["CRITICAL", "FATAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"] = "INFO"
 
 
@@ -5,6 +5,8 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.schemas.graph import MAP_JOB_ID_HEADER
+
 from .config import app_settings
 
 logger = logging.getLogger(__name__)
@@ -20,4 +22,5 @@ def configure_cors(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[MAP_JOB_ID_HEADER],
     )
@@ -1,39 +1,109 @@
-"""Database session management."""
+"""Database session management.
+
+Every process owns its pools, so a deployment can open up to
+
+    API replicas x uvicorn workers x (DB_API_POOL_SIZE + DB_API_MAX_OVERFLOW
+                                      + DB_API_ASYNC_POOL_SIZE + DB_API_ASYNC_MAX_OVERFLOW)
+    + worker replicas x Celery concurrency x (DB_WORKER_POOL_SIZE + DB_WORKER_MAX_OVERFLOW)
+
+connections. With the defaults that is 40 per API process and 5 per worker
+process; a worker needs one for the task session plus up to four for
+compute_data_for_map's split aggregation.
+
+Connecting straight to Postgres, keep the total below max_connections minus
+superuser_reserved_connections and a few for migrations and psql. Three API
+replicas with two uvicorn workers each plus one worker at concurrency 4 need
+3 x 2 x 40 + 4 x 5 = 260.
+
+Behind a transaction-pooling proxy (DB_PGBOUNCER=true) the pools above only
+bound each process's concurrency against the proxy, which multiplexes them onto
+its own server pool (default_pool_size per database/user). Size that to what
+Postgres can run at once, a small multiple of its cores, and the replica count
+stops mattering. The app keeps no session state for this to break: sessions
+hold a server connection only for the length of a transaction, locks are
+transaction-scoped (pg_advisory_xact_lock) and nothing SETs session settings.
+Celery tasks do keep their transaction open for the length of the task, so
+budget one server connection per busy worker process.
+"""
 
 import logging
-from collections.abc import Generator
-from typing import Annotated
+from collections.abc import AsyncGenerator, Generator
+from typing import Annotated, Any, Literal
 
 from fastapi import Depends
 from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from .config import app_settings
+from .instrumentation import instrument_engine
+from .metrics import timed_queue_pool
 
 logger = logging.getLogger(__name__)
 
+PoolRole = Literal["api", "api-async", "worker"]
 
-def get_db_driver(app_name: str = "api") -> tuple[Engine, sessionmaker[Session]]:
+
+def _pool_sizing(role: PoolRole) -> dict[str, Any]:
+    """Pool arguments for an engine serving ``role``, from the DB_*_POOL_SIZE / DB_*_MAX_OVERFLOW settings."""
+    settings = app_settings.database
+    pool_size, max_overflow = {
+        "api": (settings.api_pool_size, settings.api_max_overflow),
+        "api-async": (settings.api_async_pool_size, settings.api_async_max_overflow),
+        "worker": (settings.worker_pool_size, settings.worker_max_overflow),
+    }[role]
+    return {"pool_size": pool_size, "max_overflow": max_overflow, "pool_pre_ping": True, "pool_recycle": 1800}
+
+
+def get_db_driver(app_name: str = "api", role: PoolRole = "api") -> tuple[Engine, sessionmaker[Session]]:
     """Create a new engine + session factory.
 
     Called at startup for the FastAPI app and post-fork in Celery workers so
-    each worker process gets its own connection pool.
+    each worker process gets its own connection pool, sized for ``role``. Every
+    engine gets the SQL instrumentation hooks, and its pool reports checkout
+    waits under ``app_name``. psycopg2 never prepares statements server-side,
+    so nothing changes here for DB_PGBOUNCER.
     """
     engine = create_engine(
         app_settings.database.db_url,
         echo=app_settings.database.echo,
         connect_args={"application_name": app_name},
-        pool_size=20,
-        max_overflow=20,
-        pool_pre_ping=True,
-        pool_recycle=1800,
+        poolclass=timed_queue_pool(app_name),
+        **_pool_sizing(role),
     )
+    instrument_engine(engine)
     session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
     return engine, session_factory
 
 
+def get_async_db_driver(app_name: str = "api-async") -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    """Create a new asyncio engine + session factory.
+
+    Used by the read-heavy async routes (tiles, layer listing, node query, search,
+    lasso select) so a request waiting on Postgres does not hold a threadpool
+    thread. The engine shares the instrumentation and pool metrics of get_db_driver.
+    Sessions do not expire on commit: async attribute refreshes would need an await.
+    """
+    connect_args: dict[str, Any] = {"application_name": app_name}
+    if app_settings.database.pgbouncer:
+        # psycopg 3 prepares a statement server-side after its fifth run on a connection.
+        connect_args["prepare_threshold"] = None
+    engine = create_async_engine(
+        app_settings.database.async_db_url,
+        echo=app_settings.database.echo,
+        connect_args=connect_args,
+        poolclass=timed_queue_pool(app_name, AsyncAdaptedQueuePool),
+        **_pool_sizing("api-async"),
+    )
+    instrument_engine(engine.sync_engine)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    return engine, session_factory
+
+
 # Module-level singletons used by the FastAPI app.
 engine, SessionLocal = get_db_driver("api")
+async_engine, AsyncSessionLocal = get_async_db_driver("api-async")
 
 
 def get_db() -> Generator[Session, None]:
@@ -45,4 +115,11 @@ def get_db() -> Generator[Session, None]:
             session.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession]:
+    """Get an asyncio database session."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
 DatabaseSession = Annotated[Session, Depends(get_db)]
+AsyncDatabaseSession = Annotated[AsyncSession, Depends(get_async_db)]
@@ -0,0 +1,133 @@
+"""SQL instrumentation.
+
+Cursor execute hooks attribute statement count, cumulative DB time and the
+slowest statement to whatever unit of work is being tracked — an HTTP request
+(see analytics.py) or a Celery task (see src/workers) — and log any statement
+slower than ``DB_SLOW_QUERY_MS`` with its bind parameters.
+"""
+
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from .config import app_settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_MAX_LOGGED_SQL = 2000
+_MAX_LOGGED_PARAMS = 1000
+
+
+@dataclass
+class QueryStats:
+    """Statements executed by one request or task."""
+
+    statements: int = 0
+    db_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_sql: str | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        """Add one statement. Safe to call from the worker threads of a fanned-out render."""
+        with self._lock:
+            self.statements += 1
+            self.db_ms += elapsed_ms
+            if elapsed_ms > self.slowest_ms:
+                self.slowest_ms = elapsed_ms
+                self.slowest_sql = statement
+
+    def server_timing(self) -> str:
+        """Server-Timing header entries for the DB share of a response."""
+        return f'db;dur={self.db_ms:.1f};desc="{self.statements} queries", db-slowest;dur={self.slowest_ms:.1f}'
+
+    def log_fields(self) -> str:
+        """key=value fields matching the log format in logging.py."""
+        slowest = _WHITESPACE_RE.sub(" ", self.slowest_sql or "").strip()[:120]
+        return (
+            f"db_statements={self.statements} db_ms={self.db_ms:.1f} "
+            f'slowest_ms={self.slowest_ms:.1f} slowest_sql="{slowest}"'
+        )
+
+
+_current: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar("query_stats", default=None)
+
+
+def start_tracking() -> contextvars.Token[QueryStats | None]:
+    """Start attributing statements in the current context to a fresh QueryStats."""
+    return _current.set(QueryStats())
+
+
+def stop_tracking(token: contextvars.Token[QueryStats | None]) -> QueryStats:
+    """Stop tracking started by start_tracking and return what was collected."""
+    stats = _current.get() or QueryStats()
+    _current.reset(token)
+    return stats
+
+
+@contextmanager
+def track_queries() -> Generator[QueryStats]:
+    """Attribute statements executed inside the block to the yielded QueryStats."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def in_current_context[**P, R](fn: Callable[P, R]) -> Callable[P, R]:
+    """Wrap fn so it runs in a copy of the caller's context.
+
+    ThreadPoolExecutor does not carry contextvars into its threads; wrap the
+    callable handed to ``pool.map`` so statements issued there still count
+    towards the calling request or task.
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args: P.args, **kwargs: P.kwargs) -> R:
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def _before_cursor_execute(conn: Any, *args: Any) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    started: list[float] = conn.info.get("query_started_at") or []
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    threshold = app_settings.database.slow_query_ms
+    if threshold is not None and elapsed_ms >= threshold:
+        logger.warning(
+            "slow query: elapsed_ms=%.1f executemany=%s statement=%s parameters=%s",
+            elapsed_ms,
+            executemany,
+            _WHITESPACE_RE.sub(" ", statement).strip()[:_MAX_LOGGED_SQL],
+            repr(parameters)[:_MAX_LOGGED_PARAMS],
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the cursor execute hooks to an engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
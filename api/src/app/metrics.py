@@ -0,0 +1,132 @@
+"""Prometheus metrics.
+
+Metrics are defined once here and updated from wherever the work happens: the
+tile routes and renderer, the database pool (see get_db_driver) and the Celery
+task signals in src/workers. The API exports them at ``GET /metrics`` when
+``METRICS_ENABLED`` is set; a Celery worker exports its own on
+``METRICS_WORKER_PORT`` when that is set.
+
+Both the API and the worker can run several processes (uvicorn ``--workers``,
+Celery prefork). Set ``PROMETHEUS_MULTIPROC_DIR`` to a per-container scratch
+directory and every process writes its samples to files there, which the
+exporting process aggregates at scrape time. Only counters and histograms are
+defined, so samples from exited processes stay valid and no live-process
+bookkeeping is needed. Without the variable, metrics are per-process.
+"""
+
+import logging
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, start_http_server
+from prometheus_client.metrics_core import Metric
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Sample files are opened as soon as a metric (or label set) is created.
+if MULTIPROC_DIR:
+    Path(MULTIPROC_DIR).mkdir(parents=True, exist_ok=True)
+
+TILE_REQUESTS = Counter(
+    "terramaps_tile_requests",
+    "Vector tiles served, by route, layer order, zoom and whether the tile cache had them.",
+    ["route", "layer_order", "zoom", "cache"],
+)
+"""``route`` is layer, map or batch; ``layer_order`` is "all" for map tiles; ``cache`` is hit or miss."""
+
+TILE_RENDER_SECONDS = Histogram(
+    "terramaps_tile_render_seconds",
+    "Time to render one vector tile from PostGIS.",
+    ["layer_order", "zoom"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "terramaps_db_pool_checkout_seconds",
+    "Time spent waiting for a pooled database connection, including opening a new one.",
+    ["app"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+TASK_DURATION_SECONDS = Histogram(
+    "terramaps_task_duration_seconds",
+    "Celery task run time, by task and final state.",
+    ["task", "state"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0),
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited in DB_POOL_CHECKOUT_SECONDS.
+
+    Use timed_queue_pool to get a subclass labelled with the app name; the label
+    lives on the class so it survives ``engine.dispose()`` recreating the pool.
+    """
+
+    app_name = "api"
+
+    def _do_get(self) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(app=self.app_name).observe(time.perf_counter() - started_at)
+
+
+def timed_queue_pool(app_name: str, base: type[QueuePool] = QueuePool) -> type[TimedQueuePool]:
+    """Return a TimedQueuePool class whose checkouts are labelled ``app=app_name``.
+
+    Pass ``base=AsyncAdaptedQueuePool`` for an asyncio engine.
+    """
+    # Pools log under their class's module; keep that in the sqlalchemy logger tree.
+    namespace = {"app_name": app_name, "__module__": QueuePool.__module__}
+    return type(f"TimedQueuePool[{app_name}]", (TimedQueuePool, base), namespace)
+
+
+class StaticCollector:
+    """Collector for metric families computed at scrape time, e.g. from a database query."""
+
+    def __init__(self, families: Iterable[Metric]) -> None:
+        """Hold the metric families to export."""
+        self.families = list(families)
+
+    def collect(self) -> Iterable[Metric]:
+        """Return the held metric families."""
+        return self.families
+
+
+def _process_registry() -> CollectorRegistry:
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+def render_latest(*collectors: StaticCollector) -> bytes:
+    """Render every process's metrics plus ``collectors`` in the Prometheus text format."""
+    extra = CollectorRegistry()
+    for collector in collectors:
+        extra.register(collector)
+    return generate_latest(_process_registry()) + generate_latest(extra)
+
+
+def clear_multiprocess_dir() -> None:
+    """Delete sample files left by a previous run. Call once, before any worker process starts."""
+    if not MULTIPROC_DIR:
+        return
+    for path in Path(MULTIPROC_DIR).glob("*.db"):
+        path.unlink(missing_ok=True)
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve this process's metrics (every process's, in multiprocess mode) on ``port``."""
+    start_http_server(port, registry=_process_registry())
+    logger.info(f"Serving metrics on port {port}")
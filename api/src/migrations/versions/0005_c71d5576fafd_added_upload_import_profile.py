@@ -0,0 +1,40 @@
+"""added upload import profile.
+
+Revision ID: c71d5576fafd
+Revises: bd9a96a540db
+Create Date: 2026-10-19 09:12:41.118204-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c71d5576fafd"
+down_revision: str | None = "bd9a96a540db"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: bd9a96a540db to c71d5576fafd."""
+    op.add_column(
+        "map_uploads",
+        sa.Column("import_profile", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: c71d5576fafd to bd9a96a540db."""
+    op.drop_column("map_uploads", "import_profile")
@@ -0,0 +1,47 @@
+"""added map tile cache.
+
+Revision ID: 2c3296f4af56
+Revises: c71d5576fafd
+Create Date: 2026-10-19 10:03:17.402611-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "2c3296f4af56"
+down_revision: str | None = "c71d5576fafd"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: c71d5576fafd to 2c3296f4af56."""
+    op.create_table(
+        "mvt_map_tile_cache",
+        sa.Column("map_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("z", sa.SmallInteger(), nullable=False),
+        sa.Column("x", sa.Integer(), nullable=False),
+        sa.Column("y", sa.Integer(), nullable=False),
+        sa.Column("tile_bytes", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["map_id"], ["maps.id"], name=op.f("fk_mvt_map_tile_cache_map_id_maps")),
+        sa.PrimaryKeyConstraint("map_id", "z", "x", "y", name=op.f("pk_mvt_map_tile_cache")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 2c3296f4af56 to c71d5576fafd."""
+    op.drop_table("mvt_map_tile_cache")
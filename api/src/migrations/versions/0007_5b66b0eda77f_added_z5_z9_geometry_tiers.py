@@ -0,0 +1,112 @@
+"""added z5 and z9 geometry tiers.
+
+Revision ID: 5b66b0eda77f
+Revises: 2c3296f4af56
+Create Date: 2026-10-19 11:26:52.630917-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+# revision identifiers, used by Alembic.
+revision: str = "5b66b0eda77f"
+down_revision: str | None = "2c3296f4af56"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (column, ST_SnapToGrid tolerance in meters) — one 256px screen pixel at the tier's zoom.
+_NEW_TIERS = (
+    ("geom_z5_merc", 4892.0),
+    ("geom_z9_merc", 306.0),
+)
+
+_TABLES = ("geography_zip_codes", "nodes")
+
+
+def _geometry() -> Geometry:
+    return Geometry(srid=3857, dimension=2, spatial_index=False, from_text="ST_GeomFromEWKT", name="geometry")
+
+
+def _unions(alias: str) -> str:
+    return ", ".join(
+        f"ST_CollectionExtract(ST_UnaryUnion(ST_Collect({alias}.{column})), 3) AS {column}" for column, _ in _NEW_TIERS
+    )
+
+
+def upgrade() -> None:
+    """Upgrade revisions: 2c3296f4af56 to 5b66b0eda77f."""
+    for table in _TABLES:
+        for column, _ in _NEW_TIERS:
+            op.add_column(table, sa.Column(column, _geometry(), nullable=True))
+
+    # Zip tiers are snapped from the 4326 master geometry, same as the existing tiers.
+    snaps = ", ".join(
+        f"{column} = ST_MakeValid(ST_SnapToGrid(ST_Transform(geom, 3857), {tolerance}))"
+        for column, tolerance in _NEW_TIERS
+    )
+    op.execute(f"UPDATE geography_zip_codes SET {snaps} WHERE geom IS NOT NULL")  # noqa: S608
+
+    # Node tiers are unions of their children's tier, built bottom-up one layer order at a time.
+    assignments = ", ".join(f"{column} = u.{column}" for column, _ in _NEW_TIERS)
+    op.execute(f"""
+        UPDATE nodes p
+        SET {assignments}
+        FROM (
+            SELECT za.parent_node_id AS pid, {_unions("gz")}
+            FROM zip_assignments za
+            JOIN geography_zip_codes gz ON gz.zip_code = za.zip_code
+            WHERE za.parent_node_id IS NOT NULL
+            GROUP BY za.parent_node_id
+        ) u
+        WHERE p.id = u.pid
+    """)  # noqa: S608
+    max_order = op.get_bind().execute(sa.text('SELECT COALESCE(MAX("order"), 0) FROM layers')).scalar_one()
+    for order in range(2, max_order + 1):
+        op.execute(
+            sa.text(f"""
+                UPDATE nodes p
+                SET {assignments}
+                FROM (
+                    SELECT child.parent_node_id AS pid, {_unions("child")}
+                    FROM nodes child
+                    JOIN layers l ON l.id = child.layer_id
+                    WHERE l."order" = :child_order
+                      AND child.parent_node_id IS NOT NULL
+                    GROUP BY child.parent_node_id
+                ) u
+                WHERE p.id = u.pid
+            """).bindparams(child_order=order - 1)  # noqa: S608
+        )
+
+    for table in _TABLES:
+        for column, _ in _NEW_TIERS:
+            op.create_geospatial_index(
+                f"idx_{table}_{column}",
+                table,
+                [column],
+                unique=False,
+                postgresql_using="gist",
+                postgresql_ops={},
+            )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 5b66b0eda77f to 2c3296f4af56."""
+    for table in _TABLES:
+        for column, _ in _NEW_TIERS:
+            op.drop_geospatial_index(
+                f"idx_{table}_{column}", table_name=table, postgresql_using="gist", column_name=column
+            )
+            op.drop_column(table, column)
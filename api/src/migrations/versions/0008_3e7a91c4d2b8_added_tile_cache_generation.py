@@ -0,0 +1,64 @@
+"""added tile cache generation.
+
+Revision ID: 3e7a91c4d2b8
+Revises: 5b66b0eda77f
+Create Date: 2026-10-19 14:02:41.118305-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3e7a91c4d2b8"
+down_revision: str | None = "5b66b0eda77f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: 5b66b0eda77f to 3e7a91c4d2b8."""
+    op.add_column("mvt_tile_cache", sa.Column("generation", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("mvt_map_tile_cache", sa.Column("generation", sa.Integer(), server_default="0", nullable=False))
+
+    # Tiles cached so far were valid under wipe-on-change, so they belong to the current generation.
+    op.execute("""
+        UPDATE mvt_tile_cache c
+        SET generation = m.tile_version
+        FROM layers l
+        JOIN maps m ON m.id = l.map_id
+        WHERE l.id = c.layer_id
+    """)
+    op.execute("""
+        UPDATE mvt_map_tile_cache c
+        SET generation = m.tile_version
+        FROM maps m
+        WHERE m.id = c.map_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 3e7a91c4d2b8 to 5b66b0eda77f."""
+    # Stale-generation rows would be served again without the fence.
+    op.execute("""
+        DELETE FROM mvt_tile_cache c
+        USING layers l, maps m
+        WHERE l.id = c.layer_id AND m.id = l.map_id AND c.generation <> m.tile_version
+    """)
+    op.execute("""
+        DELETE FROM mvt_map_tile_cache c
+        USING maps m
+        WHERE m.id = c.map_id AND c.generation <> m.tile_version
+    """)
+    op.drop_column("mvt_map_tile_cache", "generation")
+    op.drop_column("mvt_tile_cache", "generation")
@@ -0,0 +1,63 @@
+"""added map job coalescing.
+
+Revision ID: 8c1f5d2a7e40
+Revises: 3e7a91c4d2b8
+Create Date: 2026-10-19 15:37:09.524816-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "8c1f5d2a7e40"
+down_revision: str | None = "3e7a91c4d2b8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: 3e7a91c4d2b8 to 8c1f5d2a7e40."""
+    op.add_column("map_jobs", sa.Column("affected_node_ids", postgresql.JSONB(), nullable=True))
+    op.add_column("map_jobs", sa.Column("run_after", sa.DateTime(timezone=True), nullable=True))
+
+    # Keep only the newest pending job per map and type. The queued tasks of the
+    # superseded ones still carry their node sets and fold them into the survivor.
+    op.execute("""
+        UPDATE map_jobs j
+        SET status = 'failed', error = 'Superseded by a newer pending job'
+        WHERE j.status = 'pending'
+          AND EXISTS (
+              SELECT 1
+              FROM map_jobs newer
+              WHERE newer.map_id = j.map_id
+                AND newer.job_type = j.job_type
+                AND newer.status = 'pending'
+                AND (newer.created_at, newer.id) > (j.created_at, j.id)
+          )
+    """)
+    op.create_index(
+        "uq_map_jobs_pending",
+        "map_jobs",
+        ["map_id", "job_type"],
+        unique=True,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 8c1f5d2a7e40 to 3e7a91c4d2b8."""
+    op.drop_index("uq_map_jobs_pending", table_name="map_jobs", postgresql_where=sa.text("status = 'pending'"))
+    op.drop_column("map_jobs", "run_after")
+    op.drop_column("map_jobs", "affected_node_ids")
@@ -0,0 +1,50 @@
+"""added keyset pagination indexes.
+
+Revision ID: 4b7e2c9d1a63
+Revises: 8c1f5d2a7e40
+Create Date: 2026-10-19 18:02:41.318204-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+
+# revision identifiers, used by Alembic.
+revision: str = "4b7e2c9d1a63"
+down_revision: str | None = "8c1f5d2a7e40"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: 8c1f5d2a7e40 to 4b7e2c9d1a63."""
+    # The composite indexes lead with parent_node_id, so they also cover every
+    # lookup the single-column ones served.
+    op.create_index("idx_nodes_parent_node_id_name", "nodes", ["parent_node_id", "name", "id"], unique=False)
+    op.drop_index("idx_nodes_parent_node_id", table_name="nodes")
+    op.create_index("idx_nodes_layer_id_name", "nodes", ["layer_id", "name", "id"], unique=False)
+    op.create_index(
+        "idx_zip_assignments_parent_node_id_zip_code",
+        "zip_assignments",
+        ["parent_node_id", "zip_code"],
+        unique=False,
+    )
+    op.drop_index("idx_zip_assignments_parent_node_id", table_name="zip_assignments")
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 4b7e2c9d1a63 to 8c1f5d2a7e40."""
+    op.create_index("idx_zip_assignments_parent_node_id", "zip_assignments", ["parent_node_id"], unique=False)
+    op.drop_index("idx_zip_assignments_parent_node_id_zip_code", table_name="zip_assignments")
+    op.drop_index("idx_nodes_layer_id_name", table_name="nodes")
+    op.create_index("idx_nodes_parent_node_id", "nodes", ["parent_node_id"], unique=False)
+    op.drop_index("idx_nodes_parent_node_id_name", table_name="nodes")
@@ -0,0 +1,52 @@
+"""added search indexes.
+
+Revision ID: 9d3f6a1e8b25
+Revises: 4b7e2c9d1a63
+Create Date: 2026-10-19 19:14:06.552917-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+
+# revision identifiers, used by Alembic.
+revision: str = "9d3f6a1e8b25"
+down_revision: str | None = "4b7e2c9d1a63"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: 4b7e2c9d1a63 to 9d3f6a1e8b25."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.create_index(
+        "idx_nodes_name_trgm",
+        "nodes",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "idx_geography_zip_codes_zip_code_pattern",
+        "geography_zip_codes",
+        ["zip_code"],
+        unique=False,
+        postgresql_ops={"zip_code": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 9d3f6a1e8b25 to 4b7e2c9d1a63."""
+    op.drop_index("idx_geography_zip_codes_zip_code_pattern", table_name="geography_zip_codes")
+    op.drop_index("idx_nodes_name_trgm", table_name="nodes", postgresql_using="gin")
+    op.execute("DROP EXTENSION IF EXISTS pg_trgm;")
@@ -0,0 +1,88 @@
+"""added wgs84 bounding boxes.
+
+Revision ID: e51a8c7f3b90
+Revises: 9d3f6a1e8b25
+Create Date: 2026-10-19 20:21:48.907135-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e51a8c7f3b90"
+down_revision: str | None = "9d3f6a1e8b25"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_TABLES = ("geography_zip_codes", "nodes")
+_COLUMNS = ("bbox_min_lng", "bbox_min_lat", "bbox_max_lng", "bbox_max_lat")
+
+
+def _extent(alias: str) -> str:
+    return ", ".join(
+        f"{'MIN' if column.startswith('bbox_min') else 'MAX'}({alias}.{column}) AS {column}" for column in _COLUMNS
+    )
+
+
+def upgrade() -> None:
+    """Upgrade revisions: 9d3f6a1e8b25 to e51a8c7f3b90."""
+    for table in _TABLES:
+        for column in _COLUMNS:
+            op.add_column(table, sa.Column(column, sa.Float(), nullable=True))
+
+    op.execute("""
+        UPDATE geography_zip_codes
+        SET bbox_min_lng = ST_XMin(geom), bbox_min_lat = ST_YMin(geom),
+            bbox_max_lng = ST_XMax(geom), bbox_max_lat = ST_YMax(geom)
+        WHERE geom IS NOT NULL
+    """)
+
+    # Node boxes are the extent of their children's, built bottom-up one layer order at a time.
+    assignments = ", ".join(f"{column} = u.{column}" for column in _COLUMNS)
+    op.execute(f"""
+        UPDATE nodes p
+        SET {assignments}
+        FROM (
+            SELECT za.parent_node_id AS pid, {_extent("gz")}
+            FROM zip_assignments za
+            JOIN geography_zip_codes gz ON gz.zip_code = za.zip_code
+            WHERE za.parent_node_id IS NOT NULL
+            GROUP BY za.parent_node_id
+        ) u
+        WHERE p.id = u.pid
+    """)  # noqa: S608
+    max_order = op.get_bind().execute(sa.text('SELECT COALESCE(MAX("order"), 0) FROM layers')).scalar_one()
+    for order in range(2, max_order + 1):
+        op.execute(
+            sa.text(f"""
+                UPDATE nodes p
+                SET {assignments}
+                FROM (
+                    SELECT child.parent_node_id AS pid, {_extent("child")}
+                    FROM nodes child
+                    JOIN layers l ON l.id = child.layer_id
+                    WHERE l."order" = :child_order
+                      AND child.parent_node_id IS NOT NULL
+                    GROUP BY child.parent_node_id
+                ) u
+                WHERE p.id = u.pid
+            """).bindparams(child_order=order - 1)  # noqa: S608
+        )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: e51a8c7f3b90 to 9d3f6a1e8b25."""
+    for table in _TABLES:
+        for column in _COLUMNS:
+            op.drop_column(table, column)
@@ -0,0 +1,57 @@
+"""added spatial selections.
+
+Revision ID: 7a2d4e9c1f58
+Revises: e51a8c7f3b90
+Create Date: 2026-10-19 21:37:42.118305-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7a2d4e9c1f58"
+down_revision: str | None = "e51a8c7f3b90"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: e51a8c7f3b90 to 7a2d4e9c1f58."""
+    op.create_table(
+        "spatial_selections",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("token", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("layer_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("zip_code", sa.String(length=5), nullable=True),
+        sa.Column("node_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["layer_id"], ["layers.id"], name=op.f("fk_spatial_selections_layer_id_layers"), ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name=op.f("fk_spatial_selections_user_id_users"), ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_spatial_selections")),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index("idx_spatial_selections_token", "spatial_selections", ["token"], unique=False)
+    op.create_index("idx_spatial_selections_expires_at", "spatial_selections", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 7a2d4e9c1f58 to e51a8c7f3b90."""
+    op.drop_index("idx_spatial_selections_expires_at", table_name="spatial_selections")
+    op.drop_index("idx_spatial_selections_token", table_name="spatial_selections")
+    op.drop_table("spatial_selections")
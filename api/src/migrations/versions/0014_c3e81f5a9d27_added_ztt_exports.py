@@ -0,0 +1,51 @@
+"""added ztt exports.
+
+Revision ID: c3e81f5a9d27
+Revises: 7a2d4e9c1f58
+Create Date: 2026-10-19 22:41:09.530172-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e81f5a9d27"
+down_revision: str | None = "7a2d4e9c1f58"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: 7a2d4e9c1f58 to c3e81f5a9d27."""
+    op.create_table(
+        "ztt_exports",
+        sa.Column("id", sa.UUID(as_uuid=False), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("map_id", sa.UUID(as_uuid=False), nullable=False),
+        sa.Column("tile_version", sa.Integer(), nullable=False),
+        sa.Column("format", sa.Enum("xlsx", "csv", native_enum=False), nullable=False),
+        sa.Column("layout_hash", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.Enum("generating", "complete", "failed", native_enum=False), nullable=False),
+        sa.Column("s3_key", sa.String(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["map_id"], ["maps.id"], name=op.f("fk_ztt_exports_map_id_maps"), ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_ztt_exports")),
+        sa.UniqueConstraint("map_id", "tile_version", "format", "layout_hash", name=op.f("uq_ztt_exports_map_id")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: c3e81f5a9d27 to 7a2d4e9c1f58."""
+    op.drop_table("ztt_exports")
@@ -0,0 +1,38 @@
+"""added ztt exports assigned only.
+
+Revision ID: 5f0b7d3c2a91
+Revises: c3e81f5a9d27
+Create Date: 2026-10-20 09:12:44.207315-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5f0b7d3c2a91"
+down_revision: str | None = "c3e81f5a9d27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: c3e81f5a9d27 to 5f0b7d3c2a91."""
+    op.add_column(
+        "ztt_exports", sa.Column("assigned_only", sa.Boolean(), server_default=sa.text("false"), nullable=False)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 5f0b7d3c2a91 to c3e81f5a9d27."""
+    op.drop_column("ztt_exports", "assigned_only")
@@ -0,0 +1,52 @@
+"""added maps edit version.
+
+Revision ID: 9a4c6e1b7d02
+Revises: 5f0b7d3c2a91
+Create Date: 2026-10-20 14:37:05.618920-07:00
+
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, cast
+
+from alembic import op as _op
+
+if TYPE_CHECKING:
+    from geoalchemy2.alembic_helpers import GeoAlchemyOperations
+
+    op: GeoAlchemyOperations = cast("GeoAlchemyOperations", _op)
+else:
+    op = _op  # type: ignore[assignment]
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4c6e1b7d02"
+down_revision: str | None = "5f0b7d3c2a91"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade revisions: 5f0b7d3c2a91 to 9a4c6e1b7d02."""
+    op.add_column("maps", sa.Column("edit_version", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("ztt_exports", sa.Column("edit_version", sa.Integer(), server_default="0", nullable=False))
+    op.drop_constraint(op.f("uq_ztt_exports_map_id"), "ztt_exports", type_="unique")
+    op.create_unique_constraint(
+        op.f("uq_ztt_exports_map_id"),
+        "ztt_exports",
+        ["map_id", "tile_version", "edit_version", "format", "layout_hash"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade revisions: 9a4c6e1b7d02 to 5f0b7d3c2a91."""
+    # Rows that only differ by edit_version would collide under the old key.
+    op.execute("DELETE FROM ztt_exports")
+    op.drop_constraint(op.f("uq_ztt_exports_map_id"), "ztt_exports", type_="unique")
+    op.create_unique_constraint(
+        op.f("uq_ztt_exports_map_id"),
+        "ztt_exports",
+        ["map_id", "tile_version", "format", "layout_hash"],
+    )
+    op.drop_column("ztt_exports", "edit_version")
+    op.drop_column("maps", "edit_version")
@@ -2,12 +2,13 @@
 
 from .accounts import UserModel
 from .base import Base
-from .cache import MvtTileCacheModel
-from .exports import MapExportModel, MapExportSlideModel
+from .cache import MvtMapTileCacheModel, MvtTileCacheModel
+from .exports import MapExportModel, MapExportSlideModel, ZttExportModel
 from .geography import ZipCodeGeography
 from .graph import LayerModel, MapModel, NodeModel, ZipAssignmentModel
 from .jobs import MapJobModel
 from .permissions import UserMapRoleModel, UserUploadRoleModel
+from .spatial import SpatialSelectionModel
 from .uploads import MapUploadModel
 
 __all__ = [
@@ -18,11 +19,14 @@ __all__ = [
     "MapJobModel",
     "MapModel",
     "MapUploadModel",
+    "MvtMapTileCacheModel",
     "MvtTileCacheModel",
     "NodeModel",
+    "SpatialSelectionModel",
     "UserMapRoleModel",
     "UserModel",
     "UserUploadRoleModel",
     "ZipAssignmentModel",
     "ZipCodeGeography",
+    "ZttExportModel",
 ]
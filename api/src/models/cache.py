@@ -9,8 +9,9 @@ from src.models.base import Base, TimestampMixin
 class MvtTileCacheModel(Base, TimestampMixin):
     """Pre-rendered MVT tile cache.
 
-    Keyed by (layer_id, endpoint, z, x, y). No revision in the key — tiles are
-    explicitly invalidated by the recompute worker when affected geometries change.
+    Keyed by (layer_id, endpoint, z, x, y). Each tile is stamped with the map's
+    tile_version it was rendered under and only served while that is still the
+    map's tile_version; see mvt_cache.advance_generation.
     """
 
     __tablename__ = "mvt_tile_cache"
@@ -21,3 +22,22 @@ class MvtTileCacheModel(Base, TimestampMixin):
     x: Mapped[int] = mapped_column(primary_key=True)
     y: Mapped[int] = mapped_column(primary_key=True)
     tile_bytes: Mapped[bytes] = mapped_column(LargeBinary)
+    generation: Mapped[int] = mapped_column(default=0, server_default="0")
+
+
+class MvtMapTileCacheModel(Base, TimestampMixin):
+    """Pre-rendered map-level MVT tile cache.
+
+    One tile holds every layer of a map as named sub-layers, so it is cached and
+    invalidated as a unit: any change that drops a layer tile also drops the
+    map tile covering the same (z, x, y). Generation-fenced like MvtTileCacheModel.
+    """
+
+    __tablename__ = "mvt_map_tile_cache"
+
+    map_id: Mapped[str] = mapped_column(ForeignKey("maps.id"), primary_key=True)
+    z: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    x: Mapped[int] = mapped_column(primary_key=True)
+    y: Mapped[int] = mapped_column(primary_key=True)
+    tile_bytes: Mapped[bytes] = mapped_column(LargeBinary)
+    generation: Mapped[int] = mapped_column(default=0, server_default="0")
@@ -1,8 +1,8 @@
-"""PPT export models."""
+"""Export models."""
 
 from typing import Any, Literal
 
-from sqlalchemy import ForeignKey, Index, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, declared_attr, mapped_column
 
@@ -68,3 +68,32 @@ class MapExportSlideModel(Base, TimestampMixin):
             UniqueConstraint("export_id", "order"),
             Index("idx_map_export_slides_export_id", "export_id"),
         )
+
+
+class ZttExportModel(Base, TimestampMixin):
+    """A ZTT export built by a worker and kept in S3 for every download of the same map state.
+
+    Edits to zips and nodes bump the map's tile_version or edit_version and
+    layout_hash covers the rest of what the file shows (map and layer names, data
+    fields), so a map that has not changed reuses its last file. Building a newer file deletes the older
+    ones for the map, format and layout.
+    """
+
+    __tablename__ = "ztt_exports"
+    __table_args__ = (UniqueConstraint("map_id", "tile_version", "edit_version", "format", "layout_hash"),)
+
+    id: Mapped[uuidpk] = mapped_column(init=False)
+    map_id: Mapped[str] = mapped_column(ForeignKey("maps.id", ondelete="CASCADE"))
+    tile_version: Mapped[int]
+    edit_version: Mapped[int] = mapped_column(server_default="0")
+    format: Mapped[Literal["xlsx", "csv"]]
+    layout_hash: Mapped[str] = mapped_column(String(64))
+    status: Mapped[Literal["generating", "complete", "failed"]]
+    assigned_only: Mapped[bool] = mapped_column(default=False, server_default="false")
+    """Only zips assigned to a territory, rather than every zip in the country. Part of layout_hash too."""
+
+    s3_key: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    """Private S3 key of the built file. Null until the generate task completes."""
+
+    error: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    """Failure reason when status='failed'."""
@@ -2,7 +2,7 @@
 
 from geoalchemy2 import Geometry
 from geoalchemy2.elements import WKBElement
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models.base import Base, TimestampMixin
@@ -12,6 +12,14 @@ class ZipCodeGeography(Base, TimestampMixin):
     """Zip code geography model."""
 
     __tablename__ = "geography_zip_codes"
+    __table_args__ = (
+        # Serves zip_code LIKE 'prefix%' whatever the database collation; the primary key only does under "C".
+        Index(
+            "idx_geography_zip_codes_zip_code_pattern",
+            "zip_code",
+            postgresql_ops={"zip_code": "varchar_pattern_ops"},
+        ),
+    )
 
     zip_code: Mapped[str] = mapped_column(String(5), primary_key=True)
     color: Mapped[str] = mapped_column(String(7), nullable=False)
@@ -22,19 +30,35 @@ class ZipCodeGeography(Base, TimestampMixin):
         deferred=True,
     )
     """Full-resolution 4326 master geometry, preserved as source of truth.
-    All rendering and recompute work runs against the 3857 simplified columns below."""
+    All rendering and recompute work runs against the 3857 simplified columns below,
+    one per tier of src.models.geometry.GEOMETRY_TIERS."""
     geom_z3_merc: Mapped[WKBElement | None] = mapped_column(
         Geometry(srid=3857),
         nullable=True,
         deferred=True,
     )
+    geom_z5_merc: Mapped[WKBElement | None] = mapped_column(
+        Geometry(srid=3857),
+        nullable=True,
+        deferred=True,
+    )
     geom_z7_merc: Mapped[WKBElement | None] = mapped_column(
         Geometry(srid=3857),
         nullable=True,
         deferred=True,
     )
+    geom_z9_merc: Mapped[WKBElement | None] = mapped_column(
+        Geometry(srid=3857),
+        nullable=True,
+        deferred=True,
+    )
     geom_z11_merc: Mapped[WKBElement | None] = mapped_column(
         Geometry(srid=3857),
         nullable=True,
         deferred=True,
     )
+    bbox_min_lng: Mapped[float | None] = mapped_column(nullable=True, default=None)
+    bbox_min_lat: Mapped[float | None] = mapped_column(nullable=True, default=None)
+    bbox_max_lng: Mapped[float | None] = mapped_column(nullable=True, default=None)
+    bbox_max_lat: Mapped[float | None] = mapped_column(nullable=True, default=None)
+    """WGS-84 bounding box of ``geom``; see src.models.geometry.BBOX_COLUMNS."""
@@ -0,0 +1,38 @@
+"""Geometry pyramid shared by zip geographies and nodes."""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class GeometryTier:
+    """One pre-simplified 3857 geometry column.
+
+    Zip tiers are snapped from the 4326 master geometry; node tiers are unions of
+    the same tier on their children, so a tier never needs re-simplification.
+    """
+
+    column: str
+    zoom: int
+    """Zoom level the tier is built for."""
+    snap_m: float
+    """ST_SnapToGrid tolerance in meters — one 256px screen pixel at ``zoom``, rounded."""
+
+
+GEOMETRY_TIERS: tuple[GeometryTier, ...] = (
+    GeometryTier(column="geom_z3_merc", zoom=3, snap_m=19568.0),
+    GeometryTier(column="geom_z5_merc", zoom=5, snap_m=4892.0),
+    GeometryTier(column="geom_z7_merc", zoom=7, snap_m=1223.0),
+    GeometryTier(column="geom_z9_merc", zoom=9, snap_m=306.0),
+    GeometryTier(column="geom_z11_merc", zoom=11, snap_m=76.0),
+)
+"""Coarsest to finest. Adding a tier takes a migration that adds, backfills and
+GIST-indexes the column on geography_zip_codes and nodes, plus the mapped columns
+on ZipCodeGeography and NodeModel. Rendering and recompute pick it up from here."""
+
+BBOX_COLUMNS: tuple[str, str, str, str] = ("bbox_min_lng", "bbox_min_lat", "bbox_max_lng", "bbox_max_lat")
+"""WGS-84 bounding box columns on geography_zip_codes and nodes, west/south/east/north.
+
+A zip's box is taken from its full-resolution master geometry; a node's is the
+extent of its children's boxes, maintained by ComputationService with the tiers.
+Null where there is no geometry. Search and slide framing read these instead of
+projecting envelopes."""
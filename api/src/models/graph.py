@@ -20,6 +20,9 @@ class MapModel(Base, TimestampMixin):
     name: Mapped[str]
     tile_version: Mapped[int] = mapped_column(default=0, server_default="0")
     """Incremented after each successful geometry recompute. Used by the frontend to cache-bust MVT tile URLs."""
+    edit_version: Mapped[int] = mapped_column(default=0, server_default="0")
+    """Incremented by every edit that leaves its recompute to a map job, when the edit commits.
+    tile_version only moves once the job runs, so caches of the map's rows (ZTT exports) key on both."""
     data_field_config: Mapped[list[dict[str, Any]] | None] = mapped_column(
         JSONB,
         nullable=True,
@@ -76,17 +79,32 @@ class NodeModel(Base, TimestampMixin):
         nullable=True,
         deferred=True,
     )
+    geom_z5_merc: Mapped[WKBElement | None] = mapped_column(
+        Geometry(srid=3857),
+        nullable=True,
+        deferred=True,
+    )
     geom_z7_merc: Mapped[WKBElement | None] = mapped_column(
         Geometry(srid=3857),
         nullable=True,
         deferred=True,
     )
+    geom_z9_merc: Mapped[WKBElement | None] = mapped_column(
+        Geometry(srid=3857),
+        nullable=True,
+        deferred=True,
+    )
     geom_z11_merc: Mapped[WKBElement | None] = mapped_column(
         Geometry(srid=3857),
         nullable=True,
         deferred=True,
     )
     parent_node_id: Mapped[int | None] = mapped_column(ForeignKey("nodes.id"), nullable=True)
+    bbox_min_lng: Mapped[float | None] = mapped_column(nullable=True, default=None)
+    bbox_min_lat: Mapped[float | None] = mapped_column(nullable=True, default=None)
+    bbox_max_lng: Mapped[float | None] = mapped_column(nullable=True, default=None)
+    bbox_max_lat: Mapped[float | None] = mapped_column(nullable=True, default=None)
+    """WGS-84 bounding box; see src.models.geometry.BBOX_COLUMNS."""
 
     @classmethod
     def __declare_last__(cls):
@@ -115,7 +133,12 @@ class NodeModel(Base, TimestampMixin):
         return (
             UniqueConstraint("layer_id", "name"),
             Index("idx_nodes_layer_id", "layer_id"),
-            Index("idx_nodes_parent_node_id", "parent_node_id"),
+            # Serves name ILIKE searches (see src.services.search); needs the pg_trgm extension.
+            Index("idx_nodes_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+            # Serves child listings in the (name, id) order POST /nodes/query pages by,
+            # and layer listings in the same order.
+            Index("idx_nodes_parent_node_id_name", "parent_node_id", "name", "id"),
+            Index("idx_nodes_layer_id_name", "layer_id", "name", "id"),
         )
 
 
@@ -150,5 +173,5 @@ class ZipAssignmentModel(Base, TimestampMixin):
         """Table args for ZipAssignmentModel."""
         return (
             UniqueConstraint("layer_id", "zip_code"),
-            Index("idx_zip_assignments_parent_node_id", "parent_node_id"),
+            Index("idx_zip_assignments_parent_node_id_zip_code", "parent_node_id", "zip_code"),
         )
@@ -1,26 +1,49 @@
 """Job tracking models."""
 
+from datetime import datetime
 from typing import Literal
 
-from sqlalchemy import ForeignKey, Index, String, Text
+from sqlalchemy import ForeignKey, Index, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, declared_attr, mapped_column
 
 from src.models.base import Base, TimestampMixin
 
+MapJobType = Literal["recompute_geometry", "recompute_data"]
+MapJobStatus = Literal["pending", "processing", "complete", "failed"]
+
 
 class MapJobModel(Base, TimestampMixin):
-    """Tracks background jobs scoped to a map (import, recompute, etc.)."""
+    """Tracks background jobs scoped to a map (import, recompute, etc.).
+
+    A map has at most one pending job per type: edits made while one is pending
+    fold their affected nodes into it (see services/map_jobs.py).
+    """
 
     __tablename__ = "map_jobs"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     map_id: Mapped[str] = mapped_column(ForeignKey("maps.id"))
-    job_type: Mapped[Literal["recompute_geometry", "recompute_data"]]
-    status: Mapped[Literal["pending", "processing", "complete", "failed"]]
+    job_type: Mapped[MapJobType]
+    status: Mapped[MapJobStatus]
     step: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
     error: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    affected_node_ids: Mapped[list[int] | None] = mapped_column(JSONB, nullable=True, default=None)
+    """Nodes whose geometry and data the job recomputes, with their ancestors."""
+    run_after: Mapped[datetime | None] = mapped_column(nullable=True, default=None)
+    """Earliest time a pending job may start; pushed back by each edit folded into it."""
 
     @declared_attr.directive
     def __table_args__(cls):
         """Table args for MapJobModel."""
-        return (Index("idx_map_jobs_map_id", "map_id"),)
+        pending: MapJobStatus = "pending"
+        return (
+            Index("idx_map_jobs_map_id", "map_id"),
+            Index(
+                "uq_map_jobs_pending",
+                "map_id",
+                "job_type",
+                unique=True,
+                postgresql_where=text(f"status = '{pending}'"),
+            ),
+        )
@@ -0,0 +1,36 @@
+"""Spatial selection models."""
+
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base, intpk
+
+
+class SpatialSelectionModel(Base):
+    """One feature of a lasso selection, kept briefly so later calls can name the selection by token.
+
+    Follow-up requests (summary, bulk assign, reparent) join against these rows
+    instead of shipping the ids back. The table is UNLOGGED: it skips the WAL and
+    is emptied by a crash, which only costs clients a fresh lasso. Rows expire
+    after SPATIAL_SELECTION_TTL_S and are swept whenever a selection is stored.
+    """
+
+    __tablename__ = "spatial_selections"
+    __table_args__ = (
+        Index("idx_spatial_selections_token", "token"),
+        Index("idx_spatial_selections_expires_at", "expires_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+    id: Mapped[intpk] = mapped_column(init=False)
+    token: Mapped[str] = mapped_column(PgUUID(as_uuid=False))
+    layer_id: Mapped[int] = mapped_column(ForeignKey("layers.id", ondelete="CASCADE"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    expires_at: Mapped[datetime]
+    zip_code: Mapped[str | None] = mapped_column(String(5), nullable=True, default=None)
+    """Set for zip (order=0) layers."""
+    node_id: Mapped[int | None] = mapped_column(nullable=True, default=None)
+    """Set for node (order>=1) layers. Not a foreign key, so deleting a node never waits on selections."""
@@ -52,5 +52,8 @@ class MapUploadModel(Base, TimestampMixin):
     # Populated during / after the import phase
     import_step: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
     warnings: Mapped[list[str] | None] = mapped_column(JSONB, nullable=True, default=None)
+    import_profile: Mapped[list[Any] | None] = mapped_column(JSONB, nullable=True, default=None)
+    """Per-stage import profile: [{"step": str, "wall_ms": int, "db_ms": int, "db_statements": int,
+    "rows": int | None, "peak_rss_kb": int | None}, ...] in execution order."""
 
     __table_args__ = (Index("idx_map_uploads_s3_key", "s3_key"),)
@@ -2,12 +2,14 @@
 
 import logging
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Response, status
 
 from src.app.database import DatabaseSession
+from src.models.accounts import UserModel
+from src.routers.auth import set_auth_cookie
 from src.schemas.accounts import User
 from src.schemas.dtos.accounts import UpdateMeDTO
-from src.services.auth import CurrentUserDependency
+from src.services.auth import AuthServiceDependency, CurrentUserDependency, access_claims
 
 accounts_router = APIRouter(
     prefix="/me",
@@ -32,16 +34,23 @@ def get_me(
 @accounts_router.patch("", response_model=User)
 def update_me(
     body: UpdateMeDTO,
+    response: Response,
     current_user: CurrentUserDependency,
     db: DatabaseSession,
+    auth_service: AuthServiceDependency,
 ):
     """Update the current user's name."""
-    current_user.name = body.name
+    user = db.get(UserModel, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed")
+    user.name = body.name
     db.commit()
+    # The access token carries the name; reissue it so later requests see the change.
+    set_auth_cookie(response, auth_service.create_access_token(data=access_claims(user)), "access_token")
     return User(
-        id=current_user.id,
-        email=current_user.email,
-        name=current_user.name,
+        id=user.id,
+        email=user.email,
+        name=user.name,
     )
 
 
@@ -7,9 +7,10 @@ from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from src.app.config import app_settings
 from src.app.database import DatabaseSession
+from src.models.accounts import UserModel
 from src.schemas.accounts import User
 from src.schemas.dtos.auth import LoginDTO, RegisterDTO
-from src.services.auth import AuthenticationError, AuthServiceDependency, JWTPayloadData
+from src.services.auth import AuthenticationError, AuthServiceDependency, JWTPayloadData, access_claims
 
 auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -58,7 +59,7 @@ def register(
         db.rollback()
         raise
 
-    access_token = auth_service.create_access_token(data=JWTPayloadData(sub=str(user.id), type="access"))
+    access_token = auth_service.create_access_token(data=access_claims(user))
     set_auth_cookie(response, access_token, "access_token")
 
     db.commit()
@@ -84,7 +85,7 @@ def login(
         ) from err
 
     # Create access token
-    access_token = auth_service.create_access_token(data=JWTPayloadData(sub=str(user.id), type="access"))
+    access_token = auth_service.create_access_token(data=access_claims(user))
     set_auth_cookie(response, access_token, "access_token")
 
     # Create refresh token if "Remember Me" is enabled
@@ -99,7 +100,12 @@ def login(
 
 
 @auth_router.post("/refresh-token", response_model=None)
-def refresh_token(request: Request, response: Response, auth_service: AuthServiceDependency):
+def refresh_token(
+    request: Request,
+    response: Response,
+    db: DatabaseSession,
+    auth_service: AuthServiceDependency,
+):
     """Refresh the access token using the refresh token."""
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
@@ -117,8 +123,14 @@ def refresh_token(request: Request, response: Response, auth_service: AuthServic
                 detail="Invalid token type",
             )
 
-        # Create a new access token
-        new_access_token = auth_service.create_access_token(data=JWTPayloadData(sub=payload.get("sub"), type="access"))
+        # The access token carries the user's email and name, so read them fresh
+        user = db.get(UserModel, int(payload.get("sub") or 0))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+            )
+        new_access_token = auth_service.create_access_token(data=access_claims(user))
         set_auth_cookie(response, new_access_token, "access_token")
 
     except jwt.ExpiredSignatureError:
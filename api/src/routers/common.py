@@ -3,13 +3,20 @@
 import logging
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import get_args
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
 from pydantic import AwareDatetime, BaseModel
+from sqlalchemy import func, select
 from sqlalchemy.sql import text
 
 import src
+from src.app.config import app_settings
 from src.app.database import DatabaseSession
+from src.app.metrics import StaticCollector, render_latest
+from src.models.jobs import MapJobModel, MapJobType
 
 logger = logging.getLogger(__name__)
 
@@ -56,3 +63,29 @@ def versions():
     return VersionResponseDTO(
         api=api_version,
     )
+
+
+@common_router.get(path="/metrics", include_in_schema=False)
+def metrics(db: DatabaseSession):
+    """Prometheus metrics for every API process, plus map job queue depth read at scrape time.
+
+    Unauthenticated like the heartbeats, so it 404s unless METRICS_ENABLED is set.
+    """
+    if not app_settings.metrics.enabled:
+        raise HTTPException(404)
+    # Zero-fill so an empty queue still reports 0 rather than dropping the series.
+    counts = {(job_type, status): 0 for job_type in get_args(MapJobType) for status in ("pending", "processing")}
+    rows = db.execute(
+        select(MapJobModel.job_type, MapJobModel.status, func.count())
+        .where(MapJobModel.status.in_(("pending", "processing")))
+        .group_by(MapJobModel.job_type, MapJobModel.status)
+    ).tuples()
+    for job_type, status, count in rows:
+        counts[job_type, status] = count
+
+    queue_depth = GaugeMetricFamily(
+        "terramaps_map_jobs", "Map jobs waiting for or held by a worker.", labels=["job_type", "status"]
+    )
+    for (job_type, status), count in counts.items():
+        queue_depth.add_metric([job_type, status], count)
+    return Response(content=render_latest(StaticCollector([queue_depth])), media_type=CONTENT_TYPE_LATEST)
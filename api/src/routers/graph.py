@@ -1,19 +1,18 @@
 """Graph router."""
 
-import uuid
 from collections.abc import Sequence
+from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from geoalchemy2.functions import ST_Envelope, ST_Transform, ST_XMax, ST_XMin, ST_YMax, ST_YMin
-from sqlalchemy import and_, delete, func, select
-from sqlalchemy.orm import undefer
+from fastapi import APIRouter, HTTPException, Response
+from sqlalchemy import and_, delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
 
-from src.app.database import DatabaseSession
+from src.app.config import app_settings
+from src.app.database import AsyncDatabaseSession, DatabaseSession
 from src.exceptions import TerramapsException
-from src.models.cache import MvtTileCacheModel
 from src.models.geography import ZipCodeGeography
 from src.models.graph import LayerModel, MapModel, NodeModel, ZipAssignmentModel
-from src.models.jobs import MapJobModel
 from src.schemas.dtos.graph import (
     AssignZip,
     BulkAssignZips,
@@ -28,6 +27,7 @@ from src.schemas.dtos.graph import (
     ZipQuery,
 )
 from src.schemas.graph import (
+    MAP_JOB_ID_HEADER,
     Layer,
     LayerDataStats,
     Node,
@@ -38,52 +38,36 @@ from src.schemas.graph import (
     SearchResults,
     ZipAssignment,
 )
-from src.services.auth import CurrentUserDependency
-from src.services.computation import ComputationService, ComputationServiceDependency
+from src.services import map_jobs, mvt_cache, selections
+from src.services.auth import AsyncCurrentUserDependency, CurrentUserDependency
+from src.services.computation import ComputationService
 from src.services.graph import GraphServiceDependency
-from src.services.permissions import PermissionsServiceDependency
+from src.services.pagination import (
+    InvalidCursorError,
+    TotalMode,
+    count_rows,
+    decode_cursor,
+    encode_cursor,
+    total_pages,
+)
+from src.services.permissions import AsyncPermissionsServiceDependency, PermissionsServiceDependency
+from src.services.search import name_contains, name_matches, name_rank, results_cache, zip_prefix
 from src.workers.tasks.maps import recompute_nodes_task
 
 graph_router = APIRouter(prefix="", tags=["Graph"])
 
 
-def _bump_tile_version(db: DatabaseSession, map_id: str) -> None:
-    """Increment tile_version so clients know to re-fetch tiles."""
-    map_model = db.get(MapModel, map_id)
-    if map_model:
-        map_model.tile_version += 1
-
-
-def _nuke_map_tile_cache(db: DatabaseSession, map_id: str) -> None:
-    """Delete every cached MVT tile for every layer in the map.
+def _schedule_recompute(db: DatabaseSession, map_id: str, affected_ids: set[int]) -> str:
+    """Fold affected_ids into the map's pending recompute job, commit, and return the job ID.
 
-    Why: name/color edits, deletes, and shrinking geometry can leave stale tiles
-    behind when invalidation is bbox-scoped or layer-scoped. Until each endpoint
-    is audited individually, prefer over-invalidation over stale-tile bugs.
+    Only a newly created job is dispatched; a pending one already has its task
+    queued and picks up the folded nodes when it runs. See services/map_jobs.py.
     """
-    db.execute(
-        delete(MvtTileCacheModel).where(
-            MvtTileCacheModel.layer_id.in_(select(LayerModel.id).where(LayerModel.map_id == map_id))
-        )
-    )
-
-
-def _enqueue_recompute(db: DatabaseSession, map_id: str) -> str:
-    """Stage a pending MapJobModel recompute record and return its ID.
-
-    Caller must commit before dispatching the Celery task so the worker
-    sees the committed job row.
-    """
-    job_id = str(uuid.uuid4())
-    db.add(
-        MapJobModel(
-            id=job_id,
-            map_id=map_id,
-            job_type="recompute_geometry",
-            status="pending",
-        )
-    )
-    return job_id
+    job, created = map_jobs.schedule_recompute(db, map_id, affected_ids)
+    db.commit()
+    if created:
+        recompute_nodes_task.apply_async(args=[job.id, map_id], countdown=app_settings.celery.recompute_debounce_s)
+    return job.id
 
 
 # ---------------------------------------------------------------------------
@@ -112,11 +96,14 @@ def create_layer(
 
 
 def _layer_data_stats(
-    computation_service: ComputationService,
+    db: Session,
     map_model: MapModel | None,
     layer: LayerModel,
 ) -> dict[str, LayerDataStats] | None:
-    """Compute live min/max per MVT property for a layer, or None if no fields."""
+    """Compute live min/max per MVT property for a layer, or None if no fields.
+
+    Takes the session first so async routes can call it through ``run_sync``.
+    """
     if not map_model or not map_model.data_field_config:
         return None
     number_fields = [
@@ -125,7 +112,7 @@ def _layer_data_stats(
     ]
     if not number_fields:
         return None
-    raw = computation_service.compute_layer_data_stats(layer.id, layer.order, number_fields)
+    raw = ComputationService(db=db).compute_layer_data_stats(layer.id, layer.order, number_fields)
     if not raw:
         return None
     return {
@@ -135,30 +122,29 @@ def _layer_data_stats(
 
 
 @graph_router.get("/layers", response_model=list[Layer])
-def list_layers(
-    db: DatabaseSession,
+async def list_layers(
+    db: AsyncDatabaseSession,
     map_id: str,
-    current_user: CurrentUserDependency,
-    permission_service: PermissionsServiceDependency,
-    computation_service: ComputationServiceDependency,
+    current_user: AsyncCurrentUserDependency,
+    permission_service: AsyncPermissionsServiceDependency,
 ) -> list[Layer]:
     """List layers."""
-    if not permission_service.check_for_map_access(
+    if not await permission_service.check_for_map_access(
         user_id=current_user.id,
         map_id=map_id,
         map_roles=["OWNER", "MEMBER"],
     ):
         raise HTTPException(403, "User does not have permission to this map.")
-    map_model = db.get(MapModel, map_id)
+    map_model = await db.get(MapModel, map_id)
     return [
         Layer(
             id=layer.id,
             map_id=map_id,
             name=layer.name,
             order=layer.order,
-            data_stats=_layer_data_stats(computation_service, map_model, layer),
+            data_stats=await db.run_sync(_layer_data_stats, map_model, layer),
         )
-        for layer in db.execute(select(LayerModel).where(LayerModel.map_id == map_id)).scalars().all()
+        for layer in (await db.scalars(select(LayerModel).where(LayerModel.map_id == map_id))).all()
     ]
 
 
@@ -168,7 +154,6 @@ def get_layer(
     db: DatabaseSession,
     current_user: CurrentUserDependency,
     permission_service: PermissionsServiceDependency,
-    computation_service: ComputationServiceDependency,
 ):
     """Get a layer by id."""
     layer = db.get(LayerModel, layer_id)
@@ -186,7 +171,7 @@ def get_layer(
         map_id=layer.map_id,
         name=layer.name,
         order=layer.order,
-        data_stats=_layer_data_stats(computation_service, map_model, layer),
+        data_stats=_layer_data_stats(db, map_model, layer),
     )
 
 
@@ -217,8 +202,7 @@ def create_node(
         if e.code == 400 or e.code == 402:
             raise HTTPException(404, e.msg) from e
         raise HTTPException(400, e.msg) from e
-    _nuke_map_tile_cache(db, layer.map_id)
-    _bump_tile_version(db, layer.map_id)
+    mvt_cache.advance_generation(db, layer.map_id, ComputationService(db=db).node_regions({new_node.id}))
     db.commit()
     return Node(
         id=new_node.id,
@@ -230,48 +214,61 @@ def create_node(
     )
 
 
-def _resolve_node_query_map_id(db: DatabaseSession, body: NodeQuery) -> str:
+async def _resolve_node_query_map_id(db: AsyncSession, body: NodeQuery) -> str:
     """Derive map_id from whichever anchor field is present in a NodeQuery."""
     if body.layer_id is not None:
-        layer = db.get(LayerModel, body.layer_id)
+        layer = await db.get(LayerModel, body.layer_id)
         if not layer:
             raise HTTPException(404, "Layer not found")
         if layer.order == 0:
             raise HTTPException(400, "Layer order=0 is the zip layer. Use /zip-assignments instead.")
         return layer.map_id
     if body.parent_node_id is not None:
-        parent = db.get(NodeModel, body.parent_node_id)
-        layer = db.get(LayerModel, parent.layer_id) if parent else None
+        parent = await db.get(NodeModel, body.parent_node_id)
+        layer = await db.get(LayerModel, parent.layer_id) if parent else None
         if not layer:
             raise HTTPException(404, "Parent node not found")
         return layer.map_id
     # ids-only path
-    anchor = db.get(NodeModel, body.ids[0])  # type: ignore[index]
-    layer = db.get(LayerModel, anchor.layer_id) if anchor else None
+    anchor = await db.get(NodeModel, body.ids[0])  # type: ignore[index]
+    layer = await db.get(LayerModel, anchor.layer_id) if anchor else None
     if not layer:
         raise HTTPException(404, "Node not found")
     return layer.map_id
 
 
+def _decode_cursor(cursor: str, *types: type[str] | type[int]) -> tuple[Any, ...]:
+    try:
+        return decode_cursor(cursor, *types)
+    except InvalidCursorError:
+        raise HTTPException(400, "Invalid cursor") from None
+
+
 @graph_router.post("/nodes/query", response_model=PaginatedNodes)
-def query_nodes(
+async def query_nodes(
     body: NodeQuery,
-    db: DatabaseSession,
-    current_user: CurrentUserDependency,
-    permission_service: PermissionsServiceDependency,
+    db: AsyncDatabaseSession,
+    current_user: AsyncCurrentUserDependency,
+    permission_service: AsyncPermissionsServiceDependency,
     page: int = 1,
     page_size: int = 50,
+    cursor: str | None = None,
+    total_mode: TotalMode = "exact",
 ):
     """Query nodes with optional filters. At least one of layer_id, parent_node_id, or ids required.
 
     All provided filters are combined with AND. Results are ordered by name.
     Replaces GET /nodes — use this for layer listing, parent picking, and selection detail.
+
+    Pass the previous response's next_cursor to get the page after it instead of
+    page; each cursor page costs the same however deep it is. total_mode picks an
+    exact count, the planner's estimate, or none.
     """
     if body.layer_id is None and body.parent_node_id is None and not body.ids:
         raise HTTPException(400, "Provide at least one of: layer_id, parent_node_id, ids")
 
-    map_id = _resolve_node_query_map_id(db, body)
-    if not permission_service.check_for_map_access(
+    map_id = await _resolve_node_query_map_id(db, body)
+    if not await permission_service.check_for_map_access(
         user_id=current_user.id, map_id=map_id, map_roles=["OWNER", "MEMBER"]
     ):
         raise HTTPException(403)
@@ -284,17 +281,19 @@ def query_nodes(
     if body.ids:
         conditions.append(NodeModel.id.in_(body.ids))
     if body.search:
-        conditions.append(NodeModel.name.ilike(f"%{body.search}%"))
-
-    total = db.execute(select(func.count(NodeModel.id)).where(*conditions)).scalar() or 0
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
-    offset = (page - 1) * page_size
-    nodes = (
-        db
-        .execute(select(NodeModel).where(*conditions).order_by(NodeModel.name).offset(offset).limit(page_size))
-        .scalars()
-        .all()
-    )
+        conditions.append(name_contains(NodeModel.name, body.search))
+
+    count_stmt = select(NodeModel.id).where(*conditions)
+    total = await db.run_sync(lambda session: count_rows(session, count_stmt, total_mode))
+    stmt = select(NodeModel).where(*conditions).order_by(NodeModel.name, NodeModel.id)
+    if cursor is not None:
+        after_name, after_id = _decode_cursor(cursor, str, int)
+        stmt = stmt.where(tuple_(NodeModel.name, NodeModel.id) > tuple_(after_name, after_id))
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+    # One row past the page tells whether there is a next one.
+    nodes = (await db.scalars(stmt.limit(page_size + 1))).all()
+    next_cursor = encode_cursor(nodes[page_size - 1].name, nodes[page_size - 1].id) if len(nodes) > page_size else None
 
     return PaginatedNodes(
         nodes=[
@@ -306,12 +305,13 @@ def query_nodes(
                 parent_node_id=n.parent_node_id,
                 child_count=n.child_count,
             )
-            for n in nodes
+            for n in nodes[:page_size]
         ],
         total=total,
-        page=page,
+        page=page if cursor is None else None,
         page_size=page_size,
-        total_pages=total_pages,
+        total_pages=total_pages(total, page_size),
+        next_cursor=next_cursor,
     )
 
 
@@ -389,11 +389,14 @@ def update_node(
     graph_service: GraphServiceDependency,
     permission_service: PermissionsServiceDependency,
     current_user: CurrentUserDependency,
-    computation: ComputationServiceDependency,
     node_id: int,
     node_data: UpdateNode,
 ):
-    """Update node."""
+    """Update node.
+
+    A parent change schedules a background recompute and returns its job_id;
+    the node itself is saved before this returns.
+    """
     result = (
         db
         .execute(
@@ -426,12 +429,13 @@ def update_node(
         affected_ids.add(old_parent_id)
     if node_data.parent_node_id is not None and node_data.parent_node_id != old_parent_id:
         affected_ids.add(node_data.parent_node_id)
+    # No sync tile_version bump on recompute: the worker bumps once at the end.
+    job_id: str | None = None
     if affected_ids:
-        computation.recompute_from(affected_ids)
-
-    _nuke_map_tile_cache(db, layer.map_id)
-    _bump_tile_version(db, layer.map_id)
-    db.commit()
+        job_id = _schedule_recompute(db, layer.map_id, affected_ids)
+    else:
+        mvt_cache.advance_generation(db, layer.map_id, ComputationService(db=db).node_regions({node.id}))
+        db.commit()
     return Node(
         id=node.id,
         layer_id=node.layer_id,
@@ -439,18 +443,23 @@ def update_node(
         name=node.name,
         parent_node_id=node.parent_node_id,
         child_count=node.child_count,
+        job_id=job_id,
     )
 
 
 @graph_router.delete("/nodes/{node_id}", status_code=204)
 def delete_node(
     node_id: int,
+    response: Response,
     db: DatabaseSession,
     current_user: CurrentUserDependency,
     permission_service: PermissionsServiceDependency,
-    computation: ComputationServiceDependency,
 ):
-    """Delete a node (order>=1 only). Cascades to child nodes via FK."""
+    """Delete a node (order>=1 only). Cascades to child nodes via FK.
+
+    The parent's geometry is recomputed in the background; the job ID is
+    returned in the X-Map-Job-Id header.
+    """
     result = (
         db
         .execute(
@@ -474,14 +483,14 @@ def delete_node(
         raise HTTPException(400, "Cannot delete zip-layer entries via this endpoint. Use DELETE /zip-assignments.")
 
     old_parent_id = node.parent_node_id
+    regions = ComputationService(db=db).node_regions({node_id}) if old_parent_id is None else []
     db.execute(delete(NodeModel).where(NodeModel.id == node_id))
 
     if old_parent_id is not None:
-        computation.recompute_from({old_parent_id})
-
-    _nuke_map_tile_cache(db, layer.map_id)
-    _bump_tile_version(db, layer.map_id)
-    db.commit()
+        response.headers[MAP_JOB_ID_HEADER] = _schedule_recompute(db, layer.map_id, {old_parent_id})
+    else:
+        mvt_cache.advance_generation(db, layer.map_id, regions)
+        db.commit()
 
 
 @graph_router.put("/nodes/bulk", response_model=list[Node])
@@ -517,10 +526,10 @@ def bulk_update_node(
             raise HTTPException(403)
 
     updated: list[Node] = []
-    map_ids: set[str] = set()
+    node_ids_by_map: dict[str, set[int]] = {}
     for (node, layer), node_data in zip(nodes_and_layers, node_datas, strict=True):
         graph_service.update_node(node=node, node_data=node_data, layer=layer)
-        map_ids.add(layer.map_id)
+        node_ids_by_map.setdefault(layer.map_id, set()).add(node.id)
         updated.append(
             Node(
                 id=node.id,
@@ -530,9 +539,9 @@ def bulk_update_node(
                 child_count=node.child_count,
             )
         )
-    for map_id in map_ids:
-        _nuke_map_tile_cache(db, map_id)
-        _bump_tile_version(db, map_id)
+    computation = ComputationService(db=db)
+    for map_id, node_ids in node_ids_by_map.items():
+        mvt_cache.advance_generation(db, map_id, computation.node_regions(node_ids))
     db.commit()
     return updated
 
@@ -548,18 +557,25 @@ def bulk_reparent_nodes(
     """Bulk reparent nodes to a new parent (or orphan them).
 
     All nodes must be in the same layer. parent_node_id must be in the layer
-    directly above, or null to remove the parent assignment.
+    directly above, or null to remove the parent assignment. A selection_token
+    from POST /spatial/select can stand in for node_ids.
     """
+    if data.selection_token is not None:
+        try:
+            selections.check_selection(db, data.selection_token, current_user.id, "node_id")
+        except TerramapsException as e:
+            raise HTTPException(e.code, e.msg) from e
+        selected = NodeModel.id.in_(selections.selection_keys(data.selection_token, "node_id"))
+    else:
+        selected = NodeModel.id.in_(data.node_ids)
     nodes_and_layers = (
         db
-        .execute(
-            select(NodeModel, LayerModel)
-            .join(LayerModel, NodeModel.layer_id == LayerModel.id)
-            .where(NodeModel.id.in_(data.node_ids))
-        )
+        .execute(select(NodeModel, LayerModel).join(LayerModel, NodeModel.layer_id == LayerModel.id).where(selected))
         .tuples()
         .all()
     )
+    if not nodes_and_layers:
+        raise HTTPException(400, "No nodes selected.")
 
     map_ids = {layer.map_id for _, layer in nodes_and_layers}
     for map_id in map_ids:
@@ -585,9 +601,7 @@ def bulk_reparent_nodes(
     # No sync tile_version bump: the worker bumps once at the end of recompute.
     # Bumping here too would refresh tiles against pre-recompute geometry.
     if affected_ids:
-        job_id = _enqueue_recompute(db, map_id)
-        db.commit()
-        recompute_nodes_task.delay(job_id, map_id, list(affected_ids))
+        _schedule_recompute(db, map_id, affected_ids)
     else:
         db.commit()
 
@@ -650,9 +664,7 @@ def merge_nodes(
     affected_ids = {new_node.id} | old_parent_ids
 
     # No sync tile_version bump: the worker bumps once at the end of recompute.
-    job_id = _enqueue_recompute(db, map_id)
-    db.commit()
-    recompute_nodes_task.delay(job_id, map_id, list(affected_ids))
+    _schedule_recompute(db, map_id, affected_ids)
 
     return Node(
         id=new_node.id,
@@ -713,9 +725,7 @@ def bulk_delete_nodes(
 
     # No sync tile_version bump: the worker bumps once at the end of recompute.
     if affected_ids:
-        job_id = _enqueue_recompute(db, map_id)
-        db.commit()
-        recompute_nodes_task.delay(job_id, map_id, list(affected_ids))
+        _schedule_recompute(db, map_id, affected_ids)
     else:
         db.commit()
 
@@ -753,21 +763,28 @@ def list_zip_assignments(
     parent_node_id: int | None = None,
     page: int = 1,
     page_size: int = 100,
+    cursor: str | None = None,
+    total_mode: TotalMode = "exact",
 ):
-    """List zip assignments for an order=0 layer, optionally filtered by parent territory."""
+    """List zip assignments for an order=0 layer, optionally filtered by parent territory.
+
+    Ordered by zip code. Pagination works as in POST /nodes/query.
+    """
     _check_layer_access(db, layer_id, current_user.id, permission_service)
 
     filter_conditions = [ZipAssignmentModel.layer_id == layer_id]
     if parent_node_id is not None:
         filter_conditions.append(ZipAssignmentModel.parent_node_id == parent_node_id)
 
-    total = db.execute(select(func.count(ZipAssignmentModel.id)).where(*filter_conditions)).scalar() or 0
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
-    offset = (page - 1) * page_size
-
-    assignments = (
-        db.execute(select(ZipAssignmentModel).where(*filter_conditions).offset(offset).limit(page_size)).scalars().all()
-    )
+    total = count_rows(db, select(ZipAssignmentModel.id).where(*filter_conditions), total_mode)
+    stmt = select(ZipAssignmentModel).where(*filter_conditions).order_by(ZipAssignmentModel.zip_code)
+    if cursor is not None:
+        (after_zip,) = _decode_cursor(cursor, str)
+        stmt = stmt.where(ZipAssignmentModel.zip_code > after_zip)
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+    assignments = db.execute(stmt.limit(page_size + 1)).scalars().all()
+    next_cursor = encode_cursor(assignments[page_size - 1].zip_code) if len(assignments) > page_size else None
 
     return PaginatedZipAssignments(
         zip_assignments=[
@@ -777,12 +794,13 @@ def list_zip_assignments(
                 parent_node_id=za.parent_node_id,
                 color=za.color,
             )
-            for za in assignments
+            for za in assignments[:page_size]
         ],
         total=total,
-        page=page,
+        page=page if cursor is None else None,
         page_size=page_size,
-        total_pages=total_pages,
+        total_pages=total_pages(total, page_size),
+        next_cursor=next_cursor,
     )
 
 
@@ -794,8 +812,13 @@ def query_zip_assignments(
     permission_service: PermissionsServiceDependency,
     page: int = 1,
     page_size: int = 50,
+    cursor: str | None = None,
+    total_mode: TotalMode = "exact",
 ):
-    """Query zip codes, joining against zip_assignments for the given layer."""
+    """Query zip codes, joining against zip_assignments for the given layer.
+
+    Ordered by zip code. Pagination works as in POST /nodes/query.
+    """
     _check_layer_access(db, body.layer_id, current_user.id, permission_service)
 
     join_cond = and_(
@@ -818,22 +841,28 @@ def query_zip_assignments(
         .where(*geo_conditions)
     )
 
-    total = db.execute(select(func.count()).select_from(base.subquery())).scalar() or 0
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
-    offset = (page - 1) * page_size
-    rows = db.execute(base.order_by(ZipCodeGeography.zip_code).offset(offset).limit(page_size)).all()
+    total = count_rows(db, base, total_mode)
+    stmt = base.order_by(ZipCodeGeography.zip_code)
+    if cursor is not None:
+        (after_zip,) = _decode_cursor(cursor, str)
+        stmt = stmt.where(ZipCodeGeography.zip_code > after_zip)
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+    rows = db.execute(stmt.limit(page_size + 1)).all()
+    next_cursor = encode_cursor(rows[page_size - 1].zip_code) if len(rows) > page_size else None
 
     return PaginatedZipAssignments(
         zip_assignments=[
             ZipAssignment(
                 zip_code=row.zip_code, layer_id=body.layer_id, parent_node_id=row.parent_node_id, color=row.color
             )
-            for row in rows
+            for row in rows[:page_size]
         ],
         total=total,
-        page=page,
+        page=page if cursor is None else None,
         page_size=page_size,
-        total_pages=total_pages,
+        total_pages=total_pages(total, page_size),
+        next_cursor=next_cursor,
     )
 
 
@@ -849,9 +878,18 @@ def bulk_assign_zips(
     """Bulk assign or unassign zip codes to a territory.
 
     Primary operation after lasso selection. Passing parent_node_id=null
-    unassigns all provided zip codes (preserves rows and colors).
+    unassigns all provided zip codes (preserves rows and colors). A
+    selection_token from POST /spatial/select can stand in for zip_codes.
     """
     layer = _check_layer_access(db, layer_id, current_user.id, permission_service)
+    if data.selection_token is not None:
+        try:
+            selections.check_selection(db, data.selection_token, current_user.id, "zip_code", layer_id)
+        except TerramapsException as e:
+            raise HTTPException(e.code, e.msg) from e
+        selected = ZipAssignmentModel.zip_code.in_(selections.selection_keys(data.selection_token, "zip_code"))
+    else:
+        selected = ZipAssignmentModel.zip_code.in_(data.zip_codes)
 
     # Capture old parent IDs before the upsert so territories losing zips are included.
     old_parent_ids: set[int] = set(
@@ -859,7 +897,7 @@ def bulk_assign_zips(
         .execute(
             select(ZipAssignmentModel.parent_node_id).where(
                 ZipAssignmentModel.layer_id == layer_id,
-                ZipAssignmentModel.zip_code.in_(data.zip_codes),
+                selected,
                 ZipAssignmentModel.parent_node_id.isnot(None),
             )
         )
@@ -878,9 +916,7 @@ def bulk_assign_zips(
 
     # No sync tile_version bump: the worker bumps once at the end of recompute.
     if affected_ids:
-        job_id = _enqueue_recompute(db, layer.map_id)
-        db.commit()
-        recompute_nodes_task.delay(job_id, layer.map_id, list(affected_ids))
+        _schedule_recompute(db, layer.map_id, affected_ids)
     else:
         db.commit()
     return {"updated": count}
@@ -895,11 +931,11 @@ def assign_zip(
     graph_service: GraphServiceDependency,
     current_user: CurrentUserDependency,
     permission_service: PermissionsServiceDependency,
-    computation: ComputationServiceDependency,
 ):
     """Assign a zip code to a territory, or update an existing assignment.
 
     Passing parent_node_id=null unassigns the zip (preserves the row and color).
+    Territory geometry is recomputed in the background under the returned job_id.
     """
     layer = _check_layer_access(db, layer_id, current_user.id, permission_service)
     padded = zip_code.zfill(5)
@@ -915,23 +951,26 @@ def assign_zip(
     except TerramapsException as e:
         raise HTTPException(e.code if e.code in (400, 404) else 400, e.msg) from e
 
+    # Recompute geometry only when the parent assignment changed.
     affected_ids: set[int] = set()
-    if old_parent_id is not None:
+    if old_parent_id is not None and old_parent_id != data.parent_node_id:
         affected_ids.add(old_parent_id)
-    if data.parent_node_id is not None:
+    if data.parent_node_id is not None and data.parent_node_id != old_parent_id:
         affected_ids.add(data.parent_node_id)
 
+    job_id: str | None = None
     if affected_ids:
-        computation.recompute_from(affected_ids)
-    _nuke_map_tile_cache(db, layer.map_id)
-    _bump_tile_version(db, layer.map_id)
-    db.commit()
+        job_id = _schedule_recompute(db, layer.map_id, affected_ids)
+    else:
+        mvt_cache.advance_generation(db, layer.map_id, ComputationService(db=db).zip_regions(layer_id, [padded]))
+        db.commit()
 
     return ZipAssignment(
         zip_code=za.zip_code,
         layer_id=za.layer_id,
         parent_node_id=za.parent_node_id,
         color=za.color,
+        job_id=job_id,
     )
 
 
@@ -939,15 +978,17 @@ def assign_zip(
 def reset_zip(
     layer_id: int,
     zip_code: str,
+    response: Response,
     db: DatabaseSession,
     graph_service: GraphServiceDependency,
     current_user: CurrentUserDependency,
     permission_service: PermissionsServiceDependency,
-    computation: ComputationServiceDependency,
 ):
     """Reset a zip code to its default state (removes the assignment row).
 
     The zip remains implicitly present on the map but reverts to white with no territory.
+    The old territory is recomputed in the background; the job ID is returned in the
+    X-Map-Job-Id header.
     """
     layer = _check_layer_access(db, layer_id, current_user.id, permission_service)
     padded = zip_code.zfill(5)
@@ -961,10 +1002,10 @@ def reset_zip(
     graph_service.reset_zip(layer_id=layer_id, zip_code=padded)
 
     if old_parent_id is not None:
-        computation.recompute_from({old_parent_id})
-    _nuke_map_tile_cache(db, layer.map_id)
-    _bump_tile_version(db, layer.map_id)
-    db.commit()
+        response.headers[MAP_JOB_ID_HEADER] = _schedule_recompute(db, layer.map_id, {old_parent_id})
+    else:
+        mvt_cache.advance_generation(db, layer.map_id, ComputationService(db=db).zip_regions(layer_id, [padded]))
+        db.commit()
 
 
 @graph_router.get("/zip-assignments/{layer_id}/{zip_code}", response_model=ZipAssignment)
@@ -1039,24 +1080,36 @@ def _bbox_clipped_to_conus(west: float, south: float, east: float, north: float)
 
 
 @graph_router.get("/search", response_model=SearchResults)
-def search_map(
+async def search_map(
     map_id: str,
     q: str,
-    db: DatabaseSession,
-    current_user: CurrentUserDependency,
-    permission_service: PermissionsServiceDependency,
+    db: AsyncDatabaseSession,
+    current_user: AsyncCurrentUserDependency,
+    permission_service: AsyncPermissionsServiceDependency,
     layer_id: int | None = None,
     limit: int = 20,
 ):
-    """Search nodes and zip codes within a map by name / zip code prefix."""
-    if not permission_service.check_for_map_access(
+    """Search nodes and zip codes within a map by name / zip code prefix.
+
+    Queries shorter than three characters match the start of node names, longer
+    ones anywhere in them. Nodes are ranked exact name, then prefix, then closest.
+    """
+    if not await permission_service.check_for_map_access(
         user_id=current_user.id,
         map_id=map_id,
         map_roles=["OWNER", "MEMBER"],
     ):
         raise HTTPException(403)
 
-    layers = db.execute(select(LayerModel).where(LayerModel.map_id == map_id)).scalars().all()
+    tile_version = await db.scalar(select(MapModel.tile_version).where(MapModel.id == map_id))
+    if tile_version is None:
+        raise HTTPException(404, "Map not found")
+    cache_key = (map_id, tile_version, layer_id, q.lower(), limit)
+    cached = results_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    layers = (await db.scalars(select(LayerModel).where(LayerModel.map_id == map_id))).all()
     if layer_id is not None:
         layers = [la for la in layers if la.id == layer_id]
 
@@ -1065,23 +1118,23 @@ def search_map(
 
     node_layer_ids = [la.id for la in layers if la.order >= 1]
     if node_layer_ids and q:
-        rows = db.execute(  # type: ignore[arg-type]
+        result = await db.execute(
             select(
                 NodeModel.id,
                 NodeModel.layer_id,
                 NodeModel.name,
                 NodeModel.color,
-                ST_XMin(ST_Transform(ST_Envelope(NodeModel.geom_z11_merc), 4326)).label("bbox_west"),  # type: ignore[arg-type]
-                ST_YMin(ST_Transform(ST_Envelope(NodeModel.geom_z11_merc), 4326)).label("bbox_south"),  # type: ignore[arg-type]
-                ST_XMax(ST_Transform(ST_Envelope(NodeModel.geom_z11_merc), 4326)).label("bbox_east"),  # type: ignore[arg-type]
-                ST_YMax(ST_Transform(ST_Envelope(NodeModel.geom_z11_merc), 4326)).label("bbox_north"),  # type: ignore[arg-type]
+                NodeModel.bbox_min_lng.label("bbox_west"),
+                NodeModel.bbox_min_lat.label("bbox_south"),
+                NodeModel.bbox_max_lng.label("bbox_east"),
+                NodeModel.bbox_max_lat.label("bbox_north"),
             )
             .where(NodeModel.layer_id.in_(node_layer_ids))
-            .where(NodeModel.name.ilike(f"%{q}%"))
-            .order_by(NodeModel.name)
+            .where(name_matches(NodeModel.name, q))
+            .order_by(*name_rank(NodeModel.name, q))
             .limit(limit)
-        ).all()
-        for row in rows:
+        )
+        for row in result.all():
             layer = layer_map[row.layer_id]
             bbox = (
                 _bbox_clipped_to_conus(row.bbox_west, row.bbox_south, row.bbox_east, row.bbox_north)
@@ -1102,19 +1155,19 @@ def search_map(
 
     zip_layer = next((la for la in layers if la.order == 0), None)
     if zip_layer and q:
-        zip_rows = db.execute(  # type: ignore[arg-type]
+        zip_result = await db.execute(
             select(
                 ZipCodeGeography.zip_code,
-                ST_XMin(ST_Envelope(ZipCodeGeography.geom)).label("bbox_west"),  # type: ignore[arg-type]
-                ST_YMin(ST_Envelope(ZipCodeGeography.geom)).label("bbox_south"),  # type: ignore[arg-type]
-                ST_XMax(ST_Envelope(ZipCodeGeography.geom)).label("bbox_east"),  # type: ignore[arg-type]
-                ST_YMax(ST_Envelope(ZipCodeGeography.geom)).label("bbox_north"),  # type: ignore[arg-type]
+                ZipCodeGeography.bbox_min_lng.label("bbox_west"),
+                ZipCodeGeography.bbox_min_lat.label("bbox_south"),
+                ZipCodeGeography.bbox_max_lng.label("bbox_east"),
+                ZipCodeGeography.bbox_max_lat.label("bbox_north"),
             )
-            .where(ZipCodeGeography.zip_code.like(f"{q}%"))
+            .where(zip_prefix(ZipCodeGeography.zip_code, q))
             .order_by(ZipCodeGeography.zip_code)
             .limit(limit // 2 or 10)
-        ).all()
-        for row in zip_rows:
+        )
+        for row in zip_result.all():
             bbox = (
                 _bbox_clipped_to_conus(row.bbox_west, row.bbox_south, row.bbox_east, row.bbox_north)
                 if row.bbox_west is not None
@@ -1132,4 +1185,6 @@ def search_map(
                 )
             )
 
-    return SearchResults(results=results, total=len(results))
+    search_results = SearchResults(results=results, total=len(results))
+    results_cache.put(cache_key, search_results)
+    return search_results
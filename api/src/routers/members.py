@@ -78,5 +78,5 @@ def remove_member(
     if not role:
         raise HTTPException(status_code=404, detail="Member not found")
 
-    db.delete(role)
+    permission_service.remove_map_role(user_id=user_id, map_id=map_id)
     db.commit()
@@ -1,9 +1,15 @@
 """MVT (Mapbox Vector Tile) router for rendering geographic data."""
 
+from typing import Any
+
 from fastapi import APIRouter, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.app.database import DatabaseSession
+from src.app.database import AsyncDatabaseSession, async_engine
+from src.app.metrics import TILE_REQUESTS
 from src.models.graph import LayerModel, MapModel
+from src.schemas.dtos.mvt import TileBatchRequest
 from src.services import mvt as mvt_service
 from src.services import mvt_cache
 
@@ -14,14 +20,26 @@ _TILE_HEADERS = {
     "Cache-Control": "public, max-age=86400",
 }
 
+# layer_id -> order, for labelling cache hits without loading the layer. Orders never change.
+_layer_orders: dict[int, int] = {}
+
+
+async def _layer_order(db: AsyncSession, layer_id: int) -> int | None:
+    if layer_id not in _layer_orders:
+        order = (await db.execute(select(LayerModel.order).where(LayerModel.id == layer_id))).scalar()
+        if order is None:
+            return None
+        _layer_orders[layer_id] = order
+    return _layer_orders[layer_id]
+
 
 @mvt_router.get("/{layer_id}/{z}/{x}/{y}.pbf")
-def get_tile(
+async def get_tile(
     layer_id: int,
     z: int,
     x: int,
     y: int,
-    db: DatabaseSession,
+    db: AsyncDatabaseSession,
 ):
     """Get a vector tile for a specific layer at the given tile coordinates.
 
@@ -32,21 +50,116 @@ def get_tile(
     if z < 3 or z > 14:
         raise HTTPException(status_code=400, detail="Invalid zoom level")
 
-    cached = mvt_cache.get_tile(db, layer_id, "fill", z, x, y)
+    # The cache and render helpers are sync; run_sync runs them on the session's greenlet.
+    cached = await db.run_sync(mvt_cache.get_tile, layer_id, "fill", z, x, y)
     if cached is not None:
+        TILE_REQUESTS.labels(route="layer", layer_order=await _layer_order(db, layer_id), zoom=z, cache="hit").inc()
         return Response(content=cached, media_type="application/x-protobuf", headers=_TILE_HEADERS)
 
-    layer = db.get(LayerModel, layer_id)
+    layer = await db.get(LayerModel, layer_id)
     if layer is None:
         raise HTTPException(status_code=404, detail="Layer not found")
+    _layer_orders[layer_id] = layer.order
+    TILE_REQUESTS.labels(route="layer", layer_order=layer.order, zoom=z, cache="miss").inc()
 
-    map_model = db.get(MapModel, layer.map_id)
-    tile_bytes = mvt_service.render_tile(db, layer, map_model, z, x, y)
-    mvt_cache.save_tile(db, layer_id, "fill", z, x, y, tile_bytes)
+    # tile_version is read before rendering so the tile is stamped with the generation it was rendered under.
+    map_model = await db.get(MapModel, layer.map_id)
+    generation = map_model.tile_version if map_model else 0
+    tile_bytes = await db.run_sync(mvt_service.render_tile, layer, map_model, z, x, y)
+    await db.run_sync(mvt_cache.save_tile, layer_id, "fill", z, x, y, tile_bytes, generation)
 
     return Response(content=tile_bytes, media_type="application/x-protobuf", headers=_TILE_HEADERS)
 
 
+@mvt_router.get("/maps/{map_id}/{z}/{x}/{y}.pbf")
+async def get_map_tile(
+    map_id: str,
+    z: int,
+    x: int,
+    y: int,
+    db: AsyncDatabaseSession,
+):
+    """Get one vector tile holding every layer of a map.
+
+    Each layer is a pair of named sub-layers — "zips"/"zip_labels" for the zip
+    layer and "nodes_<order>"/"node_labels_<order>" for node layers — rendered
+    in one statement and cached as a unit.
+    """
+    if z < 3 or z > 14:
+        raise HTTPException(status_code=400, detail="Invalid zoom level")
+
+    cached = await db.run_sync(mvt_cache.get_map_tile, map_id, z, x, y)
+    if cached is not None:
+        TILE_REQUESTS.labels(route="map", layer_order="all", zoom=z, cache="hit").inc()
+        return Response(content=cached, media_type="application/x-protobuf", headers=_TILE_HEADERS)
+
+    map_model = await db.get(MapModel, map_id)
+    if map_model is None:
+        raise HTTPException(status_code=404, detail="Map not found")
+    TILE_REQUESTS.labels(route="map", layer_order="all", zoom=z, cache="miss").inc()
+
+    layers = (
+        await db.scalars(select(LayerModel).where(LayerModel.map_id == map_id).order_by(LayerModel.order.asc()))
+    ).all()
+    tile_bytes = await db.run_sync(mvt_service.render_map_tile, map_model, layers, z, x, y)
+    await db.run_sync(mvt_cache.save_map_tile, map_id, z, x, y, tile_bytes, map_model.tile_version)
+
+    return Response(content=tile_bytes, media_type="application/x-protobuf", headers=_TILE_HEADERS)
+
+
+@mvt_router.post("/batch")
+async def get_tile_batch(body: TileBatchRequest, db: AsyncDatabaseSession):
+    """Get every requested layer for every requested tile in one multiplexed response.
+
+    Cache hits are read in a single query; misses are rendered concurrently on
+    separate pooled connections and written back to the cache in one batch.
+    See mvt_service.encode_tile_bundle for the wire format. Frames follow the
+    request order: tiles outer, layers inner.
+    """
+    layers = {
+        layer.id: layer
+        for layer in (await db.scalars(select(LayerModel).where(LayerModel.id.in_(body.layer_ids)))).all()
+    }
+    if len(layers) != len(set(body.layer_ids)):
+        raise HTTPException(status_code=404, detail="Layer not found")
+    maps = {
+        m.id: m
+        for m in (
+            await db.scalars(select(MapModel).where(MapModel.id.in_({la.map_id for la in layers.values()})))
+        ).all()
+    }
+
+    keys = [(layer_id, t.z, t.x, t.y) for t in body.tiles for layer_id in body.layer_ids]
+    tiles = await db.run_sync(mvt_cache.get_tiles, "fill", keys)
+
+    misses = [key for key in dict.fromkeys(keys) if key not in tiles]
+    for layer_id, z, x, y in keys:
+        cache = "hit" if (layer_id, z, x, y) in tiles else "miss"
+        TILE_REQUESTS.labels(route="batch", layer_order=layers[layer_id].order, zoom=z, cache=cache).inc()
+    if misses:
+        rendered = await mvt_service.render_tiles(
+            async_engine,
+            [(layers[layer_id], maps.get(layers[layer_id].map_id), z, x, y) for layer_id, z, x, y in misses],
+        )
+        rows: list[dict[str, Any]] = []
+        for (layer_id, z, x, y), tile_bytes in zip(misses, rendered, strict=True):
+            tiles[layer_id, z, x, y] = tile_bytes
+            rows.append({
+                "layer_id": layer_id,
+                "endpoint": "fill",
+                "z": z,
+                "x": x,
+                "y": y,
+                "tile_bytes": tile_bytes,
+                "generation": maps[layers[layer_id].map_id].tile_version,
+            })
+        await db.run_sync(mvt_cache.save_tiles_batch, rows)
+        await db.commit()
+
+    bundle = mvt_service.encode_tile_bundle([(*key, tiles[key]) for key in keys])
+    return Response(content=bundle, media_type="application/octet-stream")
+
+
 @mvt_router.get("/warm")
 def warm_cache(map_id: str):
     from src.workers.tasks.maps import warm_map_mvt_cache_task
@@ -1,83 +1,153 @@
 """Router for spatial operations."""
 
+import json
+import math
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
 from fastapi import APIRouter, HTTPException
-from sqlalchemy import func, select, text
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncResult
 
-from src.app.database import DatabaseSession
-from src.models.graph import LayerModel, MapModel, NodeModel
+from src.app.database import AsyncDatabaseSession, DatabaseSession
+from src.exceptions import TerramapsException
+from src.models.geometry import GEOMETRY_TIERS
+from src.models.graph import LayerModel, MapModel
+from src.models.spatial import SpatialSelectionModel
 from src.schemas.dtos.spatial import (
     SpatialSelectRequest,
     SpatialSelectResponse,
     SpatialSummaryRequest,
     SpatialSummaryResponse,
 )
-from src.services.auth import CurrentUserDependency
-from src.services.computation import ComputationServiceDependency
-from src.services.permissions import PermissionsServiceDependency
+from src.services import selections
+from src.services.auth import AsyncCurrentUserDependency, CurrentUserDependency
+from src.services.computation import ComputationService, ComputationServiceDependency
+from src.services.mvt import pick_zoom_col
+from src.services.permissions import AsyncPermissionsServiceDependency, PermissionsServiceDependency
 
 spatial_router = APIRouter(prefix="/spatial", tags=["Spatial"])
 
 
+# Rows per chunk of a streamed selection.
+_STREAM_BATCH = 2000
+
+
+def _lasso_sql(table: str, key_column: str, tier: str, extra_filter: str | None = None) -> str:
+    """Select key_column for the rows of table whose geometry intersects the :polygon lasso.
+
+    The index finds rows whose ``tier`` box overlaps the lasso. A feature whose
+    ``tier`` geometry the lasso covers is in. One that straddles the lasso's edge
+    is decided on the finest tier, so coarse tiers only settle the clear-cut
+    cases. The lasso is the same constant on every row, which lets PostGIS
+    prepare it once for the whole scan.
+    """
+    finest = GEOMETRY_TIERS[-1].column
+    refine = "" if tier == finest else f"AND (ST_Covers(lasso.geom, t.{tier}) OR ST_Intersects(lasso.geom, t.{finest}))"
+    where = f"AND t.{extra_filter}" if extra_filter else ""
+    return f"""
+        WITH lasso AS (
+            -- The lasso arrives as 4326 GeoJSON; project it once into the storage CRS.
+            SELECT ST_Transform(ST_GeomFromGeoJSON(:polygon), 3857) AS geom
+        )
+        SELECT t.{key_column}
+        FROM {table} t, lasso
+        WHERE t.{tier} && lasso.geom
+          {where}
+          AND ST_Intersects(lasso.geom, t.{tier})
+          {refine}
+    """  # noqa: S608
+
+
+def _summary(
+    computation_service: ComputationService, layer: LayerModel, selection: SpatialSummaryRequest
+) -> dict[str, dict[str, float]]:
+    map_model = computation_service.db.get(MapModel, layer.map_id)
+    fields = (
+        [f for f in (map_model.data_field_config or []) if f.get("type") == "number" and f.get("aggregations")]
+        if map_model
+        else []
+    )
+    return computation_service.compute_summary_for_selection(
+        layer=layer,
+        fields=fields,
+        node_ids=selection.node_ids if layer.order > 0 else None,
+        zip_codes=selection.zip_codes if layer.order == 0 else None,
+        selection_token=selection.selection_token,
+    )
+
+
+async def _stream_selection(
+    rows: AsyncResult[Any], key: Literal["nodes", "zip_codes"], head: dict[str, Any]
+) -> AsyncIterator[bytes]:
+    """Write SpatialSelectResponse JSON batch by batch: the fields in head, the list, then count."""
+    other = "zip_codes" if key == "nodes" else "nodes"
+    yield (json.dumps(head, separators=(",", ":"))[:-1] + f',"{other}":[],"{key}":[').encode()
+    count = 0
+    async for batch in rows.scalars().partitions(_STREAM_BATCH):
+        items = json.dumps(batch, separators=(",", ":"))[1:-1]
+        yield (f",{items}" if count else items).encode()
+        count += len(batch)
+    yield f'],"count":{count}}}'.encode()
+
+
 @spatial_router.post("/select", response_model=SpatialSelectResponse)
-def select_features_in_lasso(
+async def select_features_in_lasso(
     selection: SpatialSelectRequest,
-    db: DatabaseSession,
-    current_user: CurrentUserDependency,
-    permission_service: PermissionsServiceDependency,
-):
+    db: AsyncDatabaseSession,
+    current_user: AsyncCurrentUserDependency,
+    permission_service: AsyncPermissionsServiceDependency,
+) -> StreamingResponse:
     """Select all features from a layer that intersect with a lasso polygon.
 
     For order=0 (zip) layers: returns zip_codes (strings) from geography_zip_codes.
     For order>=1 layers: returns node IDs (integers) from nodes.
+
+    Features are matched against the geometry tier drawn at ``zoom``, so the
+    selection agrees with what was on screen to within a pixel. The response is
+    streamed, with ``count`` after the list.
+
+    The selection is kept for SPATIAL_SELECTION_TTL_S under the returned
+    selection_token, which /spatial/summary, bulk zip assignment and bulk
+    reparent take in place of the ids. include_summary adds the /spatial/summary
+    rollup to this response.
     """
-    layer = db.get(LayerModel, selection.layer_id)
+    layer = await db.get(LayerModel, selection.layer_id)
     if layer is None:
         raise HTTPException(status_code=404, detail="Layer not found")
-    if not permission_service.check_for_map_access(
+    if not await permission_service.check_for_map_access(
         user_id=current_user.id, map_id=layer.map_id, map_roles=["OWNER", "MEMBER"]
     ):
         raise HTTPException(status_code=403)
 
-    polygon_geojson = selection.polygon.model_dump_json()
-
+    tier = GEOMETRY_TIERS[-1].column if selection.zoom is None else pick_zoom_col(math.floor(selection.zoom))
     if layer.order == 0:
-        # Zip layer: intersect against geography_zip_codes geometries.
-        # The lasso polygon arrives as 4326 GeoJSON; project it once into the
-        # storage CRS (3857) so the intersect runs against the indexed column.
-        result = db.execute(
-            text("""
-                SELECT
-                    COUNT(*) AS count,
-                    ARRAY_AGG(gz.zip_code ORDER BY gz.zip_code) AS zip_codes
-                FROM geography_zip_codes gz
-                WHERE gz.geom_z11_merc IS NOT NULL
-                  AND ST_Intersects(gz.geom_z11_merc, ST_Transform(ST_GeomFromGeoJSON(:polygon), 3857))
-            """),
-            {"polygon": polygon_geojson},
-        ).one()
-        count = result.count or 0
-        zip_codes = list(result.zip_codes) if result.zip_codes else []
-        return SpatialSelectResponse(count=count, nodes=[], zip_codes=zip_codes)
-
-    # Node layer: intersect against node geometries
-    count, ids = (
-        db.execute(
-            select(
-                func.count(NodeModel.id).label("count"),
-                func.array_agg(NodeModel.id).label("ids"),
-            ).where(
-                NodeModel.layer_id == selection.layer_id,
-                NodeModel.geom_z11_merc.isnot(None),
-                func.ST_Intersects(
-                    NodeModel.geom_z11_merc,
-                    func.ST_Transform(func.ST_GeomFromGeoJSON(polygon_geojson), 3857),
-                ),
+        sql = _lasso_sql("geography_zip_codes", "zip_code", tier)
+        params: dict[str, Any] = {"polygon": selection.polygon.model_dump_json()}
+        column: selections.SelectionColumn = "zip_code"
+        key: Literal["nodes", "zip_codes"] = "zip_codes"
+    else:
+        sql = _lasso_sql("nodes", "id", tier, "layer_id = :layer_id")
+        params = {"polygon": selection.polygon.model_dump_json(), "layer_id": layer.id}
+        column = "node_id"
+        key = "nodes"
+    token = await db.run_sync(
+        lambda session: selections.store_selection(session, layer.id, current_user.id, column, sql, params)
+    )
+    summary = None
+    if selection.include_summary:
+        summary = await db.run_sync(
+            lambda session: _summary(
+                ComputationService(session), layer, SpatialSummaryRequest(layer_id=layer.id, selection_token=token)
             )
         )
-        .tuples()
-        .one()
-    )
-    return SpatialSelectResponse(count=count or 0, nodes=list[int](ids or []))
+    # Commit before streaming so the token works as soon as the client sees it.
+    await db.commit()
+
+    selected = getattr(SpatialSelectionModel, column)
+    rows = await db.stream(selections.selection_keys(token, column).order_by(selected))
+    head = {"selection_token": token, "summary": summary}
+    return StreamingResponse(_stream_selection(rows, key, head), media_type="application/json")
 
 
 @spatial_router.post("/summary", response_model=SpatialSummaryResponse)
@@ -102,7 +172,19 @@ def summarize_selection(
     ):
         raise HTTPException(status_code=403)
 
-    if layer.order == 0:
+    if selection.selection_token is not None:
+        try:
+            selections.check_selection(
+                db,
+                selection.selection_token,
+                current_user.id,
+                "zip_code" if layer.order == 0 else "node_id",
+                layer.id,
+            )
+        except TerramapsException as e:
+            raise HTTPException(e.code, e.msg) from e
+        count = selections.selection_size(db, selection.selection_token)
+    elif layer.order == 0:
         if not selection.zip_codes:
             return SpatialSummaryResponse(count=0, data={})
         count = len(selection.zip_codes)
@@ -111,16 +193,4 @@ def summarize_selection(
             return SpatialSummaryResponse(count=0, data={})
         count = len(selection.node_ids)
 
-    map_model = db.get(MapModel, layer.map_id)
-    fields = [
-        f for f in (map_model.data_field_config or [])
-        if f.get("type") == "number" and f.get("aggregations")
-    ] if map_model else []
-
-    data = computation_service.compute_summary_for_selection(
-        layer=layer,
-        fields=fields,
-        node_ids=selection.node_ids if layer.order > 0 else None,
-        zip_codes=selection.zip_codes if layer.order == 0 else None,
-    )
-    return SpatialSummaryResponse(count=count, data=data)
+    return SpatialSummaryResponse(count=count, data=_summary(computation_service, layer, selection))
@@ -49,10 +49,19 @@ class ReparentNodes(BaseModel):
 
     All node_ids must belong to the same layer.
     parent_node_id must be in the layer directly above, or null to orphan.
+    selection_token, from POST /spatial/select, replaces node_ids.
     """
 
-    node_ids: list[int]
+    node_ids: list[int] = []
     parent_node_id: int | None
+    selection_token: str | None = None
+
+    @model_validator(mode="after")
+    def validate_ids_xor_token(self) -> "ReparentNodes":
+        """Ensure exactly one of node_ids or selection_token is provided."""
+        if bool(self.node_ids) == (self.selection_token is not None):
+            raise ValueError("Provide exactly one of 'node_ids' or 'selection_token'.")
+        return self
 
 
 class MergeNodes(BaseModel):
@@ -142,15 +151,24 @@ class BulkAssignZips(BaseModel):
 
     Primary operation after lasso selection: select zips on map, assign to territory.
     parent_node_id=null unassigns all provided zip codes (preserves rows and colors).
+    selection_token, from POST /spatial/select, replaces zip_codes.
     """
 
-    zip_codes: list[str]
+    zip_codes: list[str] = []
     parent_node_id: int | None
     color: str | None = None
     """Optional color override applied to all zip codes in the batch."""
+    selection_token: str | None = None
 
     @field_validator("zip_codes")
     @classmethod
     def pad_zip_codes(cls, v: list[str]) -> list[str]:
         """Ensure zip codes are always zero-padded to 5 characters."""
         return [z.zfill(5) for z in v]
+
+    @model_validator(mode="after")
+    def validate_zips_xor_token(self) -> "BulkAssignZips":
+        """Ensure exactly one of zip_codes or selection_token is provided."""
+        if bool(self.zip_codes) == (self.selection_token is not None):
+            raise ValueError("Provide exactly one of 'zip_codes' or 'selection_token'.")
+        return self
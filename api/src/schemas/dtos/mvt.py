@@ -0,0 +1,22 @@
+"""DTOs for vector tile requests."""
+
+from pydantic import BaseModel, Field
+
+
+class TileCoord(BaseModel):
+    """TileCoord."""
+
+    z: int = Field(ge=3, le=14)
+    x: int = Field(ge=0)
+    y: int = Field(ge=0)
+
+
+class TileBatchRequest(BaseModel):
+    """DTO for POST /tiles/batch.
+
+    Every layer is fetched for every tile, so a viewport of N tiles across M
+    visible layers is one request returning N * M tiles.
+    """
+
+    layer_ids: list[int] = Field(min_length=1, max_length=8)
+    tiles: list[TileCoord] = Field(min_length=1, max_length=64)
@@ -1,12 +1,16 @@
 """DTOS for spatial operations."""
 
 from geojson_pydantic import Polygon
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SpatialSelectRequest(BaseModel):
     layer_id: int
     polygon: Polygon
+    zoom: float | None = Field(default=None, ge=0, le=24)
+    """Map zoom the lasso was drawn at. Picks the geometry tier to select against; the finest when omitted."""
+    include_summary: bool = False
+    """Also return the /spatial/summary rollup of the selection."""
 
 
 class SpatialSelectResponse(BaseModel):
@@ -15,6 +19,10 @@ class SpatialSelectResponse(BaseModel):
     """Node IDs — populated for order>=1 layers. Empty for zip layers."""
     zip_codes: list[str] = []
     """Zip code strings — populated for order=0 (zip) layers. Empty for node layers."""
+    selection_token: str | None = None
+    """Names this selection in later summary, bulk assign and reparent calls, until it expires."""
+    summary: dict[str, dict[str, float]] | None = None
+    """The selection's rollup, when include_summary was set."""
 
 
 class SpatialSummaryRequest(BaseModel):
@@ -23,6 +31,8 @@ class SpatialSummaryRequest(BaseModel):
     """Node IDs — required for order>=1 layers."""
     zip_codes: list[str] = []
     """Zip code strings — required for order=0 (zip) layers."""
+    selection_token: str | None = None
+    """Token from /spatial/select. Replaces node_ids / zip_codes."""
 
 
 class SpatialSummaryResponse(BaseModel):
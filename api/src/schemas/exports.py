@@ -1,4 +1,4 @@
-"""PPT export schemas."""
+"""Export schemas."""
 
 from typing import Literal
 
@@ -47,3 +47,20 @@ class ExportStatusResponse(BaseModel):
     pptx_url: str | None = None
     filename: str | None = None
     error: str | None = None
+
+
+class ZttExportStatusResponse(BaseModel):
+    """Returned by POST /maps/{map_id}/exports/ztt and GET /maps/{map_id}/exports/ztt/{export_id}.
+
+    url and filename are populated only when status='complete';
+    error is populated only when status='failed'.
+    """
+
+    id: str
+    status: Literal["generating", "complete", "failed"]
+    format: Literal["xlsx", "csv"]
+    assigned_only: bool
+    tile_version: int
+    url: str | None = None
+    filename: str | None = None
+    error: str | None = None
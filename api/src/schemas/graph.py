@@ -37,6 +37,10 @@ class DataFieldConfig(BaseModel):
         )
 
 
+MAP_JOB_ID_HEADER = "X-Map-Job-Id"
+"""Response header carrying the recompute job scheduled by an edit that returns no body."""
+
+
 class MapJob(BaseModel):
     """Background recompute job for a map (geometry or data). Import lifecycle is tracked separately via MapImportState."""
 
@@ -161,16 +165,22 @@ class Node(BaseModel):
     child_count: int = 0
     data: dict[str, Any] | None = None
     ancestors: list[NodeAncestor] | None = None
+    job_id: str | None = None
+    """Recompute job scheduled by this edit, if any. Progress shows as the map's active_job."""
 
 
 class PaginatedNodes(BaseModel):
     """Paginated nodes response."""
 
     nodes: Sequence[Node]
-    total: int
-    page: int
+    total: int | None
+    """Exact or estimated per the request's total_mode; null for total_mode=none."""
+    page: int | None
+    """Null for a page requested by cursor."""
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
+    """Pass as cursor for the following page; null on the last page."""
 
 
 class ZipAssignment(BaseModel):
@@ -185,6 +195,8 @@ class ZipAssignment(BaseModel):
     parent_node_id: int | None = None
     color: str
     data: dict[str, Any] | None = None
+    job_id: str | None = None
+    """Recompute job scheduled by this edit, if any. Progress shows as the map's active_job."""
 
     @field_validator("zip_code")
     @classmethod
@@ -197,10 +209,14 @@ class PaginatedZipAssignments(BaseModel):
     """Paginated zip assignments response."""
 
     zip_assignments: Sequence[ZipAssignment]
-    total: int
-    page: int
+    total: int | None
+    """Exact or estimated per the request's total_mode; null for total_mode=none."""
+    page: int | None
+    """Null for a page requested by cursor."""
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
+    """Pass as cursor for the following page; null on the last page."""
 
 
 class SearchResultItem(BaseModel):
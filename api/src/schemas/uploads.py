@@ -74,6 +74,20 @@ MapUploadStatus = Annotated[
 """Discriminated union on 'status' for GET /maps/uploads/{id} responses."""
 
 
+class ImportStageProfile(BaseModel):
+    """Resource usage of one import step, recorded by the import worker."""
+
+    step: str
+    wall_ms: int
+    db_ms: int
+    """Time spent executing SQL statements during the step."""
+    db_statements: int
+    rows: int | None = None
+    """Rows processed by the step (spreadsheet rows, inserted rows or nodes computed)."""
+    peak_rss_kb: int | None = None
+    """Peak resident memory of the worker process during the step."""
+
+
 class MapImportState(BaseModel):
     """Import lifecycle state embedded in Map responses.
 
@@ -88,17 +102,24 @@ class MapImportState(BaseModel):
     """Post-import warnings (e.g. unrecognized zip codes). Set when status == 'complete'."""
     error: str | None = None
     """Error message. Set when status == 'failed'."""
+    profile: list[ImportStageProfile] | None = None
+    """Per-step timings. Holds completed steps while importing, and every step once complete or failed."""
 
     @staticmethod
     def create(upload: "MapUploadModel") -> "MapImportState":
         """Build MapImportState from a MapUploadModel in the importing/complete/failed phase."""
+        profile = (
+            [ImportStageProfile.model_validate(stage) for stage in upload.import_profile]
+            if upload.import_profile is not None
+            else None
+        )
         match upload.status:
             case "importing":
-                return MapImportState(status="importing", step=upload.import_step)
+                return MapImportState(status="importing", step=upload.import_step, profile=profile)
             case "complete":
-                return MapImportState(status="complete", warnings=upload.warnings or [])
+                return MapImportState(status="complete", warnings=upload.warnings or [], profile=profile)
             case "failed":
-                return MapImportState(status="failed", error=upload.error)
+                return MapImportState(status="failed", error=upload.error, profile=profile)
             case _:
                 # Should not reach here for a map that has been created.
                 # Treat pre-import states as still importing.
@@ -1,8 +1,9 @@
 """Authentication service module."""
 
 import logging
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
-from typing import Annotated, Literal, NotRequired, TypedDict
+from typing import Annotated, Any, Literal, NotRequired, TypedDict
 
 import jwt
 from fastapi import Depends, HTTPException, Request, status
@@ -11,7 +12,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
 from src.app.config import app_settings
-from src.app.database import DatabaseSession
+from src.app.database import AsyncDatabaseSession, DatabaseSession
 from src.models.accounts import UserModel
 
 from .base import BaseService
@@ -33,6 +34,53 @@ class JWTPayloadData(TypedDict):
     sub: str
     type: Literal["access", "refresh"]
     exp: NotRequired[datetime]
+    email: NotRequired[str]
+    """Set on access tokens so requests can resolve the user without a database read."""
+    name: NotRequired[str | None]
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """The authenticated user, as carried in the access token's claims.
+
+    Claims are fixed when the token is issued: a user deleted or renamed since
+    keeps their old identity until the token expires or is reissued. Load
+    UserModel by ``id`` to change the user.
+    """
+
+    id: int
+    email: str
+    name: str | None = None
+
+    @staticmethod
+    def create(user: UserModel) -> "CurrentUser":
+        """Snapshot a loaded user."""
+        return CurrentUser(id=user.id, email=user.email, name=user.name)
+
+
+def access_claims(user: UserModel) -> JWTPayloadData:
+    """Access token claims for ``user``; pass to AuthService.create_access_token."""
+    return JWTPayloadData(sub=str(user.id), type="access", email=user.email, name=user.name)
+
+
+def _decode_token(token: str | None) -> dict[str, Any]:
+    if not token:
+        raise AuthenticationError()
+    try:
+        payload = jwt.decode(token, app_settings.jwt.secret, algorithms=[app_settings.jwt.algorithm])
+    except jwt.PyJWTError as err:
+        raise AuthenticationError() from err
+    if not payload.get("sub"):
+        raise AuthenticationError()
+    return payload
+
+
+def _user_from_claims(payload: dict[str, Any]) -> CurrentUser | None:
+    """Build the user from token claims, or None for tokens issued before they carried the email."""
+    email = payload.get("email")
+    if not email:
+        return None
+    return CurrentUser(id=int(payload["sub"]), email=email, name=payload.get("name"))
 
 
 class AuthService(BaseService):
@@ -76,21 +124,16 @@ class AuthService(BaseService):
 
         return jwt.encode(dict(to_encode), app_settings.jwt.secret, algorithm=app_settings.jwt.algorithm)
 
-    def get_current_user(self, token: str | None) -> UserModel:
-        """Get the current user from the token."""
-        if not token:
-            raise AuthenticationError()
-        try:
-            payload = jwt.decode(token, app_settings.jwt.secret, algorithms=[app_settings.jwt.algorithm])
-            user_id: int | None = payload.get("sub")
-            if not user_id:
-                raise AuthenticationError()
-        except jwt.PyJWTError as err:
-            raise AuthenticationError() from err
-        user = self.db.get(UserModel, user_id)
+    def get_current_user(self, token: str | None) -> CurrentUser:
+        """Get the current user from the token's claims, reading the database only for older tokens."""
+        payload = _decode_token(token)
+        current_user = _user_from_claims(payload)
+        if current_user is not None:
+            return current_user
+        user = self.db.get(UserModel, int(payload["sub"]))
         if user is None:
             raise AuthenticationError()
-        return user
+        return CurrentUser.create(user)
 
     def _get_password_hash(self, password: str) -> str:
         """Hash a password."""
@@ -116,7 +159,7 @@ AuthServiceDependency = Annotated[AuthService, Depends(get_auth_service)]
 def _get_current_user_dependency(
     auth_service: AuthServiceDependency,
     request: Request,
-) -> UserModel:
+) -> CurrentUser:
     """Dependency to get the current user from the request."""
     try:
         logger.debug("Retrieving current user: %s", request.cookies.get("access_token"))
@@ -128,4 +171,25 @@ def _get_current_user_dependency(
         ) from err
 
 
-CurrentUserDependency = Annotated[UserModel, Depends(_get_current_user_dependency)]
+CurrentUserDependency = Annotated[CurrentUser, Depends(_get_current_user_dependency)]
+
+
+async def _get_current_user_async_dependency(
+    db: AsyncDatabaseSession,
+    request: Request,
+) -> CurrentUser:
+    """Async counterpart of _get_current_user_dependency, for routes on the asyncio engine."""
+    token = request.cookies.get("access_token")
+    try:
+        current_user = _user_from_claims(_decode_token(token))
+        if current_user is not None:
+            return current_user
+        return await db.run_sync(lambda session: AuthService(db=session).get_current_user(token))
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        ) from err
+
+
+AsyncCurrentUserDependency = Annotated[CurrentUser, Depends(_get_current_user_async_dependency)]
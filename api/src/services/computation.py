@@ -1,20 +1,36 @@
 """Computation service for geometry roll-ups and data aggregations."""
 
+import json
 import logging
+import math
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Annotated, Any
 
 from fastapi import Depends
-from sqlalchemy import delete, select, text
+from sqlalchemy import Engine, delete, select, text
 
 from src.app.database import DatabaseSession
-from src.models.cache import MvtTileCacheModel
+from src.app.instrumentation import in_current_context
+from src.models.cache import MvtMapTileCacheModel, MvtTileCacheModel
+from src.models.geometry import BBOX_COLUMNS, GEOMETRY_TIERS
 from src.models.graph import LayerModel, MapModel, NodeModel
+from src.services import mvt_cache, selections
 from src.services.base import BaseService
+from src.services.mvt_cache import DirtyRegion
 
 _SAFE_FIELD_RE = re.compile(r"^[a-z][a-z0-9_]*$")
 _SAFE_AGG_RE = re.compile(r"^(sum|avg|min|max)$")
 
+# Wide data configs are split into groups of this many fields, one connection per
+# group, when the caller allows more than one connection (see compute_data_for_map).
+_FIELDS_PER_CONNECTION = 8
+
+# Folds per-(node, field) rollup rows into the nested {field: {sum, avg, min, max}} shape.
+_NODE_DATA_AGG = (
+    "jsonb_object_agg(key_name, jsonb_build_object('sum', sum_val, 'avg', avg_val, 'min', min_val, 'max', max_val))"
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,23 +41,40 @@ class ComputationService(BaseService):
     # Public API
     # ------------------------------------------------------------------
 
-    def recompute_from(self, affected_node_ids: set[int]) -> None:
+    def recompute_from(self, affected_node_ids: set[int]) -> list[DirtyRegion]:
         """Recompute geometry for the given nodes and all their ancestors.
 
-        Walks upward layer by layer until no parents remain, then invalidates
-        the MVT tile cache for every layer touched.
-        Call before db.commit() so everything lands in one transaction.
+        Walks upward layer by layer until no parents remain, deleting cached MVT
+        tiles over each touched node's old and new extent as it goes. Returns
+        those regions so a recompute job can fence the cache with
+        mvt_cache.advance_generation. Call before db.commit() so everything
+        lands in one transaction.
         """
+        regions: list[DirtyRegion] = []
         current_ids = set(affected_node_ids)
         while current_ids:
             order_groups = self._get_layer_order_groups(current_ids)
             for order, (layer_id, ids) in sorted(order_groups.items()):
+                before = self._node_extent(ids)
                 if order == 1:
                     self._recompute_zip_layer(ids)
                 else:
                     self._recompute_node_layer(ids)
-                self._invalidate_tiles_for_nodes(layer_id, ids)
+                after = self._node_extent(ids)
+                extents = [e for e in (before, after) if e is not None]
+                if extents:
+                    region = DirtyRegion(
+                        layer_id=layer_id,
+                        xmin=min(e[0] for e in extents),
+                        ymin=min(e[1] for e in extents),
+                        xmax=max(e[2] for e in extents),
+                        ymax=max(e[3] for e in extents),
+                    )
+                    mvt_cache.delete_regions(self.db, [region])
+                    regions.append(region)
             current_ids = self._get_parent_ids(current_ids)
+        self.db.flush()
+        return regions
 
     def recompute_all_layers(self, map_id: str) -> list[LayerModel]:
         """Full geometry recompute for every order>=1 layer in a map, bottom to top.
@@ -103,12 +136,16 @@ class ComputationService(BaseService):
                     self._compute_data_node_layer(ids, number_fields)
             current_ids = self._get_parent_ids(current_ids)
 
-    def compute_data_for_map(self, map_id: str) -> None:
+    def compute_data_for_map(self, map_id: str, max_connections: int = 1) -> None:
         """Aggregate numeric data fields bottom-to-top for all layers in a map.
 
         Reads data_field_config from the map, then for each order>=1 layer
         (bottom to top) aggregates child data into parent nodes using SUM and
         naive AVG-of-AVGs. Skips maps with no number fields configured.
+
+        max_connections > 1 lets the order=1 layer split wide field configs across
+        extra pooled connections. Those connections only see committed rows, so
+        the caller must have committed zip_assignments before opting in.
         """
         map_model = self.db.get(MapModel, map_id)
         if not map_model or not map_model.data_field_config:
@@ -148,7 +185,7 @@ class ComputationService(BaseService):
             if not node_ids:
                 continue
             if layer.order == 1:
-                self._compute_data_zip_layer(node_ids, number_fields)
+                self._compute_data_zip_layer(node_ids, number_fields, max_connections)
             else:
                 self._compute_data_node_layer(node_ids, number_fields)
 
@@ -158,12 +195,14 @@ class ComputationService(BaseService):
         fields: list[dict[str, Any]],
         node_ids: list[int] | None = None,
         zip_codes: list[str] | None = None,
+        selection_token: str | None = None,
     ) -> dict[str, dict[str, float]]:
         """Aggregate `data` for a live selection set and return a dict shaped like NodeModel.data.
 
         For order=0 layers, pass zip_codes; rows are read from zip_assignments
         (flat scalars) for the given layer + zip set. For order>=1 layers, pass
-        node_ids; rows are read from nodes (nested {sum,avg,min,max}). The
+        node_ids; rows are read from nodes (nested {sum,avg,min,max}). A stored
+        selection's selection_token replaces either list (see services/selections.py). The
         rollup math mirrors the parent recompute exactly (sum-of-sums,
         avg-of-avgs, min-of-mins, max-of-maxes), so a selection of children
         produces the same numbers their shared parent would carry.
@@ -175,22 +214,18 @@ class ComputationService(BaseService):
             if not _SAFE_FIELD_RE.match(f["field"]):
                 raise ValueError(f"Unsafe field key: {f['field']!r}")
 
+        selection = self._selection_filter(layer, node_ids, zip_codes, selection_token)
+        if selection is None:
+            return {}
+        where_sql, params = selection
         if layer.order == 0:
-            if not zip_codes:
-                return {}
             from_clause = "zip_assignments za"
             alias = "za"
             flat = True
-            where_sql = "za.layer_id = :layer_id AND za.zip_code = ANY(:keys)"
-            params: dict[str, Any] = {"layer_id": layer.id, "keys": list(zip_codes)}
         else:
-            if not node_ids:
-                return {}
             from_clause = "nodes n"
             alias = "n"
             flat = False
-            where_sql = "n.id = ANY(:keys)"
-            params = {"keys": list(node_ids)}
 
         select_parts: list[str] = []
         for f in fields:
@@ -225,78 +260,163 @@ class ComputationService(BaseService):
         return out
 
     @staticmethod
-    def _field_value_expr(fname: str, alias: str, agg: str, flat: bool) -> str:
-        """SQL expression that reads a single (field, agg) value from a row's data JSONB.
+    def _selection_filter(
+        layer: LayerModel,
+        node_ids: list[int] | None,
+        zip_codes: list[str] | None,
+        selection_token: str | None,
+    ) -> tuple[str, dict[str, Any]] | None:
+        """WHERE clause and params picking the selected rows of zip_assignments za or nodes n; None if empty."""
+        if layer.order == 0:
+            if selection_token is not None:
+                where_sql = f"za.layer_id = :layer_id AND za.zip_code IN ({selections.selection_keys_sql('zip_code')})"
+                return where_sql, {"layer_id": layer.id, "selection_token": selection_token}
+            if zip_codes:
+                where_sql = "za.layer_id = :layer_id AND za.zip_code = ANY(:keys)"
+                return where_sql, {"layer_id": layer.id, "keys": list(zip_codes)}
+            return None
+        if selection_token is not None:
+            return f"n.id IN ({selections.selection_keys_sql('node_id')})", {"selection_token": selection_token}
+        if node_ids:
+            return "n.id = ANY(:keys)", {"keys": list(node_ids)}
+        return None
+
+    @staticmethod
+    def _json_number_expr(json_expr: str, agg: str, flat: bool) -> str:
+        """SQL expression that reads a single (field, agg) numeric value from a field's JSONB value.
 
-        fname must be pre-validated against _SAFE_FIELD_RE; agg must be one of
-        sum/avg/min/max. flat=True reads a scalar directly (leaf zip rows); flat=False
-        reads from the nested {sum,avg,min,max} shape (rolled-up node rows).
+        json_expr is a JSONB expression holding one field's value, e.g. "za.data->'revenue'"
+        or the value column of jsonb_each. flat=True reads a scalar directly (leaf zip rows);
+        flat=False reads from the nested {sum,avg,min,max} shape (rolled-up node rows).
         """
         if flat:
-            return f"({alias}.data->>'{fname}')::numeric"
-        return f"({alias}.data->'{fname}'->>'{agg}')::numeric"
+            return f"({json_expr} #>> '{{}}')::numeric"
+        return f"({json_expr}->>'{agg}')::numeric"
 
     @classmethod
-    def _field_rollup_exprs(cls, fname: str, alias: str, flat: bool, precision: int = 4) -> dict[str, str]:
-        """Build SUM/AVG/MIN/MAX rollup expressions for a single field.
+    def _rollup_exprs(cls, json_expr: str, flat: bool, precision: int | str = 4) -> dict[str, str]:
+        """Build SUM/AVG/MIN/MAX rollup expressions over a field's JSONB value.
 
         Returns {sum_val, avg_val, min_val, max_val} -> SQL expression. Both the
         bulk parent rollup (compute_data_*) and the live selection summary
         (compute_summary_for_selection) read the same per-row data through these,
-        so the JSONB shape lives in one place.
+        so the JSONB shape lives in one place. precision is either a literal or a
+        SQL expression (e.g. a per-field column) passed to ROUND().
         """
         return {
-            "sum_val": f"ROUND(SUM({cls._field_value_expr(fname, alias, 'sum', flat)}), {precision})",
-            "avg_val": f"ROUND(AVG({cls._field_value_expr(fname, alias, 'avg', flat)}), {precision})",
-            "min_val": f"MIN({cls._field_value_expr(fname, alias, 'min', flat)})",
-            "max_val": f"MAX({cls._field_value_expr(fname, alias, 'max', flat)})",
+            "sum_val": f"ROUND(SUM({cls._json_number_expr(json_expr, 'sum', flat)}), {precision})",
+            "avg_val": f"ROUND(AVG({cls._json_number_expr(json_expr, 'avg', flat)}), {precision})",
+            "min_val": f"MIN({cls._json_number_expr(json_expr, 'min', flat)})",
+            "max_val": f"MAX({cls._json_number_expr(json_expr, 'max', flat)})",
         }
 
     @classmethod
-    def _data_branch(cls, fname: str, from_clause: str, alias: str, flat: bool = False, precision: int = 4) -> str:
-        """Build one UNION ALL branch for a single data field.
+    def _field_rollup_exprs(cls, fname: str, alias: str, flat: bool, precision: int = 4) -> dict[str, str]:
+        """Build SUM/AVG/MIN/MAX rollup expressions for a single named field.
+
+        fname must be pre-validated against _SAFE_FIELD_RE.
+        """
+        return cls._rollup_exprs(f"{alias}.data->'{fname}'", flat=flat, precision=precision)
 
-        fname is pre-validated against _SAFE_FIELD_RE — no injection risk.
-        from_clause is e.g. "zip_assignments za" or "nodes c".
-        alias is the table alias used for column references, e.g. "za" or "c".
+    @classmethod
+    def _field_aggs_sql(cls, from_clause: str, alias: str, flat: bool) -> str:
+        """Build a single-scan rollup of every requested field, one row per (parent, field).
+
+        Each child row's data is expanded once with jsonb_each and joined against the
+        requested (key_name, precision) pairs, so the source table is read once no
+        matter how many fields are configured. Binds :node_ids, :field_names and
+        :precisions (see _field_params).
+        from_clause is e.g. "zip_assignments za" or "nodes c"; alias is its table alias.
         flat=True reads a scalar value directly (zip layer); flat=False reads nested {sum,avg,min,max}.
-        precision controls ROUND() applied to sum and avg before storage (min/max preserve full precision).
         """
-        exprs = cls._field_rollup_exprs(fname, alias, flat=flat, precision=precision)
+        exprs = cls._rollup_exprs("kv.value", flat=flat, precision="f.precision")
         return (
-            f"SELECT {alias}.parent_node_id, '{fname}'::text AS key_name,"  # noqa: S608
+            f"SELECT {alias}.parent_node_id, f.key_name,"  # noqa: S608
             f" {exprs['sum_val']} AS sum_val,"
             f" {exprs['avg_val']} AS avg_val,"
             f" {exprs['min_val']} AS min_val,"
             f" {exprs['max_val']} AS max_val"
             f" FROM {from_clause}"
-            f" WHERE {alias}.parent_node_id = ANY(:node_ids) AND {alias}.data ? '{fname}'"
-            f" GROUP BY {alias}.parent_node_id"
+            f" CROSS JOIN LATERAL jsonb_each({alias}.data) AS kv(key_name, value)"
+            " JOIN unnest(CAST(:field_names AS text[]), CAST(:precisions AS int[])) AS f(key_name, precision)"
+            "   ON f.key_name = kv.key_name"
+            f" WHERE {alias}.parent_node_id = ANY(:node_ids)"
+            f" GROUP BY {alias}.parent_node_id, f.key_name, f.precision"
         )
 
+    @staticmethod
+    def _field_params(node_ids: set[int], fields: list[dict[str, Any]]) -> dict[str, Any]:
+        """Bind parameters for _field_aggs_sql."""
+        return {
+            "node_ids": list(node_ids),
+            "field_names": [f["field"] for f in fields],
+            "precisions": [int(f.get("precision", 4)) for f in fields],
+        }
+
     def _run_data_agg(
         self, node_ids: set[int], fields: list[dict[str, Any]], from_clause: str, alias: str, flat: bool = False
     ) -> None:
-        branches = " UNION ALL ".join(
-            self._data_branch(f["field"], from_clause, alias, flat=flat, precision=f.get("precision", 4))
-            for f in fields
-        )
         sql_str = (
-            f"WITH field_aggs AS ({branches}),"  # noqa: S608
-            " node_data AS ("
-            "   SELECT parent_node_id,"
-            "          jsonb_object_agg(key_name, jsonb_build_object('sum', sum_val, 'avg', avg_val, 'min', min_val, 'max', max_val)) AS data"
-            "   FROM field_aggs GROUP BY parent_node_id"
-            " )"
+            f"WITH field_aggs AS ({self._field_aggs_sql(from_clause, alias, flat)}),"  # noqa: S608
+            f" node_data AS (SELECT parent_node_id, {_NODE_DATA_AGG} AS data FROM field_aggs GROUP BY parent_node_id)"
             " UPDATE nodes n SET data = nd.data"
             " FROM node_data nd WHERE n.id = nd.parent_node_id"
         )
-        self.db.execute(text(sql_str), {"node_ids": list(node_ids)})
+        self.db.execute(text(sql_str), self._field_params(node_ids, fields))
+        self.db.flush()
+
+    def _run_data_agg_split(
+        self,
+        node_ids: set[int],
+        fields: list[dict[str, Any]],
+        from_clause: str,
+        alias: str,
+        flat: bool,
+        connections: int,
+    ) -> None:
+        """Like _run_data_agg, but aggregates field groups concurrently on separate connections.
+
+        Each group is rolled up read-only on its own pooled connection; the partial
+        objects are merged here and written back through this session in one UPDATE.
+        Only valid when the source rows are committed.
+        """
+        groups = [fields[i::connections] for i in range(connections)]
+        sql = text(
+            f"SELECT parent_node_id, {_NODE_DATA_AGG} AS data"  # noqa: S608
+            f" FROM ({self._field_aggs_sql(from_clause, alias, flat)}) field_aggs GROUP BY parent_node_id"
+        )
+        bind = self.db.get_bind()
+        engine = bind if isinstance(bind, Engine) else bind.engine
+
+        def _aggregate(group: list[dict[str, Any]]) -> list[Any]:
+            with engine.connect() as conn:
+                return list(conn.execute(sql, self._field_params(node_ids, group)).all())
+
+        merged: dict[int, dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            for rows in pool.map(in_current_context(_aggregate), groups):
+                for parent_node_id, data in rows:
+                    merged.setdefault(parent_node_id, {}).update(data)
+        if merged:
+            self.db.execute(
+                text(
+                    "UPDATE nodes n SET data = nd.value"
+                    " FROM jsonb_each(CAST(:payload AS jsonb)) AS nd(node_id, value)"
+                    " WHERE n.id = nd.node_id::int"
+                ),
+                {"payload": json.dumps({str(k): v for k, v in merged.items()})},
+            )
         self.db.flush()
 
-    def _compute_data_zip_layer(self, node_ids: set[int], fields: list[dict[str, Any]]) -> None:
+    def _compute_data_zip_layer(
+        self, node_ids: set[int], fields: list[dict[str, Any]], max_connections: int = 1
+    ) -> None:
         """Aggregate zip_assignments.data (flat scalars) into order=1 territory nodes."""
-        self._run_data_agg(node_ids, fields, "zip_assignments za", "za", flat=True)
+        connections = min(max_connections, math.ceil(len(fields) / _FIELDS_PER_CONNECTION))
+        if connections > 1:
+            self._run_data_agg_split(node_ids, fields, "zip_assignments za", "za", flat=True, connections=connections)
+        else:
+            self._run_data_agg(node_ids, fields, "zip_assignments za", "za", flat=True)
 
     def _compute_data_node_layer(self, node_ids: set[int], fields: list[dict[str, Any]]) -> None:
         """Aggregate child node data into order>1 nodes."""
@@ -393,19 +513,45 @@ class ComputationService(BaseService):
     # Geometry helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _tier_unions_sql(alias: str) -> str:
+        """Union every geometry tier of the grouped child rows, one output column per tier."""
+        return ",\n".join(
+            f"ST_CollectionExtract(ST_UnaryUnion(ST_Collect({alias}.{tier.column})), 3) AS {tier.column}"
+            for tier in GEOMETRY_TIERS
+        )
+
+    @staticmethod
+    def _tier_assignments_sql(alias: str) -> str:
+        """SET list copying every geometry tier from a union CTE row onto the node."""
+        return ", ".join(f"{tier.column} = {alias}.{tier.column}" for tier in GEOMETRY_TIERS)
+
+    @staticmethod
+    def _bbox_extent_sql(alias: str) -> str:
+        """Extent of the grouped child rows' WGS-84 boxes, one output column per BBOX_COLUMNS entry."""
+        return ",\n".join(
+            f"{'MIN' if column.startswith('bbox_min') else 'MAX'}({alias}.{column}) AS {column}"
+            for column in BBOX_COLUMNS
+        )
+
+    @staticmethod
+    def _bbox_assignments_sql(alias: str) -> str:
+        """SET list copying the box from a union CTE row onto the node."""
+        return ", ".join(f"{column} = {alias}.{column}" for column in BBOX_COLUMNS)
+
     def _recompute_zip_layer(self, node_ids: set[int]) -> None:
         """Set geometry on order=1 nodes (territories) by unioning their assigned zips.
 
-        Each zoom column on geography_zip_codes is already pre-simplified, so we
-        union them directly into the matching column on the territory node.
+        Each tier column on geography_zip_codes is already pre-simplified, so we
+        union them directly into the matching column on the territory node. The
+        WGS-84 box is the extent of the zips' boxes.
         LEFT JOIN means a territory with no zips gets NULL geometry.
         """
-        sql = text("""
+        sql = text(f"""
             WITH zip_unions AS (
                 SELECT za.parent_node_id AS pid,
-                       ST_CollectionExtract(ST_UnaryUnion(ST_Collect(gz.geom_z3_merc)),  3) AS g3,
-                       ST_CollectionExtract(ST_UnaryUnion(ST_Collect(gz.geom_z7_merc)),  3) AS g7,
-                       ST_CollectionExtract(ST_UnaryUnion(ST_Collect(gz.geom_z11_merc)), 3) AS g11
+                       {self._tier_unions_sql("gz")},
+                       {self._bbox_extent_sql("gz")}
                 FROM zip_assignments za
                 JOIN geography_zip_codes gz ON gz.zip_code = za.zip_code
                 WHERE za.parent_node_id = ANY(:node_ids)
@@ -414,29 +560,27 @@ class ComputationService(BaseService):
                 SELECT id FROM nodes WHERE id = ANY(:node_ids)
             )
             UPDATE nodes p
-            SET geom_z3_merc  = zu.g3,
-                geom_z7_merc  = zu.g7,
-                geom_z11_merc = zu.g11
+            SET {self._tier_assignments_sql("zu")}, {self._bbox_assignments_sql("zu")}
             FROM affected a
             LEFT JOIN zip_unions zu ON zu.pid = a.id
             WHERE p.id = a.id
-        """)
+        """)  # noqa: S608
         self.db.execute(sql, {"node_ids": list(node_ids)})
         self.db.flush()
 
     def _recompute_node_layer(self, node_ids: set[int]) -> None:
         """Set geometry on order>1 nodes (regions, areas) by unioning their child nodes.
 
-        Children already have correct pre-simplified geometry per zoom level, so we
-        union each column directly — no extra simplification math needed.
+        Children already have correct pre-simplified geometry per tier, so we
+        union each column directly — no extra simplification math needed. The
+        WGS-84 box is the extent of the children's boxes.
         LEFT JOIN means a node with no geometry-bearing children gets NULL geometry.
         """
-        sql = text("""
+        sql = text(f"""
             WITH child_unions AS (
                 SELECT c.parent_node_id AS pid,
-                       ST_CollectionExtract(ST_UnaryUnion(ST_Collect(c.geom_z3_merc)),  3) AS g3,
-                       ST_CollectionExtract(ST_UnaryUnion(ST_Collect(c.geom_z7_merc)),  3) AS g7,
-                       ST_CollectionExtract(ST_UnaryUnion(ST_Collect(c.geom_z11_merc)), 3) AS g11
+                       {self._tier_unions_sql("c")},
+                       {self._bbox_extent_sql("c")}
                 FROM nodes c
                 WHERE c.parent_node_id = ANY(:node_ids)
                 GROUP BY c.parent_node_id
@@ -444,13 +588,11 @@ class ComputationService(BaseService):
                 SELECT id FROM nodes WHERE id = ANY(:node_ids)
             )
             UPDATE nodes p
-            SET geom_z3_merc  = cu.g3,
-                geom_z7_merc  = cu.g7,
-                geom_z11_merc = cu.g11
+            SET {self._tier_assignments_sql("cu")}, {self._bbox_assignments_sql("cu")}
             FROM affected a
             LEFT JOIN child_unions cu ON cu.pid = a.id
             WHERE p.id = a.id
-        """)
+        """)  # noqa: S608
         self.db.execute(sql, {"node_ids": list(node_ids)})
         self.db.flush()
 
@@ -468,41 +610,67 @@ class ComputationService(BaseService):
         if not layer_ids:
             return
         self.db.execute(delete(MvtTileCacheModel).where(MvtTileCacheModel.layer_id.in_(layer_ids)))
+        self.db.execute(
+            delete(MvtMapTileCacheModel).where(
+                MvtMapTileCacheModel.map_id.in_(select(LayerModel.map_id).where(LayerModel.id.in_(layer_ids)))
+            )
+        )
         self.db.flush()
 
-    def _invalidate_tiles_for_nodes(self, layer_id: int, node_ids: set[int]) -> None:
-        """Delete MVT cache tiles for layer_id that cover the bounding box of the given nodes.
+    def node_regions(self, node_ids: set[int]) -> list[DirtyRegion]:
+        """Return a DirtyRegion per layer over the nodes' current extent.
 
-        Computes tile (x, y) ranges for z=3..11 from the nodes' updated 3857 geometry.
-        Tile coords come straight from the meter offset into the Mercator world square,
-        so no trig or degree math is needed.
-        Does not commit — caller owns the transaction.
+        For edits that change how nodes draw (name, color, removal) but not any
+        geometry, so nothing is recomputed; pass the regions to
+        mvt_cache.advance_generation. Take them before deleting the nodes.
         """
-        sql = text("""
-            WITH bbox AS (
-                SELECT ST_Extent(COALESCE(n.geom_z11_merc, n.geom_z7_merc, n.geom_z3_merc)) AS geom
-                FROM nodes n
-                WHERE n.id = ANY(:node_ids)
-            ),
-            tile_ranges AS (
-                SELECT
-                    z::smallint,
-                    GREATEST(0, FLOOR((ST_XMin(b.geom) + 20037508.3427892) / 40075016.6855784 * POW(2, z))::int) AS x_min,
-                    FLOOR((ST_XMax(b.geom) + 20037508.3427892) / 40075016.6855784 * POW(2, z))::int             AS x_max,
-                    GREATEST(0, FLOOR((20037508.3427892 - ST_YMax(b.geom)) / 40075016.6855784 * POW(2, z))::int) AS y_min,
-                    FLOOR((20037508.3427892 - ST_YMin(b.geom)) / 40075016.6855784 * POW(2, z))::int             AS y_max
-                FROM bbox b, generate_series(3, 11) z
-                WHERE b.geom IS NOT NULL
-            )
-            DELETE FROM mvt_tile_cache c
-            USING tile_ranges tr
-            WHERE c.layer_id = :layer_id
-              AND c.z = tr.z
-              AND c.x BETWEEN tr.x_min AND tr.x_max
-              AND c.y BETWEEN tr.y_min AND tr.y_max
-        """)
-        self.db.execute(sql, {"layer_id": layer_id, "node_ids": list(node_ids)})
-        self.db.flush()
+        regions: list[DirtyRegion] = []
+        for layer_id, ids in self._get_layer_order_groups(node_ids).values():
+            extent = self._node_extent(ids)
+            if extent is not None:
+                regions.append(DirtyRegion(layer_id, *extent))
+        return regions
+
+    def zip_regions(self, layer_id: int, zip_codes: list[str]) -> list[DirtyRegion]:
+        """Return a DirtyRegion over the zips' extent on the zip layer, as node_regions does for nodes."""
+        extent = self._zip_extent(zip_codes)
+        return [DirtyRegion(layer_id, *extent)] if extent is not None else []
+
+    def _node_extent(self, node_ids: set[int]) -> tuple[float, float, float, float] | None:
+        """Return the (xmin, ymin, xmax, ymax) 3857 extent of the nodes' finest geometry, or None if they have none."""
+        finest_first = ", ".join(f"n.{tier.column}" for tier in reversed(GEOMETRY_TIERS))
+        row = self.db.execute(
+            text(f"""
+                SELECT ST_XMin(e), ST_YMin(e), ST_XMax(e), ST_YMax(e)
+                FROM (
+                    SELECT ST_Extent(COALESCE({finest_first})) AS e
+                    FROM nodes n
+                    WHERE n.id = ANY(:node_ids)
+                ) s
+            """),  # noqa: S608
+            {"node_ids": list(node_ids)},
+        ).one()
+        if row[0] is None:
+            return None
+        return (row[0], row[1], row[2], row[3])
+
+    def _zip_extent(self, zip_codes: list[str]) -> tuple[float, float, float, float] | None:
+        """Return the (xmin, ymin, xmax, ymax) 3857 extent of the zips' finest geometry, or None if they have none."""
+        finest_first = ", ".join(f"g.{tier.column}" for tier in reversed(GEOMETRY_TIERS))
+        row = self.db.execute(
+            text(f"""
+                SELECT ST_XMin(e), ST_YMin(e), ST_XMax(e), ST_YMax(e)
+                FROM (
+                    SELECT ST_Extent(COALESCE({finest_first})) AS e
+                    FROM geography_zip_codes g
+                    WHERE g.zip_code = ANY(:zip_codes)
+                ) s
+            """),  # noqa: S608
+            {"zip_codes": zip_codes},
+        ).one()
+        if row[0] is None:
+            return None
+        return (row[0], row[1], row[2], row[3])
 
     # ------------------------------------------------------------------
     # Propagation helpers
@@ -20,6 +20,7 @@ from src.schemas.dtos.graph import (
     ReparentNodes,
     UpdateNode,
 )
+from src.services import selections
 from src.services.base import BaseService
 
 
@@ -84,7 +85,9 @@ class GraphService(BaseService):
             parent_node_id=node_data.parent_node_id,
             data={},
             geom_z3_merc=None,
+            geom_z5_merc=None,
             geom_z7_merc=None,
+            geom_z9_merc=None,
             geom_z11_merc=None,
         )
         self.db.add(new_node)
@@ -123,20 +126,29 @@ class GraphService(BaseService):
         All nodes must be in the same layer. If parent_node_id is provided it
         must be in the layer directly above the current nodes' layer.
 
+        With a selection_token the nodes are read from the stored selection; the
+        caller checks it with selections.check_selection.
+
         Raises:
             TerramapsException(400) if node_ids is empty or nodes span multiple layers
             TerramapsException(404) if any node_id is not found
             TerramapsException(402/403) if parent validation fails (via _propose_node_parent)
         """
-        if not data.node_ids:
+        if data.selection_token is not None:
+            selected = NodeModel.id.in_(selections.selection_keys(data.selection_token, "node_id"))
+        elif data.node_ids:
+            selected = NodeModel.id.in_(data.node_ids)
+        else:
             raise TerramapsException(400, "node_ids must not be empty.")
 
-        nodes = self.db.execute(select(NodeModel).where(NodeModel.id.in_(data.node_ids))).scalars().all()
+        nodes = self.db.execute(select(NodeModel).where(selected)).scalars().all()
 
-        if len(nodes) != len(set(data.node_ids)):
+        if data.selection_token is None and len(nodes) != len(set(data.node_ids)):
             found = {n.id for n in nodes}
             missing = set(data.node_ids) - found
             raise TerramapsException(404, f"Nodes not found: {missing}")
+        if not nodes:
+            raise TerramapsException(400, "The selection has no nodes.")
 
         layer_ids = {n.layer_id for n in nodes}
         if len(layer_ids) > 1:
@@ -147,9 +159,7 @@ class GraphService(BaseService):
         if data.parent_node_id is not None:
             self._propose_node_parent(layer, data.parent_node_id)
 
-        self.db.execute(
-            update(NodeModel).where(NodeModel.id.in_(data.node_ids)).values(parent_node_id=data.parent_node_id)
-        )
+        self.db.execute(update(NodeModel).where(selected).values(parent_node_id=data.parent_node_id))
         self.db.flush()
 
         for node in nodes:
@@ -217,7 +227,9 @@ class GraphService(BaseService):
             color="#CCCCCC",
             parent_node_id=data.parent_node_id,
             geom_z3_merc=None,
+            geom_z5_merc=None,
             geom_z7_merc=None,
+            geom_z9_merc=None,
             geom_z11_merc=None,
             data=None,
         )
@@ -379,9 +391,16 @@ class GraphService(BaseService):
         - New rows: color copied from geography unless overridden.
         - Existing rows: parent_node_id updated; color preserved unless overridden.
 
+        With a selection_token the zips are read from the stored selection; the
+        caller checks it with selections.check_selection.
+
         Returns the number of rows inserted or updated.
         """
-        if not data.zip_codes:
+        if data.selection_token is not None:
+            selected_sql = f"gz.zip_code IN ({selections.selection_keys_sql('zip_code')})"
+        elif data.zip_codes:
+            selected_sql = "gz.zip_code = ANY(:zip_codes)"
+        else:
             return 0
 
         if data.parent_node_id is not None:
@@ -390,7 +409,7 @@ class GraphService(BaseService):
         # JOIN geography_zip_codes so new rows inherit the default color without a separate
         # round-trip. COALESCE(:color_override, ...) is NULL-safe: when color_override is
         # None it becomes SQL NULL and COALESCE falls through to the next expression.
-        upsert_sql = text("""
+        upsert_sql = text(f"""
             INSERT INTO zip_assignments
                 (layer_id, zip_code, parent_node_id, color)
             SELECT
@@ -399,12 +418,12 @@ class GraphService(BaseService):
                 :parent_node_id,
                 COALESCE(:color_override, gz.color)
             FROM geography_zip_codes gz
-            WHERE gz.zip_code = ANY(:zip_codes)
+            WHERE {selected_sql}
             ON CONFLICT (layer_id, zip_code) DO UPDATE
                 SET parent_node_id = EXCLUDED.parent_node_id,
                     color = COALESCE(:color_override, zip_assignments.color)
             RETURNING zip_assignments.zip_code
-        """)
+        """)  # noqa: S608
 
         result = self.db.execute(
             upsert_sql,
@@ -413,6 +432,7 @@ class GraphService(BaseService):
                 "parent_node_id": data.parent_node_id,
                 "color_override": data.color,
                 "zip_codes": data.zip_codes,
+                "selection_token": data.selection_token,
             },
         )
         self.db.flush()
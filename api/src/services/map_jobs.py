@@ -0,0 +1,128 @@
+"""Map job scheduling.
+
+Recomputes are coalesced per map. While a recompute job is pending, further
+edits fold their affected nodes into it instead of queueing another, and each
+fold pushes its start back by ``CELERY_RECOMPUTE_DEBOUNCE_S`` (never past
+``CELERY_RECOMPUTE_MAX_DELAY_S`` after the job was created). At most one
+recompute runs per map; a job whose map already has one running waits its turn.
+
+Scheduling and claiming for a map are serialized by a transaction-scoped
+advisory lock, so a fold can never land on a job that has just been claimed.
+"""
+
+import logging
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import Session
+
+from src.app.config import app_settings
+from src.models.graph import MapModel
+from src.models.jobs import MapJobModel
+
+logger = logging.getLogger(__name__)
+
+# A processing job not touched for this long is assumed to belong to a dead worker.
+_STALE_PROCESSING = timedelta(minutes=30)
+
+ClaimOutcome = Literal["run", "defer", "skip"]
+
+
+def _lock_map(db: Session, map_id: str) -> None:
+    """Hold the map's job lock until the current transaction ends."""
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"map_jobs:{map_id}"})
+
+
+def schedule_recompute(db: Session, map_id: str, node_ids: set[int]) -> tuple[MapJobModel, bool]:
+    """Fold node_ids into the map's pending recompute job, creating the job if there is none.
+
+    Returns (job, created). Does not commit. Once committed, a created job must be
+    dispatched with a countdown of the debounce interval; a folded one already has
+    a task on its way. Bumps the map's edit_version, since the edit lands before
+    the recompute does.
+    """
+    _lock_map(db, map_id)
+    db.execute(update(MapModel).where(MapModel.id == map_id).values(edit_version=MapModel.edit_version + 1))
+    settings = app_settings.celery
+    now = datetime.now(UTC)
+    job = db.execute(
+        select(MapJobModel).where(
+            MapJobModel.map_id == map_id,
+            MapJobModel.job_type == "recompute_geometry",
+            MapJobModel.status == "pending",
+        )
+    ).scalar_one_or_none()
+
+    if job is None:
+        job = MapJobModel(
+            id=str(uuid.uuid4()),
+            map_id=map_id,
+            job_type="recompute_geometry",
+            status="pending",
+            affected_node_ids=sorted(node_ids),
+            run_after=now + timedelta(seconds=settings.recompute_debounce_s),
+        )
+        db.add(job)
+        db.flush()
+        return job, True
+
+    job.affected_node_ids = sorted(set(job.affected_node_ids or []) | node_ids)
+    job.run_after = min(
+        now + timedelta(seconds=settings.recompute_debounce_s),
+        job.created_at + timedelta(seconds=settings.recompute_max_delay_s),
+    )
+    db.flush()
+    logger.debug(f"Folded {len(node_ids)} nodes into pending recompute {job.id} for map {map_id}")
+    return job, False
+
+
+def claim_recompute(db: Session, job_id: str) -> tuple[ClaimOutcome, float]:
+    """Try to move a pending recompute job to processing. Always ends the transaction.
+
+    Returns ("run", 0) when the caller should run the job now, ("defer", seconds)
+    when it should try again after that long — the job is still collecting edits
+    or another recompute for the map is running — and ("skip", 0) when there is
+    nothing to run. A job already processing is handed back as "run" only once
+    it has gone _STALE_PROCESSING without an update: that is a redelivery after
+    its worker died mid-job. A fresher one is still running and is skipped.
+    """
+    job = db.get(MapJobModel, job_id)
+    if job is None:
+        db.commit()
+        return "skip", 0.0
+    _lock_map(db, job.map_id)
+    db.refresh(job)
+    outcome = _claim(db, job)
+    db.commit()
+    return outcome
+
+
+def _claim(db: Session, job: MapJobModel) -> tuple[ClaimOutcome, float]:
+    now = datetime.now(UTC)
+    if job.status == "processing":
+        if job.updated_at > now - _STALE_PROCESSING:
+            return "skip", 0.0
+        job.updated_at = now
+        return "run", 0.0
+    if job.status != "pending":
+        return "skip", 0.0
+
+    if job.run_after is not None and job.run_after > now:
+        return "defer", (job.run_after - now).total_seconds()
+
+    running = db.execute(
+        select(MapJobModel.id).where(
+            MapJobModel.map_id == job.map_id,
+            MapJobModel.job_type == job.job_type,
+            MapJobModel.status == "processing",
+            MapJobModel.updated_at > now - _STALE_PROCESSING,
+        )
+    ).first()
+    if running is not None:
+        return "defer", app_settings.celery.recompute_debounce_s
+
+    job.status = "processing"
+    job.step = "Recomputing..."
+    return "run", 0.0
@@ -1,13 +1,19 @@
 """MVT tile rendering service."""
 
+import asyncio
 import math
 import re
+import struct
+from collections.abc import Sequence
 from typing import Any
 
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.elements import TextClause
 
+from src.app.metrics import TILE_RENDER_SECONDS
+from src.models.geometry import GEOMETRY_TIERS
 from src.models.graph import LayerModel, MapModel
 
 _SAFE_FIELD_RE = re.compile(r"^[a-z][a-z0-9_]*$")
@@ -16,6 +22,18 @@ _SAFE_AGG_RE = re.compile(r"^(sum|avg|min|max)$")
 # Continental US bounding box (lon_min, lat_min, lon_max, lat_max), WGS84
 _US_BBOX = (-124.85, 24.39, -66.88, 49.38)
 
+# Web Mercator meters per 256px screen pixel at zoom 0.
+_M_PER_PX_Z0 = 156543.03392804097
+
+# Snap error a geometry tier may show on screen, in pixels. Tier tolerances are
+# rounded pixel sizes at their own zoom, so a strict 1px budget would reject a tier
+# at the very zoom it was built for; 1.5px lets each tier serve its own zoom and the
+# one below it.
+_MAX_SNAP_PX = 1.5
+
+# Frame header of a tile bundle: layer_id (u32), z (u8), x (u32), y (u32), payload length (u32), big-endian.
+_BUNDLE_FRAME = struct.Struct(">IBIII")
+
 # Expand the tile envelope ~10% in each direction so label anchors for features
 # whose centroid sits just outside the tile still survive the filter. Storage is
 # already 3857, so this is plain meter arithmetic — no envelope CRS conversion needed.
@@ -43,11 +61,15 @@ def extract_data_fields(
 
 
 def pick_zoom_col(z: int) -> str:
-    if z <= 3:
-        return "geom_z3_merc"
-    if z <= 7:
-        return "geom_z7_merc"
-    return "geom_z11_merc"
+    """Pick the coarsest geometry tier whose snap error stays within _MAX_SNAP_PX screen pixels at zoom z.
+
+    Falls back to the finest tier past the end of the pyramid.
+    """
+    budget_m = _M_PER_PX_Z0 / 2**z * _MAX_SNAP_PX
+    for tier in GEOMETRY_TIERS:
+        if tier.snap_m <= budget_m:
+            return tier.column
+    return GEOMETRY_TIERS[-1].column
 
 
 _SEP = ",\n                "
@@ -118,16 +140,22 @@ def _zip_data_column_aliases(fields: tuple[tuple[str, tuple[str, ...], int], ...
     return _SEP + _SEP.join(fname for fname, _, _p in fields)
 
 
-def _node_query(col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], ...]) -> TextClause:
+def _node_ctes(
+    col: str,
+    data_fields: tuple[tuple[str, tuple[str, ...], int], ...],
+    suffix: str = "",
+    layer_param: str = "layer_id",
+) -> str:
+    """tile_data/label_points/label_data CTEs for one node layer.
+
+    suffix keeps CTE names unique when several layers share one statement;
+    layer_param names the bind parameter holding the layer id.
+    """
     extra_numeric = _data_columns(data_fields, "n")
     extra_label = _label_data_columns(data_fields, "n")
     extra_aliases = _data_column_aliases(data_fields)
-    return text(f"""
-        WITH tile_bounds AS (
-            SELECT ST_TileEnvelope(:z, :x, :y) AS geom
-        ),
-        {_FILTER_BOUNDS_CTE},
-        tile_data AS (
+    return f"""
+        tile_data{suffix} AS (
             SELECT
                 n.id,
                 n.name,
@@ -139,11 +167,11 @@ def _node_query(col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], .
                     4096, 256, true
                 ) AS geom
             FROM nodes n
-            WHERE n.layer_id = :layer_id
+            WHERE n.layer_id = :{layer_param}
               AND n.{col} IS NOT NULL
               AND ST_Intersects(n.{col}, (SELECT geom FROM filter_bounds))
         ),
-        label_points AS (
+        label_points{suffix} AS (
             SELECT
                 n.id,
                 n.name,
@@ -151,42 +179,34 @@ def _node_query(col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], .
                 n.parent_node_id{extra_label},
                 ST_PointOnSurface(n.{col}) AS pt
             FROM nodes n
-            WHERE n.layer_id = :layer_id
+            WHERE n.layer_id = :{layer_param}
               AND n.{col} IS NOT NULL
               AND ST_Intersects(n.{col}, (SELECT geom FROM filter_bounds))
         ),
-        label_data AS (
+        label_data{suffix} AS (
             SELECT
                 id,
                 name,
                 color,
                 parent_node_id{extra_aliases},
                 ST_AsMVTGeom(pt, (SELECT geom FROM tile_bounds), 4096, 256, false) AS geom
-            FROM label_points
+            FROM label_points{suffix}
             WHERE ST_Within(pt, (SELECT geom FROM tile_bounds))
-        )
-        SELECT
-            (
-                SELECT ST_AsMVT(q, 'nodes', 4096, 'geom', 'id')
-                FROM (SELECT * FROM tile_data WHERE geom IS NOT NULL) q
-            ) ||
-            (
-                SELECT ST_AsMVT(q, 'node_labels', 4096, 'geom')
-                FROM (SELECT * FROM label_data WHERE geom IS NOT NULL) q
-            );
-    """)  # noqa: S608
+        )"""  # noqa: S608
 
 
-def _zip_query(col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], ...]) -> TextClause:
+def _zip_ctes(
+    col: str,
+    data_fields: tuple[tuple[str, tuple[str, ...], int], ...],
+    suffix: str = "",
+    layer_param: str = "layer_id",
+) -> str:
+    """tile_data/label_points/label_data CTEs for the zip layer. See _node_ctes."""
     extra_numeric = _zip_data_columns(data_fields, "za")
     extra_label = _label_zip_data_columns(data_fields, "za")
     extra_aliases = _zip_data_column_aliases(data_fields)
-    return text(f"""
-        WITH tile_bounds AS (
-            SELECT ST_TileEnvelope(:z, :x, :y) AS geom
-        ),
-        {_FILTER_BOUNDS_CTE},
-        tile_data AS (
+    return f"""
+        tile_data{suffix} AS (
             SELECT
                 gz.zip_code,
                 COALESCE(za.color, '#FFFFFF') AS color,
@@ -199,11 +219,11 @@ def _zip_query(col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], ..
             FROM geography_zip_codes gz
             LEFT JOIN zip_assignments za
                 ON za.zip_code = gz.zip_code
-                AND za.layer_id = :layer_id
+                AND za.layer_id = :{layer_param}
             WHERE gz.{col} IS NOT NULL
               AND ST_Intersects(gz.{col}, (SELECT geom FROM filter_bounds))
         ),
-        label_points AS (
+        label_points{suffix} AS (
             SELECT
                 gz.zip_code,
                 COALESCE(za.color, '#FFFFFF') AS color,
@@ -212,29 +232,95 @@ def _zip_query(col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], ..
             FROM geography_zip_codes gz
             LEFT JOIN zip_assignments za
                 ON za.zip_code = gz.zip_code
-                AND za.layer_id = :layer_id
+                AND za.layer_id = :{layer_param}
             WHERE gz.{col} IS NOT NULL
               AND ST_Intersects(gz.{col}, (SELECT geom FROM filter_bounds))
         ),
-        label_data AS (
+        label_data{suffix} AS (
             SELECT
                 zip_code,
                 color,
                 parent_node_id{extra_aliases},
                 ST_AsMVTGeom(pt, (SELECT geom FROM tile_bounds), 4096, 256, false) AS geom
-            FROM label_points
+            FROM label_points{suffix}
             WHERE ST_Within(pt, (SELECT geom FROM tile_bounds))
-        )
-        SELECT
+        )"""  # noqa: S608
+
+
+def _mvt_layers(suffix: str, name: str, label_name: str, feature_id: bool) -> str:
+    """Concatenated ST_AsMVT output of one layer's feature and label CTEs."""
+    id_arg = ", 'id'" if feature_id else ""
+    return f"""
             (
-                SELECT ST_AsMVT(q, 'zips', 4096, 'geom')
-                FROM (SELECT * FROM tile_data WHERE geom IS NOT NULL) q
+                SELECT ST_AsMVT(q, '{name}', 4096, 'geom'{id_arg})
+                FROM (SELECT * FROM tile_data{suffix} WHERE geom IS NOT NULL) q
             ) ||
             (
-                SELECT ST_AsMVT(q, 'zip_labels', 4096, 'geom')
-                FROM (SELECT * FROM label_data WHERE geom IS NOT NULL) q
-            );
-    """)  # noqa: S608
+                SELECT ST_AsMVT(q, '{label_name}', 4096, 'geom')
+                FROM (SELECT * FROM label_data{suffix} WHERE geom IS NOT NULL) q
+            )"""  # noqa: S608
+
+
+def _node_query(col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], ...]) -> TextClause:
+    return text(f"""
+        WITH tile_bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+        ),
+        {_FILTER_BOUNDS_CTE},{_node_ctes(col, data_fields)}
+        SELECT{_mvt_layers("", "nodes", "node_labels", feature_id=True)};
+    """)
+
+
+def _zip_query(col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], ...]) -> TextClause:
+    return text(f"""
+        WITH tile_bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+        ),
+        {_FILTER_BOUNDS_CTE},{_zip_ctes(col, data_fields)}
+        SELECT{_mvt_layers("", "zips", "zip_labels", feature_id=False)};
+    """)
+
+
+def map_tile_layer_names(order: int) -> tuple[str, str]:
+    """Return the (feature, label) sub-layer names used for a layer in map-level tiles.
+
+    The zip layer keeps its per-layer names; node layers are suffixed with their order
+    so every level of the hierarchy stays addressable in one tile.
+    """
+    if order == 0:
+        return "zips", "zip_labels"
+    return f"nodes_{order}", f"node_labels_{order}"
+
+
+def _map_query(
+    col: str, data_fields: tuple[tuple[str, tuple[str, ...], int], ...], layer_orders: Sequence[int]
+) -> TextClause:
+    """One statement rendering every layer of a map against a shared tile envelope and filter.
+
+    Each layer binds its id as :layer_id_<order>. Per-layer output is COALESCEd so an
+    empty layer never nulls out the concatenated tile.
+    """
+    ctes: list[str] = []
+    outputs: list[str] = []
+    for order in layer_orders:
+        suffix = f"_{order}"
+        build_ctes = _zip_ctes if order == 0 else _node_ctes
+        ctes.append(build_ctes(col, data_fields, suffix=suffix, layer_param=f"layer_id{suffix}"))
+        name, label_name = map_tile_layer_names(order)
+        outputs.append(f"COALESCE({_mvt_layers(suffix, name, label_name, feature_id=order != 0)}, ''::bytea)")
+    return text(f"""
+        WITH tile_bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+        ),
+        {_FILTER_BOUNDS_CTE},{",".join(ctes)}
+        SELECT {" || ".join(outputs)};
+    """)
+
+
+def _tile_query(layer: LayerModel, map_model: MapModel | None, z: int) -> TextClause:
+    col = pick_zoom_col(z)
+    data_fields = extract_data_fields(map_model.data_field_config if map_model else None)
+    return _zip_query(col, data_fields) if layer.order == 0 else _node_query(col, data_fields)
 
 
 def render_tile(
@@ -246,13 +332,76 @@ def render_tile(
     y: int,
 ) -> bytes:
     """Render a single MVT tile and return the raw bytes (empty bytes if no features)."""
-    col = pick_zoom_col(z)
-    data_fields = extract_data_fields(map_model.data_field_config if map_model else None)
-    query = _zip_query(col, data_fields) if layer.order == 0 else _node_query(col, data_fields)
-    result = db.execute(query, {"layer_id": layer.id, "z": z, "x": x, "y": y}).scalar()
+    query = _tile_query(layer, map_model, z)
+    with TILE_RENDER_SECONDS.labels(layer_order=layer.order, zoom=z).time():
+        result = db.execute(query, {"layer_id": layer.id, "z": z, "x": x, "y": y}).scalar()
+    return bytes(result) if result else b""
+
+
+def render_map_tile(
+    db: Session,
+    map_model: MapModel,
+    layers: Sequence[LayerModel],
+    z: int,
+    x: int,
+    y: int,
+) -> bytes:
+    """Render one MVT tile holding every given layer as named sub-layers (see map_tile_layer_names)."""
+    if not layers:
+        return b""
+    data_fields = extract_data_fields(map_model.data_field_config)
+    query = _map_query(pick_zoom_col(z), data_fields, [layer.order for layer in layers])
+    params: dict[str, int] = {"z": z, "x": x, "y": y}
+    params.update({f"layer_id_{layer.order}": layer.id for layer in layers})
+    with TILE_RENDER_SECONDS.labels(layer_order="all", zoom=z).time():
+        result = db.execute(query, params).scalar()
     return bytes(result) if result else b""
 
 
+async def render_tiles(
+    engine: AsyncEngine,
+    tiles: Sequence[tuple[LayerModel, MapModel | None, int, int, int]],
+    max_concurrency: int = 4,
+) -> list[bytes]:
+    """Render several tiles concurrently, each on its own pooled connection.
+
+    tiles is a sequence of (layer, map_model, z, x, y); results are returned in
+    the same order. Queries are built up front so the renders never touch ORM
+    state, and at most max_concurrency connections are held at once. Rendered
+    tiles only reflect committed data.
+    """
+    if not tiles:
+        return []
+    jobs = [
+        (_tile_query(layer, map_model, z), {"layer_id": layer.id, "z": z, "x": x, "y": y}, layer.order)
+        for layer, map_model, z, x, y in tiles
+    ]
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def _render(query: TextClause, params: dict[str, int], order: int) -> bytes:
+        async with slots, engine.connect() as conn:
+            with TILE_RENDER_SECONDS.labels(layer_order=order, zoom=params["z"]).time():
+                result = (await conn.execute(query, params)).scalar()
+        return bytes(result) if result else b""
+
+    return list(await asyncio.gather(*(_render(*job) for job in jobs)))
+
+
+def encode_tile_bundle(tiles: Sequence[tuple[int, int, int, int, bytes]]) -> bytes:
+    """Multiplex (layer_id, z, x, y, tile_bytes) entries into a single binary payload.
+
+    Each entry is a 17-byte big-endian frame header — layer_id (u32), z (u8),
+    x (u32), y (u32), payload length (u32) — followed by the raw MVT bytes.
+    Empty tiles are sent as zero-length frames so clients can tell "no features"
+    apart from "not requested".
+    """
+    buf = bytearray()
+    for layer_id, z, x, y, tile_bytes in tiles:
+        buf += _BUNDLE_FRAME.pack(layer_id, z, x, y, len(tile_bytes))
+        buf += tile_bytes
+    return bytes(buf)
+
+
 def tiles_for_us(z_min: int = 3, z_max: int = 7) -> list[tuple[int, int, int]]:
     """Return all (z, x, y) tile coordinates covering the continental US for z_min..z_max."""
     min_lon, min_lat, max_lon, max_lat = _US_BBOX
@@ -1,34 +1,280 @@
-"""MVT tile cache service."""
+"""MVT tile cache service.
 
+Cached tiles are generation-fenced: each row carries the map's tile_version at
+the time it was rendered and is only served while that is still the map's
+tile_version. Renderers read tile_version before rendering, so a tile rendered
+against geometry that a recompute is about to replace is stamped with the old
+generation and goes dark the moment the recompute commits. advance_generation
+carries every unaffected tile forward so only tiles over changed geometry are
+lost.
+"""
+
+from dataclasses import dataclass
 from typing import Any
 
-from sqlalchemy import text
+from sqlalchemy import delete, select, text, tuple_, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from src.models.cache import MvtTileCacheModel
+from src.models.cache import MvtMapTileCacheModel, MvtTileCacheModel
+from src.models.graph import LayerModel, MapModel
+
+# Zoom range the tile routes serve, and so the range a region delete must cover.
+_MIN_ZOOM = 3
+_MAX_ZOOM = 14
+
+
+@dataclass(frozen=True)
+class DirtyRegion:
+    """A 3857 bounding box over which a layer's tiles, and those of the layer below it, are stale.
+
+    The layer below is included because its features carry ``parent_node_id``.
+    """
+
+    layer_id: int
+    xmin: float
+    ymin: float
+    xmax: float
+    ymax: float
 
 
 def get_tile(db: Session, layer_id: int, endpoint: str, z: int, x: int, y: int) -> bytes | None:
-    row = db.get(MvtTileCacheModel, (layer_id, endpoint, z, x, y))
-    return row.tile_bytes if row is not None else None
+    """Return the cached tile if it belongs to the map's current generation, else None."""
+    return db.execute(
+        select(MvtTileCacheModel.tile_bytes)
+        .join(LayerModel, LayerModel.id == MvtTileCacheModel.layer_id)
+        .join(MapModel, MapModel.id == LayerModel.map_id)
+        .where(
+            MvtTileCacheModel.layer_id == layer_id,
+            MvtTileCacheModel.endpoint == endpoint,
+            MvtTileCacheModel.z == z,
+            MvtTileCacheModel.x == x,
+            MvtTileCacheModel.y == y,
+            MvtTileCacheModel.generation == MapModel.tile_version,
+        )
+    ).scalar()
 
 
-def save_tile(db: Session, layer_id: int, endpoint: str, z: int, x: int, y: int, tile_bytes: bytes) -> None:
-    stmt = (
-        pg_insert(MvtTileCacheModel)
-        .values(layer_id=layer_id, endpoint=endpoint, z=z, x=x, y=y, tile_bytes=tile_bytes)
-        .on_conflict_do_nothing()
+def get_tiles(
+    db: Session, endpoint: str, keys: list[tuple[int, int, int, int]]
+) -> dict[tuple[int, int, int, int], bytes]:
+    """Look up many (layer_id, z, x, y) tiles in one query. Misses and stale tiles are absent from the result."""
+    if not keys:
+        return {}
+    rows = db.execute(
+        select(
+            MvtTileCacheModel.layer_id,
+            MvtTileCacheModel.z,
+            MvtTileCacheModel.x,
+            MvtTileCacheModel.y,
+            MvtTileCacheModel.tile_bytes,
+        )
+        .join(LayerModel, LayerModel.id == MvtTileCacheModel.layer_id)
+        .join(MapModel, MapModel.id == LayerModel.map_id)
+        .where(
+            MvtTileCacheModel.endpoint == endpoint,
+            tuple_(MvtTileCacheModel.layer_id, MvtTileCacheModel.z, MvtTileCacheModel.x, MvtTileCacheModel.y).in_(keys),
+            MvtTileCacheModel.generation == MapModel.tile_version,
+        )
+    ).all()
+    return {(layer_id, z, x, y): tile_bytes for layer_id, z, x, y, tile_bytes in rows}
+
+
+def _upsert_tiles(rows: list[dict[str, Any]]) -> Any:
+    """INSERT for layer tiles that replaces a cached row only when the new one is a later generation."""
+    stmt = pg_insert(MvtTileCacheModel).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[
+            MvtTileCacheModel.layer_id,
+            MvtTileCacheModel.endpoint,
+            MvtTileCacheModel.z,
+            MvtTileCacheModel.x,
+            MvtTileCacheModel.y,
+        ],
+        set_={"tile_bytes": stmt.excluded.tile_bytes, "generation": stmt.excluded.generation},
+        where=MvtTileCacheModel.generation < stmt.excluded.generation,
+    )
+
+
+def save_tile(
+    db: Session, layer_id: int, endpoint: str, z: int, x: int, y: int, tile_bytes: bytes, generation: int
+) -> None:
+    """Cache a tile rendered under ``generation`` (the map's tile_version read before rendering) and commit."""
+    db.execute(
+        _upsert_tiles([
+            {
+                "layer_id": layer_id,
+                "endpoint": endpoint,
+                "z": z,
+                "x": x,
+                "y": y,
+                "tile_bytes": tile_bytes,
+                "generation": generation,
+            }
+        ])
     )
-    db.execute(stmt)
     db.commit()
 
 
 def save_tiles_batch(db: Session, rows: list[dict[str, Any]]) -> None:
-    """Bulk-insert tiles without committing. Caller is responsible for the commit."""
+    """Bulk-insert tiles without committing. Caller is responsible for the commit.
+
+    Each row needs a ``generation``, as for save_tile.
+    """
     if not rows:
         return
-    db.execute(pg_insert(MvtTileCacheModel).values(rows).on_conflict_do_nothing())
+    db.execute(_upsert_tiles(rows))
+
+
+def get_map_tile(db: Session, map_id: str, z: int, x: int, y: int) -> bytes | None:
+    """Return the cached map-level tile, or None on a miss or a stale generation."""
+    return db.execute(
+        select(MvtMapTileCacheModel.tile_bytes)
+        .join(MapModel, MapModel.id == MvtMapTileCacheModel.map_id)
+        .where(
+            MvtMapTileCacheModel.map_id == map_id,
+            MvtMapTileCacheModel.z == z,
+            MvtMapTileCacheModel.x == x,
+            MvtMapTileCacheModel.y == y,
+            MvtMapTileCacheModel.generation == MapModel.tile_version,
+        )
+    ).scalar()
+
+
+def save_map_tile(db: Session, map_id: str, z: int, x: int, y: int, tile_bytes: bytes, generation: int) -> None:
+    """Cache a map-level tile rendered under ``generation`` and commit."""
+    stmt = pg_insert(MvtMapTileCacheModel).values(
+        map_id=map_id, z=z, x=x, y=y, tile_bytes=tile_bytes, generation=generation
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[
+                MvtMapTileCacheModel.map_id,
+                MvtMapTileCacheModel.z,
+                MvtMapTileCacheModel.x,
+                MvtMapTileCacheModel.y,
+            ],
+            set_={"tile_bytes": stmt.excluded.tile_bytes, "generation": stmt.excluded.generation},
+            where=MvtMapTileCacheModel.generation < stmt.excluded.generation,
+        )
+    )
+    db.commit()
+
+
+def delete_regions(db: Session, regions: list[DirtyRegion]) -> None:
+    """Delete every cached tile, of any generation, over the given regions.
+
+    Layer tiles of each region's layer and the layer below it are dropped, along
+    with the map-level tiles covering the same ranges. Tile coords come straight
+    from the meter offset into the Mercator world square. Does not commit.
+    """
+    if not regions:
+        return
+    db.execute(
+        text(f"""
+            WITH regions AS (
+                SELECT *
+                FROM unnest(
+                    CAST(:layer_ids AS int[]),
+                    CAST(:xmin AS float8[]),
+                    CAST(:ymin AS float8[]),
+                    CAST(:xmax AS float8[]),
+                    CAST(:ymax AS float8[])
+                ) AS r(layer_id, xmin, ymin, xmax, ymax)
+            ),
+            tile_ranges AS (
+                SELECT
+                    target.id AS layer_id,
+                    target.map_id,
+                    z::smallint AS z,
+                    GREATEST(0, FLOOR((r.xmin + 20037508.3427892) / 40075016.6855784 * POW(2, z))::int) AS x_min,
+                    FLOOR((r.xmax + 20037508.3427892) / 40075016.6855784 * POW(2, z))::int             AS x_max,
+                    GREATEST(0, FLOOR((20037508.3427892 - r.ymax) / 40075016.6855784 * POW(2, z))::int) AS y_min,
+                    FLOOR((20037508.3427892 - r.ymin) / 40075016.6855784 * POW(2, z))::int             AS y_max
+                FROM regions r
+                JOIN layers l ON l.id = r.layer_id
+                JOIN layers target ON target.map_id = l.map_id AND target."order" IN (l."order", l."order" - 1)
+                CROSS JOIN generate_series({_MIN_ZOOM}, {_MAX_ZOOM}) z
+            ),
+            layer_tiles AS (
+                DELETE FROM mvt_tile_cache c
+                USING tile_ranges tr
+                WHERE c.layer_id = tr.layer_id
+                  AND c.z = tr.z
+                  AND c.x BETWEEN tr.x_min AND tr.x_max
+                  AND c.y BETWEEN tr.y_min AND tr.y_max
+            )
+            DELETE FROM mvt_map_tile_cache mc
+            USING tile_ranges tr
+            WHERE mc.map_id = tr.map_id
+              AND mc.z = tr.z
+              AND mc.x BETWEEN tr.x_min AND tr.x_max
+              AND mc.y BETWEEN tr.y_min AND tr.y_max
+        """),  # noqa: S608
+        {
+            "layer_ids": [r.layer_id for r in regions],
+            "xmin": [r.xmin for r in regions],
+            "ymin": [r.ymin for r in regions],
+            "xmax": [r.xmax for r in regions],
+            "ymax": [r.ymax for r in regions],
+        },
+    )
+
+
+def advance_generation(db: Session, map_id: str, regions: list[DirtyRegion]) -> int | None:
+    """Bump the map's tile_version, keeping cached tiles outside ``regions`` servable.
+
+    Returns the new tile_version, or None if the map is gone. Does not commit;
+    call it last in the transaction that changed the geometry. The order of the
+    statements is what makes concurrent renders safe:
+
+    1. Re-stamp every tile of the current generation with the new one.
+    2. Delete every tile over ``regions``, whatever its generation. A tile
+       rendered from pre-change geometry and committed after step 1 was not
+       re-stamped; if it landed before this delete, the delete removes it.
+    3. Drop tiles from older generations, which can never be served again.
+
+    Anything rendered from pre-change geometry after that still carries the old
+    generation, so it is never served and is overwritten by the next render.
+    """
+    tile_version = db.execute(
+        update(MapModel)
+        .where(MapModel.id == map_id)
+        .values(tile_version=MapModel.tile_version + 1)
+        .returning(MapModel.tile_version)
+    ).scalar()
+    if tile_version is None:
+        return None
+    previous = tile_version - 1
+    layer_ids = select(LayerModel.id).where(LayerModel.map_id == map_id).scalar_subquery()
+
+    db.execute(
+        update(MvtTileCacheModel)
+        .where(MvtTileCacheModel.layer_id.in_(layer_ids), MvtTileCacheModel.generation == previous)
+        .values(generation=tile_version),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        update(MvtMapTileCacheModel)
+        .where(MvtMapTileCacheModel.map_id == map_id, MvtMapTileCacheModel.generation == previous)
+        .values(generation=tile_version),
+        execution_options={"synchronize_session": False},
+    )
+    delete_regions(db, regions)
+    db.execute(
+        delete(MvtTileCacheModel).where(
+            MvtTileCacheModel.layer_id.in_(layer_ids), MvtTileCacheModel.generation < previous
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        delete(MvtMapTileCacheModel).where(
+            MvtMapTileCacheModel.map_id == map_id, MvtMapTileCacheModel.generation < previous
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    db.flush()
+    return tile_version
 
 
 def invalidate_layer(db: Session, layer_id: int) -> None:
@@ -1,11 +1,17 @@
 """Permissions service module."""
 
 import logging
+import threading
+import time
 from typing import Annotated
 
 from fastapi import Depends
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-from src.app.database import DatabaseSession
+from src.app.config import app_settings
+from src.app.database import AsyncDatabaseSession, DatabaseSession
 from src.models.permissions import MapRole, UploadRole, UserMapRoleModel, UserUploadRoleModel
 
 from .base import BaseService
@@ -13,6 +19,53 @@ from .base import BaseService
 logger = logging.getLogger(__name__)
 
 
+class _MapRoleCache:
+    """Per-process TTL cache of (user_id, map_id) -> the user's roles on the map.
+
+    Only users with at least one role are cached, so a role granted in another
+    process (an accepted invite) is seen straight away; a role revoked in
+    another process keeps working here for up to PERMISSIONS_ROLE_CACHE_TTL_S.
+    Changes made through PermissionService evict the entry in this process.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[int, str], tuple[float, frozenset[MapRole]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, map_id: str) -> frozenset[MapRole] | None:
+        with self._lock:
+            entry = self._entries.get((user_id, map_id))
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id, map_id]
+                return None
+            return entry[1]
+
+    def put(self, user_id: int, map_id: str, roles: frozenset[MapRole]) -> None:
+        ttl = app_settings.permissions.role_cache_ttl_s
+        if not roles or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id, map_id] = (time.monotonic() + ttl, roles)
+
+    def evict(self, user_id: int, map_id: str) -> None:
+        with self._lock:
+            self._entries.pop((user_id, map_id), None)
+
+    def evict_on_commit(self, db: Session, user_id: int, map_id: str) -> None:
+        """Evict now and again once db commits, so a check racing the commit cannot re-cache the old roles."""
+        self.evict(user_id, map_id)
+
+        def _evict(_session: Session) -> None:
+            self.evict(user_id, map_id)
+
+        event.listen(db, "after_commit", _evict, once=True)
+
+
+_map_roles = _MapRoleCache()
+
+
 class PermissionService(BaseService):
     """Permission service."""
 
@@ -25,18 +78,21 @@ class PermissionService(BaseService):
         )
         self.db.add(user_map_role)
         self.db.flush()
+        _map_roles.evict_on_commit(self.db, user_id, map_id)
         return user_map_role
 
-    def remove_map_role(self, user_id: int, map_id: int):
+    def remove_map_role(self, user_id: int, map_id: str):
         """Remove a roles from a user for a given map."""
         self.db.query(UserMapRoleModel).filter_by(user_id=user_id, map_id=map_id).delete()
         self.db.flush()
+        _map_roles.evict_on_commit(self.db, user_id, map_id)
 
     def update_map_role(self, user_id: int, map_id: str, role: MapRole) -> UserMapRoleModel:
         """Update a map role for a user."""
         user_map_role = self.db.query(UserMapRoleModel).filter_by(user_id=user_id, map_id=map_id).one()
         user_map_role.role = role
         self.db.flush()
+        _map_roles.evict_on_commit(self.db, user_id, map_id)
         return user_map_role
 
     def check_for_map_access(
@@ -45,13 +101,18 @@ class PermissionService(BaseService):
         map_id: str,
         map_roles: list[MapRole],
     ) -> bool:
-        """Check if the user has any of the roles in the list."""
-        map_role = self.db.query(UserMapRoleModel).filter(
-            UserMapRoleModel.user_id == user_id,
-            UserMapRoleModel.map_id == map_id,
-            UserMapRoleModel.role.in_(map_roles),
-        )
-        return map_role.count() > 0
+        """Check if the user has any of the roles in the list.
+
+        Roles are read once per PERMISSIONS_ROLE_CACHE_TTL_S per process; see _MapRoleCache.
+        """
+        roles = _map_roles.get(user_id, map_id)
+        if roles is None:
+            query = select(UserMapRoleModel.role).where(
+                UserMapRoleModel.user_id == user_id, UserMapRoleModel.map_id == map_id
+            )
+            roles = frozenset(self.db.scalars(query).all())
+            _map_roles.put(user_id, map_id, roles)
+        return not roles.isdisjoint(map_roles)
 
     def list_map_roles(
         self,
@@ -83,3 +144,37 @@ def _get_permission_service_dependency(db: DatabaseSession) -> PermissionService
 
 
 PermissionsServiceDependency = Annotated[PermissionService, Depends(_get_permission_service_dependency)]
+
+
+class AsyncPermissionService:
+    """PermissionService checks for routes on the asyncio engine.
+
+    Each check runs the sync implementation on the session's greenlet, so the
+    rules live in one place.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the service with the asyncio database session."""
+        self.db = db
+
+    async def check_for_map_access(
+        self,
+        user_id: int,
+        map_id: str,
+        map_roles: list[MapRole],
+    ) -> bool:
+        """Check if the user has any of the roles in the list."""
+        roles = _map_roles.get(user_id, map_id)
+        if roles is not None:
+            return not roles.isdisjoint(map_roles)
+        return await self.db.run_sync(
+            lambda session: PermissionService(db=session).check_for_map_access(user_id, map_id, map_roles)
+        )
+
+
+def _get_async_permission_service_dependency(db: AsyncDatabaseSession) -> AsyncPermissionService:
+    """Get async permission service dependency."""
+    return AsyncPermissionService(db=db)
+
+
+AsyncPermissionsServiceDependency = Annotated[AsyncPermissionService, Depends(_get_async_permission_service_dependency)]
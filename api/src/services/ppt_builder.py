@@ -13,13 +13,20 @@ Loads `ppt_assets/template.pptx` as a starting deck. The template has two slides
 Designers edit `template.pptx` in PowerPoint (colors, fonts, logo, marker
 positions). The code only depends on shape *names*, so layout changes do not
 require code changes.
+
+Slide images are downloaded by a small thread pool a few slides ahead of the
+slide being built (S3_PREFETCH_WORKERS), so S3 round trips overlap with
+assembly instead of adding up. Only that window of images is held in memory.
 """
 
-from collections.abc import Sequence
+import struct
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
 from io import BytesIO
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 from PIL import Image as PILImage
 from pptx import Presentation
@@ -27,11 +34,14 @@ from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN  # type: ignore[attr-defined]
 from pptx.util import Emu, Inches, Length, Pt
 
+from src.app.config import app_settings
 from src.models.exports import MapExportSlideModel
 from src.services.s3 import S3Service
 
 _TEMPLATE_PATH = Path(__file__).parent / "ppt_assets" / "template.pptx"
 
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
 # Table styling
 _HEADER_BG = RGBColor(0x6D, 0x4C, 0xE8)
 _HEADER_FG = RGBColor(0xFF, 0xFF, 0xFF)
@@ -85,10 +95,18 @@ def _delete_slide_at(prs: Any, index: int) -> None:
     sld_id_lst.remove(list(sld_id_lst)[index])
 
 
+def _image_size(img_bytes: bytes) -> tuple[int, int]:
+    """Return (width, height) in pixels, read from the IHDR chunk for PNGs (as the frontend uploads)."""
+    if img_bytes[:8] == _PNG_SIGNATURE and img_bytes[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", img_bytes[16:24])
+        return width, height
+    with PILImage.open(BytesIO(img_bytes)) as img:
+        return img.size
+
+
 def _fit_in_box(img_bytes: bytes, box_w: int, box_h: int) -> tuple[int, int, int, int]:
     """Return (left_offset, top_offset, width, height) in EMUs to center an image in a box."""
-    with PILImage.open(BytesIO(img_bytes)) as img:
-        iw, ih = img.size
+    iw, ih = _image_size(img_bytes)
     scale = min(box_w / iw, box_h / ih)
     w = round(iw * scale)
     h = round(ih * scale)
@@ -227,13 +245,38 @@ def _fill_content_table(slide: Any, node_data: list[dict[str, Any]]) -> None:
     _build_table(slide, left, top, width, height, node_data)
 
 
-def build_pptx_buffer(
+def _prefetch_images(slides: Sequence[MapExportSlideModel], s3: S3Service) -> Iterator[bytes | None]:
+    """Yield each slide's image bytes (None if it has none) in order, downloading ahead in a thread pool.
+
+    At most twice S3_PREFETCH_WORKERS downloads are in flight or waiting to be
+    consumed at a time.
+    """
+    workers = max(app_settings.s3.prefetch_workers, 1)
+
+    def fetch(key: str | None) -> bytes | None:
+        return s3.get_private_object(key=key).read() if key else None
+
+    keys = [slide.image_s3_key for slide in slides]
+    window = 2 * workers
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ppt-prefetch") as pool:
+        pending: deque[Future[bytes | None]] = deque(pool.submit(fetch, key) for key in keys[:window])
+        for key in keys[window:]:
+            yield pending.popleft().result()
+            pending.append(pool.submit(fetch, key))
+        while pending:
+            yield pending.popleft().result()
+
+
+def build_pptx(
     slides: Sequence[MapExportSlideModel],
     s3: S3Service,
+    output: IO[bytes],
     cover_title: str = "Territory Report",
     layer_names: dict[int, str] | None = None,
-) -> BytesIO:
-    """Build the .pptx in memory and return a seek-zeroed buffer.
+) -> None:
+    """Build the .pptx and write it to output.
+
+    Pass a spooled temporary file as output to keep large decks out of memory.
 
     `cover_title` populates the `title_slot` text on the cover slide.
     `layer_names` maps layer id → display name; when provided, a divider slide
@@ -250,7 +293,7 @@ def build_pptx_buffer(
         _replace_text(cover_title_shape, cover_title)
 
     last_layer_id: int | None = None
-    for slide_model in slides:
+    for slide_model, image_bytes in zip(slides, _prefetch_images(slides, s3), strict=True):
         if (
             divider_template is not None
             and layer_names is not None
@@ -264,10 +307,6 @@ def build_pptx_buffer(
                     _replace_text(divider_title_shape, section_title)
             last_layer_id = slide_model.layer_id
 
-        image_bytes: bytes | None = None
-        if slide_model.image_s3_key:
-            image_bytes = s3.get_private_object(key=slide_model.image_s3_key).read()
-
         new_slide = _duplicate_slide(prs, content_template)
         _fill_content_slide(new_slide, title=slide_model.title or "", image_bytes=image_bytes)
         _fill_content_table(new_slide, slide_model.node_data or [])
@@ -280,7 +319,4 @@ def build_pptx_buffer(
         _delete_slide_at(prs, 2)
     _delete_slide_at(prs, 1)
 
-    buf = BytesIO()
-    prs.save(buf)
-    buf.seek(0)
-    return buf
+    prs.save(output)
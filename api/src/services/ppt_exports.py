@@ -204,47 +204,29 @@ class PptExportService(BaseService):
         self.db.flush()
 
     def compute_slide_bbox(self, slide: MapExportSlideModel) -> tuple[float, float, float, float]:
-        """Compute and persist the WGS-84 bounding box for a slide via PostGIS ST_Extent.
+        """Compute and persist the WGS-84 bounding box for a slide from its nodes' stored boxes.
 
-        Uses geom_z3_merc (the lowest-resolution geometry, always present when computation
-        has run). The extent is taken in 3857 then projected to 4326 for the caller, which
-        expects (min_lng, min_lat, max_lng, max_lat) in degrees.
+        Takes the extent of the bbox_* columns ComputationService keeps on each
+        node, as (min_lng, min_lat, max_lng, max_lat) in degrees, so no geometry
+        is read or projected.
 
         Raises TerramapsException(422) if no geometry is available for the slide's nodes.
         Does not commit — caller owns the transaction.
         """
         if slide.parent_node_id is None:
-            sql = text("""
-                WITH bbox AS (
-                    SELECT ST_Transform(ST_Extent(geom_z3_merc)::geometry, 4326) AS geom
-                    FROM nodes
-                    WHERE layer_id = :layer_id
-                      AND geom_z3_merc IS NOT NULL
-                )
-                SELECT
-                    ST_XMin(geom) AS min_lng,
-                    ST_YMin(geom) AS min_lat,
-                    ST_XMax(geom) AS max_lng,
-                    ST_YMax(geom) AS max_lat
-                FROM bbox
-            """)
-            row = self.db.execute(sql, {"layer_id": slide.layer_id}).one()
+            where, params = "layer_id = :layer_id", {"layer_id": slide.layer_id}
         else:
-            sql = text("""
-                WITH bbox AS (
-                    SELECT ST_Transform(ST_Extent(geom_z3_merc)::geometry, 4326) AS geom
-                    FROM nodes
-                    WHERE parent_node_id = :parent_node_id
-                      AND geom_z3_merc IS NOT NULL
-                )
-                SELECT
-                    ST_XMin(geom) AS min_lng,
-                    ST_YMin(geom) AS min_lat,
-                    ST_XMax(geom) AS max_lng,
-                    ST_YMax(geom) AS max_lat
-                FROM bbox
-            """)
-            row = self.db.execute(sql, {"parent_node_id": slide.parent_node_id}).one()
+            where, params = "parent_node_id = :parent_node_id", {"parent_node_id": slide.parent_node_id}
+        sql = text(f"""
+            SELECT
+                MIN(bbox_min_lng) AS min_lng,
+                MIN(bbox_min_lat) AS min_lat,
+                MAX(bbox_max_lng) AS max_lng,
+                MAX(bbox_max_lat) AS max_lat
+            FROM nodes
+            WHERE {where}
+        """)  # noqa: S608
+        row = self.db.execute(sql, params).one()
 
         min_lng, min_lat, max_lng, max_lat = row.min_lng, row.min_lat, row.max_lng, row.max_lat
         if any(v is None for v in (min_lng, min_lat, max_lng, max_lat)):
@@ -1,6 +1,6 @@
 """S3 service."""
 
-from typing import Annotated, Any, BinaryIO, Literal
+from typing import IO, Annotated, Any, Literal
 
 import boto3
 from botocore.client import Config
@@ -29,7 +29,7 @@ class S3Service:
     def _key(self, prefix: PathPrefix, key: str) -> str:
         return f"{prefix}/{key}"
 
-    def _upload(self, *, file: BinaryIO, prefix: PathPrefix, key: str, content_type: str | None) -> None:
+    def _upload(self, *, file: IO[bytes], prefix: PathPrefix, key: str, content_type: str | None) -> None:
         try:
             self._client.upload_fileobj(
                 file,
@@ -53,11 +53,11 @@ class S3Service:
         except (NoCredentialsError, PartialCredentialsError) as err:
             raise S3CredentialsError from err
 
-    def upload_public_file(self, *, file: BinaryIO, content_type: str | None, key: str) -> None:
+    def upload_public_file(self, *, file: IO[bytes], content_type: str | None, key: str) -> None:
         """Upload a publicly accessible file (served at public/{key})."""
         self._upload(file=file, prefix="public", key=key, content_type=content_type)
 
-    def upload_private_file(self, *, file: BinaryIO, content_type: str | None, key: str) -> None:
+    def upload_private_file(self, *, file: IO[bytes], content_type: str | None, key: str) -> None:
         """Upload a private file (accessible only to authorized services)."""
         self._upload(file=file, prefix="private", key=key, content_type=content_type)
 
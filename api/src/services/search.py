@@ -0,0 +1,99 @@
+"""Map search helpers.
+
+Node names are matched with ILIKE, which the pg_trgm GIN index on nodes.name
+serves. pg_trgm can only index a pattern that yields a whole trigram, so a
+search shorter than three characters matches at the start of names ('ab%') and
+a longer one anywhere ('%abc%'). Matches rank exact names first, then prefixes,
+then by trigram similarity. Zip codes match by prefix through their
+varchar_pattern_ops index.
+
+Typeahead sends the same prefixes over and over, so search results are cached
+per process. Entries are keyed by the map's tile_version, which every name edit
+and recompute bumps; an edit whose recompute is still pending shows up after at
+most SEARCH_CACHE_TTL_S.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import ColumnElement, case, func
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.app.config import app_settings
+from src.schemas.graph import SearchResults
+
+logger = logging.getLogger(__name__)
+
+_MIN_TRIGRAM_QUERY = 3
+
+SearchKey = tuple[str, int, int | None, str, int]
+"""(map_id, tile_version, layer_id, lower-cased query, limit)."""
+
+
+def _escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def name_contains(column: InstrumentedAttribute[str], q: str) -> ColumnElement[bool]:
+    """Case-insensitive substring match on column, with q's LIKE wildcards taken literally."""
+    return column.ilike(f"%{_escape_like(q)}%", escape="\\")
+
+
+def name_matches(column: InstrumentedAttribute[str], q: str) -> ColumnElement[bool]:
+    """Typeahead match: a prefix match for short queries, a substring match otherwise."""
+    if len(q) < _MIN_TRIGRAM_QUERY:
+        return column.ilike(f"{_escape_like(q)}%", escape="\\")
+    return name_contains(column, q)
+
+
+def name_rank(column: InstrumentedAttribute[str], q: str) -> list[ColumnElement[Any]]:
+    """ORDER BY clauses putting the exact name first, then prefixes, then the closest trigram matches."""
+    return [
+        case(
+            (func.lower(column) == q.lower(), 0),
+            (column.ilike(f"{_escape_like(q)}%", escape="\\"), 1),
+            else_=2,
+        ),
+        func.similarity(column, q).desc(),
+        column.asc(),
+    ]
+
+
+def zip_prefix(column: InstrumentedAttribute[str], q: str) -> ColumnElement[bool]:
+    """Zip codes starting with q."""
+    return column.like(f"{_escape_like(q)}%", escape="\\")
+
+
+class _SearchCache:
+    """Per-process LRU of search results, each entry valid for SEARCH_CACHE_TTL_S."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[SearchKey, tuple[float, SearchResults]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: SearchKey) -> SearchResults | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: SearchKey, results: SearchResults) -> None:
+        settings = app_settings.search
+        if settings.cache_ttl_s <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + settings.cache_ttl_s, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.cache_max_entries:
+                self._entries.popitem(last=False)
+
+
+results_cache = _SearchCache()
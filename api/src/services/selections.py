@@ -0,0 +1,104 @@
+"""Server-side lasso selections.
+
+POST /spatial/select stores the features it matched under a token (see
+SpatialSelectionModel). Summary, bulk zip assignment and bulk reparent accept
+that token in place of the id list and filter with a subquery on the token,
+so a selection of thousands of zips never travels back to the API or gets
+bound as an array.
+"""
+
+import logging
+import uuid
+from typing import Any, Literal
+
+from sqlalchemy import Select, delete, func, select, text
+from sqlalchemy.orm import Session
+
+from src.app.config import app_settings
+from src.exceptions import TerramapsException
+from src.models.graph import LayerModel
+from src.models.spatial import SpatialSelectionModel
+
+logger = logging.getLogger(__name__)
+
+SelectionColumn = Literal["zip_code", "node_id"]
+
+
+def store_selection(
+    db: Session,
+    layer_id: int,
+    user_id: int,
+    column: SelectionColumn,
+    select_sql: str,
+    params: dict[str, Any],
+) -> str:
+    """Store the keys select_sql returns as a new selection and return its token.
+
+    select_sql must return one column, the zip code or node id per ``column``.
+    Sweeps expired selections first. Does not commit.
+    """
+    db.execute(delete(SpatialSelectionModel).where(SpatialSelectionModel.expires_at < func.now()))
+    token = str(uuid.uuid4())
+    db.execute(
+        text(f"""
+            INSERT INTO spatial_selections (token, layer_id, user_id, expires_at, {column})
+            SELECT CAST(:selection_token AS uuid), :selection_layer_id, :selection_user_id,
+                   now() + make_interval(secs => :selection_ttl_s), sel.key
+            FROM ({select_sql}) AS sel(key)
+        """),  # noqa: S608
+        {
+            **params,
+            "selection_token": token,
+            "selection_layer_id": layer_id,
+            "selection_user_id": user_id,
+            "selection_ttl_s": app_settings.spatial.selection_ttl_s,
+        },
+    )
+    return token
+
+
+def check_selection(
+    db: Session, token: str, user_id: int, column: SelectionColumn, layer_id: int | None = None
+) -> None:
+    """Ensure token names a live selection made by user_id of column's kind, on layer_id when given.
+
+    Zip code selections come from the zip layer (order 0), node id selections
+    from a node layer (order >= 1).
+
+    Raises:
+        TerramapsException(404) if the selection is unknown, expired, empty, someone else's or on another layer
+        TerramapsException(400) if the selection holds the other kind of feature
+    """
+    query = (
+        select(LayerModel.order)
+        .join(SpatialSelectionModel, SpatialSelectionModel.layer_id == LayerModel.id)
+        .where(
+            SpatialSelectionModel.token == token,
+            SpatialSelectionModel.user_id == user_id,
+            SpatialSelectionModel.expires_at > func.now(),
+        )
+        .limit(1)
+    )
+    if layer_id is not None:
+        query = query.where(SpatialSelectionModel.layer_id == layer_id)
+    order = db.execute(query).scalar()
+    if order is None:
+        raise TerramapsException(404, "Selection not found or expired. Select the features again.")
+    if (order == 0) != (column == "zip_code"):
+        kind = "zip codes" if column == "zip_code" else "nodes"
+        raise TerramapsException(400, f"Selection does not hold {kind}.")
+
+
+def selection_keys(token: str, column: SelectionColumn) -> Select[Any]:
+    """Subquery of the selection's zip codes or node ids, for use with ``in_()``."""
+    return select(getattr(SpatialSelectionModel, column)).where(SpatialSelectionModel.token == token)
+
+
+def selection_keys_sql(column: SelectionColumn) -> str:
+    """The same subquery for raw SQL, bound to ``:selection_token``."""
+    return f"SELECT {column} FROM spatial_selections WHERE token = CAST(:selection_token AS uuid)"  # noqa: S608
+
+
+def selection_size(db: Session, token: str) -> int:
+    """Number of features in the selection."""
+    return db.execute(select(func.count()).where(SpatialSelectionModel.token == token)).scalar_one()
@@ -0,0 +1,387 @@
+"""ZTT (zip-to-territory) export.
+
+The export has a row for every zip code in the country (or every assigned
+one), so it is written without ever holding the sheet in memory. A single query
+flattens the hierarchy into a column per layer and its rows come off a
+server-side cursor in batches, openpyxl's write-only mode serializes each row to
+a temp file as it is appended, and the finished workbook is streamed to the
+client in chunks.
+
+Write-only cells cannot be restyled once written, so every cell takes one of
+three named styles registered on the workbook, and column widths, which have to
+be written before the first row, are computed up front in SQL instead of by
+re-scanning the rows. The CSV variant skips openpyxl and streams rows straight
+from the cursor.
+
+Large maps are exported by generate_ztt_task instead of in the request. The
+built file goes to S3 and is reused until the map changes (see ZttExportModel).
+"""
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import IO, Annotated, Any, Literal
+
+import openpyxl
+import openpyxl.utils
+from fastapi import Depends
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from src.app.database import DatabaseSession
+from src.exceptions import TerramapsException
+from src.models.exports import ZttExportModel
+from src.models.graph import LayerModel, MapModel, NodeModel, ZipAssignmentModel
+from src.services.base import BaseService
+from src.services.s3 import S3Service
+
+logger = logging.getLogger(__name__)
+
+ZttFormat = Literal["xlsx", "csv"]
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MEDIA_TYPES: dict[ZttFormat, str] = {"xlsx": XLSX_MEDIA_TYPE, "csv": "text/csv"}
+
+_BATCH = 5000
+_CHUNK = 64 * 1024
+_MAX_WIDTH = 40
+_HEADER_STYLE = "ztt_header"
+_CELL_STYLE = "ztt_cell"
+_ALT_CELL_STYLE = "ztt_cell_alt"
+
+# A generating export not touched for this long is assumed to belong to a dead worker.
+_STALE_GENERATING = timedelta(minutes=30)
+
+
+@dataclass(frozen=True)
+class ZttExport:
+    """Everything needed to write a map's ZTT export, resolved before the response starts."""
+
+    map_id: str
+    map_name: str
+    zip_layer_id: int
+    upper_layers: list[tuple[int, str]]
+    """(layer_id, name) of the node layers, in layer order."""
+    data_fields: list[tuple[str, str]]
+    """(jsonb key, column label) of the map's data fields, in config order."""
+    assigned_only: bool = False
+    """Only export zips assigned to a territory, instead of every zip in the country."""
+
+    @property
+    def headers(self) -> list[str]:
+        """Column headers: zip_code, one per node layer, then one per data field."""
+        return ["zip_code"] + [name for _, name in self.upper_layers] + [label for _, label in self.data_fields]
+
+    @property
+    def layout_hash(self) -> str:
+        """Digest of what shapes the file besides zips and nodes: the map name, layers, data fields and zip scope."""
+        layout = [self.map_name, self.upper_layers, self.data_fields, self.assigned_only]
+        return hashlib.sha256(json.dumps(layout, separators=(",", ":")).encode()).hexdigest()
+
+    def filename(self, fmt: ZttFormat) -> str:
+        """Download filename for the export in fmt."""
+        return ztt_filename(self.map_name, fmt)
+
+
+def ztt_filename(map_name: str, fmt: ZttFormat) -> str:
+    """Download filename for a map's ZTT export in fmt."""
+    return f"{map_name.replace(' ', '_').lower()}_ztt.{fmt}"
+
+
+def _rows_sql(export: ZttExport) -> tuple[str, dict[str, Any]]:
+    """One query for the export's rows: the zip code, an ancestor name per node layer, then the data fields.
+
+    The recursive CTE walks up from each node that parents a zip, so a chain is
+    walked once per node rather than once per zip, and the GROUP BY pivots each
+    chain into a column per layer. Every column comes back as text with blanks
+    for missing values, ready for the writers.
+    """
+    params: dict[str, Any] = {"zip_layer_id": export.zip_layer_id, "depth_limit": len(export.upper_layers)}
+    columns = ["za.zip_code" if export.assigned_only else "gz.zip_code"]
+    pivot: list[str] = []
+    for i, (layer_id, _) in enumerate(export.upper_layers):
+        params[f"layer_{i}"] = layer_id
+        pivot.append(f"MAX(chain.name) FILTER (WHERE chain.layer_id = :layer_{i}) AS t{i}")
+        columns.append(f"COALESCE(t.t{i}, '')")
+    for i, (key, _) in enumerate(export.data_fields):
+        params[f"field_{i}"] = key
+        columns.append(f"COALESCE(za.data ->> :field_{i}, '')")
+
+    territories = ""
+    territory_join = ""
+    if pivot:
+        territories = f"""
+            WITH RECURSIVE chain AS (
+                SELECT n.id AS start_id, n.name, n.layer_id, n.parent_node_id, 1 AS depth
+                FROM nodes n
+                WHERE n.id IN (SELECT parent_node_id FROM zip_assignments WHERE layer_id = :zip_layer_id)
+                UNION ALL
+                SELECT chain.start_id, p.name, p.layer_id, p.parent_node_id, chain.depth + 1
+                FROM chain
+                JOIN nodes p ON p.id = chain.parent_node_id
+                WHERE chain.depth < :depth_limit
+            ),
+            territories AS (
+                SELECT start_id AS node_id, {", ".join(pivot)}
+                FROM chain
+                GROUP BY start_id
+            )
+        """  # noqa: S608
+        territory_join = "LEFT JOIN territories t ON t.node_id = za.parent_node_id"
+
+    if export.assigned_only:
+        source = f"""
+            FROM zip_assignments za
+            {territory_join}
+            WHERE za.layer_id = :zip_layer_id AND za.parent_node_id IS NOT NULL
+            ORDER BY za.zip_code
+        """
+    else:
+        source = f"""
+            FROM geography_zip_codes gz
+            LEFT JOIN zip_assignments za ON za.zip_code = gz.zip_code AND za.layer_id = :zip_layer_id
+            {territory_join}
+            ORDER BY gz.zip_code
+        """
+    return f"{territories} SELECT {', '.join(columns)} {source}", params
+
+
+def _named_styles() -> list[NamedStyle]:
+    left = Alignment(horizontal="left", vertical="center")
+    return [
+        NamedStyle(
+            name=_HEADER_STYLE,
+            font=Font(bold=True, color="FFFFFF", size=10),
+            fill=PatternFill(start_color="1E293B", end_color="1E293B", fill_type="solid"),
+            alignment=left,
+        ),
+        NamedStyle(name=_CELL_STYLE, alignment=left),
+        NamedStyle(
+            name=_ALT_CELL_STYLE,
+            fill=PatternFill(start_color="F8FAFC", end_color="F8FAFC", fill_type="solid"),
+            alignment=left,
+        ),
+    ]
+
+
+class _StyledRows:
+    """Builds write-only rows from one reusable cell per column and style.
+
+    A write-only sheet serializes each row as soon as it is appended, so the
+    same cells can carry the next row's values instead of allocating and
+    styling fresh ones for every cell of the export.
+    """
+
+    def __init__(self, ws: WriteOnlyWorksheet, columns: int) -> None:
+        self._cells: dict[str, list[Cell]] = {}
+        for style in (_HEADER_STYLE, _CELL_STYLE, _ALT_CELL_STYLE):
+            cells = [WriteOnlyCell(ws) for _ in range(columns)]
+            for cell in cells:
+                cell.style = style
+            self._cells[style] = cells
+
+    def row(self, values: list[str], style: str) -> list[Cell]:
+        cells = self._cells[style]
+        for cell, value in zip(cells, values, strict=True):
+            cell.value = value
+        return cells
+
+
+class ZttExportService(BaseService):
+    """Writes a map's zip-to-territory hierarchy as XLSX or CSV."""
+
+    def prepare(self, map_id: str, *, assigned_only: bool = False) -> ZttExport:
+        """Load the map's layers and data fields.
+
+        Raises:
+            TerramapsException(404) if the map, its layers or its zip layer are missing
+        """
+        map_model = self.db.get(MapModel, map_id)
+        if not map_model:
+            raise TerramapsException(404, "Map not found.")
+
+        layers = (
+            self.db.execute(select(LayerModel).where(LayerModel.map_id == map_id).order_by(LayerModel.order))
+            .scalars()
+            .all()
+        )
+        if not layers:
+            raise TerramapsException(404, "No layers found for this map.")
+
+        zip_layer = next((la for la in layers if la.order == 0), None)
+        if not zip_layer:
+            raise TerramapsException(404, "No zip layer found.")
+
+        return ZttExport(
+            map_id=map_id,
+            map_name=map_model.name,
+            zip_layer_id=zip_layer.id,
+            upper_layers=[(la.id, la.name) for la in layers if la.order >= 1],
+            data_fields=[
+                (entry["field"], entry.get("label") or entry["field"]) for entry in (map_model.data_field_config or [])
+            ],
+            assigned_only=assigned_only,
+        )
+
+    def rows(self, export: ZttExport) -> Iterator[list[str]]:
+        """Yield the export's rows, in zip order, read through a server-side cursor.
+
+        Territory columns are blank for unassigned zips, data columns for missing values.
+        """
+        sql, params = _rows_sql(export)
+        for row in self.db.execute(text(sql).execution_options(yield_per=_BATCH), params):
+            yield list(row)
+
+    def column_widths(self, export: ZttExport) -> list[int]:
+        """Width of every column: its longest value plus padding, capped at 40, computed in SQL."""
+        longest: dict[str, int] = {}  # zip codes are five characters, narrower than their header
+        if export.upper_layers:
+            by_layer = dict(
+                self.db.execute(
+                    select(NodeModel.layer_id, func.max(func.length(NodeModel.name)))
+                    .where(NodeModel.layer_id.in_([layer_id for layer_id, _ in export.upper_layers]))
+                    .group_by(NodeModel.layer_id)
+                )
+                .tuples()
+                .all()
+            )
+            longest.update({name: by_layer.get(layer_id) or 0 for layer_id, name in export.upper_layers})
+        if export.data_fields:
+            lengths = self.db.execute(
+                select(
+                    *(func.max(func.length(ZipAssignmentModel.data[key].astext)) for key, _ in export.data_fields)
+                ).where(ZipAssignmentModel.layer_id == export.zip_layer_id)
+            ).one()
+            longest.update({label: length or 0 for (_, label), length in zip(export.data_fields, lengths, strict=True)})
+        return [min(max(len(header), longest.get(header, 0)) + 4, _MAX_WIDTH) for header in export.headers]
+
+    def save_xlsx(self, export: ZttExport, output: IO[bytes]) -> None:
+        """Write the export to output as a styled workbook."""
+        wb = openpyxl.Workbook(write_only=True)
+        for style in _named_styles():
+            wb.add_named_style(style)
+        ws = wb.create_sheet(export.map_name[:31])  # Excel sheet name max = 31 chars
+
+        headers = export.headers
+        for col_idx, width in enumerate(self.column_widths(export), start=1):
+            ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = width
+        ws.row_dimensions[1].height = 22
+        ws.sheet_format.defaultRowHeight = 16
+        ws.sheet_format.customHeight = True
+
+        styled = _StyledRows(ws, len(headers))
+        ws.append(styled.row(headers, _HEADER_STYLE))
+        for row_idx, row in enumerate(self.rows(export), start=2):
+            ws.append(styled.row(row, _ALT_CELL_STYLE if row_idx % 2 == 0 else _CELL_STYLE))
+
+        wb.save(output)
+
+    def write_xlsx(self, export: ZttExport) -> Iterator[bytes]:
+        """Write the export as a styled workbook and yield the file in chunks."""
+        with tempfile.TemporaryFile() as output:
+            self.save_xlsx(export, output)
+            output.seek(0)
+            while chunk := output.read(_CHUNK):
+                yield chunk
+
+    def write_csv(self, export: ZttExport) -> Iterator[bytes]:
+        """Write the export as CSV, yielding a chunk per batch of rows."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(export.headers)
+        for row_idx, row in enumerate(self.rows(export), start=1):
+            writer.writerow(row)
+            if row_idx % _BATCH == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    def save(self, export: ZttExport, fmt: ZttFormat, output: IO[bytes]) -> None:
+        """Write the export to output in fmt."""
+        if fmt == "xlsx":
+            self.save_xlsx(export, output)
+            return
+        for chunk in self.write_csv(export):
+            output.write(chunk)
+
+    def start_export(self, export: ZttExport, fmt: ZttFormat) -> tuple[ZttExportModel, bool]:
+        """Return the export job for the map's current state, and whether a worker must build it.
+
+        Reuses the job of an unchanged map whether it is complete or still
+        generating. A failed job, or one left generating by a dead worker, is
+        reset for another try. The job row stays locked until the caller
+        commits, so concurrent requests hand it to a single worker. Does not commit.
+        """
+        tile_version, edit_version = self.db.execute(
+            select(MapModel.tile_version, MapModel.edit_version).where(MapModel.id == export.map_id)
+        ).one()
+        key = {
+            "map_id": export.map_id,
+            "tile_version": tile_version,
+            "edit_version": edit_version,
+            "format": fmt,
+            "layout_hash": export.layout_hash,
+        }
+        inserted = self.db.execute(
+            insert(ZttExportModel)
+            .values(**key, status="generating", assigned_only=export.assigned_only)
+            .on_conflict_do_nothing()
+            .returning(ZttExportModel.id)
+        ).scalar()
+        job = self.db.execute(select(ZttExportModel).filter_by(**key).with_for_update()).scalar_one()
+        if inserted is not None:
+            return job, True
+        now = datetime.now(UTC)
+        if job.status == "failed" or (job.status == "generating" and job.updated_at < now - _STALE_GENERATING):
+            job.status = "generating"
+            job.error = None
+            job.updated_at = now
+            return job, True
+        return job, False
+
+    def delete_superseded(self, job: ZttExportModel, s3: S3Service) -> None:
+        """Delete the finished exports job replaces, and their files.
+
+        Those are exports of the same map, format and layout at an older map
+        state: both versions only grow, so that is any other row at or below
+        job's tile_version and edit_version. Exports with another layout (say,
+        assigned_only) are still current for their own requests and are kept.
+        """
+        stale = (
+            self.db.execute(
+                select(ZttExportModel).where(
+                    ZttExportModel.map_id == job.map_id,
+                    ZttExportModel.format == job.format,
+                    ZttExportModel.layout_hash == job.layout_hash,
+                    ZttExportModel.id != job.id,
+                    ZttExportModel.tile_version <= job.tile_version,
+                    ZttExportModel.edit_version <= job.edit_version,
+                    ZttExportModel.status != "generating",
+                )
+            )
+            .scalars()
+            .all()
+        )
+        for old in stale:
+            if old.s3_key:
+                s3.delete_private_file(key=old.s3_key)
+        if stale:
+            self.db.execute(delete(ZttExportModel).where(ZttExportModel.id.in_([old.id for old in stale])))
+
+
+def get_ztt_export_service(db: DatabaseSession) -> ZttExportService:
+    """Get ZTT export service."""
+    return ZttExportService(db=db)
+
+
+ZttExportServiceDependency = Annotated[ZttExportService, Depends(get_ztt_export_service)]
@@ -1,18 +1,22 @@
 """Celery app configuration and worker lifecycle."""
 
+import contextvars
 import logging
+import time
 from typing import Any
 
 from celery import Celery, signals
 from celery.app.task import Task
-from celery.signals import setup_logging, task_postrun
+from celery.signals import setup_logging, task_postrun, task_prerun
 from kombu import Queue
 from sqlalchemy import Engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from src.app.config import app_settings
 from src.app.database import get_db_driver
+from src.app.instrumentation import QueryStats, start_tracking, stop_tracking
 from src.app.logging import configure_logging
+from src.app.metrics import TASK_DURATION_SECONDS, clear_multiprocess_dir, start_metrics_server
 
 # https://github.com/sbdchd/celery-types?tab=readme-ov-file#install
 Task.__class_getitem__ = classmethod(lambda cls, *args, **kwargs: cls)  # type: ignore[attr-defined]
@@ -49,7 +53,7 @@ SessionLocal: sessionmaker[Session] | None = None
 def init_db_pool(*args: Any, **kwargs: Any) -> None:
     """Recreate database engine after fork to avoid sharing connections."""
     global engine, SessionLocal
-    engine, SessionLocal = get_db_driver("celery-worker")
+    engine, SessionLocal = get_db_driver("celery-worker", "worker")
 
 
 @signals.worker_process_shutdown.connect
@@ -97,6 +101,47 @@ def close_db_session(
         db.close()
 
 
+# ---------------------------------------------------------------------------
+# SQL instrumentation — per-task statement count, DB time and slowest statement,
+# plus the task duration histogram
+# ---------------------------------------------------------------------------
+
+_task_tracking: dict[str, tuple[contextvars.Token[QueryStats | None], float]] = {}
+
+
+@task_prerun.connect
+def start_task_query_tracking(task_id: str, **kwargs: Any) -> None:
+    """Attribute every statement the task runs to it."""
+    _task_tracking[task_id] = (start_tracking(), time.perf_counter())
+
+
+@task_postrun.connect
+def log_task_query_stats(sender: Task[Any, Any], task_id: str, state: str | None = None, **kwargs: Any) -> None:
+    """Log the task's duration and SQL work in the same key=value shape as request logs."""
+    tracked = _task_tracking.pop(task_id, None)
+    if tracked is None:
+        return
+    token, started_at = tracked
+    stats = stop_tracking(token)
+    duration = time.perf_counter() - started_at
+    task_name = (sender.name or "unknown").rsplit(".", 1)[-1]
+    TASK_DURATION_SECONDS.labels(task=task_name, state=state or "UNKNOWN").observe(duration)
+    logger.info(f"task {task_name} {state or 'UNKNOWN'} in {duration * 1000:.2f}ms {stats.log_fields()}")
+
+
+# ---------------------------------------------------------------------------
+# Metrics — served by the main worker process for every pool process
+# ---------------------------------------------------------------------------
+
+
+@signals.worker_init.connect
+def start_worker_metrics(**kwargs: Any) -> None:
+    """Clear stale multiprocess samples and start the metrics server before the pool forks."""
+    clear_multiprocess_dir()
+    if app_settings.metrics.worker_port is not None:
+        start_metrics_server(app_settings.metrics.worker_port)
+
+
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
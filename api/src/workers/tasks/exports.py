@@ -1,19 +1,24 @@
-"""Background tasks for PPT exports."""
+"""Background tasks for PPT and ZTT exports."""
 
 import logging
+import tempfile
 
 from sqlalchemy import select
 
-from src.models.exports import MapExportModel, MapExportSlideModel
+from src.models.exports import MapExportModel, MapExportSlideModel, ZttExportModel
 from src.models.graph import LayerModel, MapModel
-from src.services.ppt_builder import build_pptx_buffer
+from src.services.ppt_builder import build_pptx
 from src.services.s3 import S3Service
+from src.services.ztt_export import MEDIA_TYPES, ZttExportService
 from src.workers import DatabaseTask, celery_app
 
 logger = logging.getLogger(__name__)
 
 _S3_PREFIX = "map-exports"
 
+# Decks up to this size are assembled in memory; larger ones spill to a temp file.
+_SPOOL_MAX_BYTES = 32 * 1024 * 1024
+
 
 @celery_app.task(base=DatabaseTask, bind=True, queue="terramaps", name="src.workers.tasks.exports.generate_ppt_task")
 def generate_ppt_task(self: DatabaseTask, export_id: str) -> None:  # type: ignore[misc]
@@ -46,14 +51,15 @@ def generate_ppt_task(self: DatabaseTask, export_id: str) -> None:  # type: igno
                 select(LayerModel).where(LayerModel.map_id == export.map_id)
             ).scalars().all()
         }
-        buf = build_pptx_buffer(slides, s3, cover_title=cover_title, layer_names=layer_names)
-
         s3_key = f"{_S3_PREFIX}/{export_id}/report.pptx"
-        s3.upload_private_file(
-            file=buf,
-            content_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-            key=s3_key,
-        )
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES) as output:
+            build_pptx(slides, s3, output, cover_title=cover_title, layer_names=layer_names)
+            output.seek(0)
+            s3.upload_private_file(
+                file=output,
+                content_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                key=s3_key,
+            )
 
         export.pptx_s3_key = s3_key
         export.status = "complete"
@@ -68,3 +74,39 @@ def generate_ppt_task(self: DatabaseTask, export_id: str) -> None:  # type: igno
         export.error = str(exc)
         self.db.commit()
         raise
+
+
+@celery_app.task(base=DatabaseTask, bind=True, queue="terramaps", name="src.workers.tasks.exports.generate_ztt_task")
+def generate_ztt_task(self: DatabaseTask, export_id: str) -> None:  # type: ignore[misc]
+    """Build a map's ZTT file, upload it to S3 and delete the files it supersedes.
+
+    Sets status='complete' + s3_key on success, status='failed' + error on failure.
+    """
+    export = self.db.get(ZttExportModel, export_id)
+    if not export:
+        logger.error("generate_ztt_task: export %s not found", export_id)
+        return
+
+    try:
+        service = ZttExportService(self.db)
+        s3 = S3Service()
+        s3_key = f"{_S3_PREFIX}/ztt/{export_id}.{export.format}"
+        with tempfile.TemporaryFile() as output:
+            service.save(service.prepare(export.map_id, assigned_only=export.assigned_only), export.format, output)
+            output.seek(0)
+            s3.upload_private_file(file=output, content_type=MEDIA_TYPES[export.format], key=s3_key)
+
+        export.s3_key = s3_key
+        export.status = "complete"
+        export.error = None
+        service.delete_superseded(export, s3)
+        self.db.commit()
+        logger.info("generate_ztt_task [%s]: complete (tile_version %d)", export_id, export.tile_version)
+
+    except Exception as exc:
+        logger.exception("generate_ztt_task [%s]: failed", export_id)
+        self.db.rollback()
+        export.status = "failed"
+        export.error = str(exc)
+        self.db.commit()
+        raise
@@ -5,20 +5,22 @@ import hashlib
 import io
 import logging
 import re
+import resource
 import time
 from typing import Any
 
 import pandas as pd
-from sqlalchemy import select
+from sqlalchemy import Connection, Engine, event, func, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm.attributes import flag_modified
 
+from src.app.config import app_settings
 from src.models.geography import ZipCodeGeography
 from src.models.graph import LayerModel, MapModel, NodeModel, ZipAssignmentModel
 from src.models.jobs import MapJobModel
 from src.models.uploads import MapUploadModel
+from src.services import map_jobs, mvt_cache
 from src.services import mvt as mvt_service
-from src.services import mvt_cache
 from src.services.computation import ComputationService
 from src.services.s3 import S3Service
 from src.workers import DatabaseTask, celery_app
@@ -88,8 +90,87 @@ def _compute_field_precisions(df: pd.DataFrame, number_fields: list[dict[str, An
     return precisions
 
 
-def _set_import_step(task: DatabaseTask, upload: MapUploadModel, step: str) -> None:
+def _reset_peak_rss() -> None:
+    """Reset the kernel's RSS high-water mark so the next stage reports its own peak (Linux only)."""
+    with contextlib.suppress(OSError), open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+
+def _peak_rss_kb() -> int:
+    """Return peak RSS in KiB since the last reset, falling back to the process lifetime peak."""
+    with contextlib.suppress(OSError, ValueError), open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class _ImportProfiler:
+    """Collects wall time, DB time, rows processed and peak RSS per import stage.
+
+    DB time is accumulated from cursor execute events on the task's engine, so it
+    covers every statement issued during a stage (including flushes and commits).
+    Completed stages are kept in ``stages`` in the shape stored on
+    ``MapUploadModel.import_profile``.
+    """
+
+    def __init__(self, bind: Engine | Connection) -> None:
+        self.stages: list[dict[str, Any]] = []
+        self._bind = bind
+        self._current: dict[str, Any] | None = None
+        self._t0 = 0.0
+        self._db_seconds = 0.0
+        self._db_statements = 0
+        event.listen(bind, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(bind, "after_cursor_execute", self._after_cursor_execute)
+
+    def close(self) -> None:
+        """Detach the cursor execute listeners."""
+        event.remove(self._bind, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(self._bind, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn: Any, *args: Any) -> None:
+        conn.info["import_profile_t0"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn: Any, *args: Any) -> None:
+        t0 = conn.info.pop("import_profile_t0", None)
+        if t0 is not None:
+            self._db_seconds += time.perf_counter() - t0
+            self._db_statements += 1
+
+    def start(self, step: str) -> None:
+        """Close the running stage (if any) and start timing ``step``."""
+        self.finish()
+        _reset_peak_rss()
+        self._current = {"step": step, "rows": None}
+        self._t0 = time.perf_counter()
+        self._db_seconds = 0.0
+        self._db_statements = 0
+
+    def add_rows(self, rows: int) -> None:
+        """Add to the number of rows processed by the running stage."""
+        if self._current is not None:
+            self._current["rows"] = (self._current["rows"] or 0) + rows
+
+    def finish(self) -> None:
+        """Close the running stage and append it to ``stages``."""
+        if self._current is None:
+            return
+        self._current.update(
+            wall_ms=round((time.perf_counter() - self._t0) * 1000),
+            db_ms=round(self._db_seconds * 1000),
+            db_statements=self._db_statements,
+            peak_rss_kb=_peak_rss_kb(),
+        )
+        self.stages.append(self._current)
+        self._current = None
+
+
+def _set_import_step(task: DatabaseTask, upload: MapUploadModel, step: str, profiler: _ImportProfiler) -> None:
+    profiler.finish()
     upload.import_step = step
+    upload.import_profile = list(profiler.stages)
+    profiler.start(step)
     task.db.flush()
     task.db.commit()
 
@@ -150,8 +231,8 @@ def _insert_zip_layer(
     number_fields: list[dict[str, Any]],
     warnings: list[str],
     source_df: pd.DataFrame | None = None,
-) -> None:
-    """Insert ZipAssignmentModel rows for the zip (order=0) layer."""
+) -> int:
+    """Insert ZipAssignmentModel rows for the zip (order=0) layer and return the number inserted."""
     rows_df = rows_df.copy()
     rows_df[header] = rows_df[header].astype(str).str.zfill(5)
     zip_codes_in_file = rows_df[header].tolist()
@@ -206,6 +287,7 @@ def _insert_zip_layer(
 
     if zip_rows:
         task.db.execute(insert(ZipAssignmentModel).values(zip_rows))
+    return len(zip_rows)
 
 
 def _insert_node_layer(
@@ -234,33 +316,47 @@ def _insert_node_layer(
 
 
 @celery_app.task(base=DatabaseTask, bind=True, queue="terramaps", name="src.workers.tasks.maps.recompute_nodes_task")
-def recompute_nodes_task(self: DatabaseTask, job_id: str, map_id: str, affected_node_ids: list[int]) -> None:  # type: ignore[misc]
-    """Recompute geometry and data for affected nodes and their ancestors."""
+def recompute_nodes_task(
+    self: DatabaseTask, job_id: str, map_id: str, affected_node_ids: list[int] | None = None
+) -> None:  # type: ignore[misc]
+    """Recompute geometry and data for a job's affected nodes and their ancestors.
+
+    Jobs are debounced and run one at a time per map (see services/map_jobs.py):
+    while the job is still collecting edits, or another recompute for the map is
+    running, the task re-enqueues itself for later instead of running.
+    """
+    if affected_node_ids:
+        # Queued by a release that passed the node set in the message. Fold it into
+        # the map's pending job, which may be this one or the one that superseded it.
+        pending, created = map_jobs.schedule_recompute(self.db, map_id, set(affected_node_ids))
+        self.db.commit()
+        if pending.id != job_id:
+            if created:
+                recompute_nodes_task.apply_async(
+                    args=[pending.id, map_id], countdown=app_settings.celery.recompute_debounce_s
+                )
+            return
+
+    outcome, delay = map_jobs.claim_recompute(self.db, job_id)
+    if outcome == "defer":
+        recompute_nodes_task.apply_async(args=[job_id, map_id], countdown=delay)
+        return
     job = self.db.get(MapJobModel, job_id)
-    if not job:
-        logger.error("recompute_nodes_task: job %s not found", job_id)
+    if outcome == "skip" or job is None:
+        logger.info("recompute_nodes_task [%s]: nothing to run", job_id)
         return
 
     try:
-        job.status = "processing"
-        job.step = "Recomputing..."
-        self.db.commit()
-
-        affected = set(affected_node_ids)
+        affected = set(job.affected_node_ids or [])
         computation = ComputationService(db=self.db)
-        computation.recompute_from(affected)
+        regions = computation.recompute_from(affected)
         computation.compute_data_from(affected, map_id)
 
-        # Wipe every tile in the map: between handler return and now, clients
-        # may have triggered tile regeneration against in-flight (stale) geometry,
-        # which would have been cached. recompute_from's bbox-scoped invalidation
-        # won't catch those, so do a full sweep and bump tile_version.
-        all_layer_ids = set(self.db.execute(select(LayerModel.id).where(LayerModel.map_id == map_id)).scalars().all())
-        computation.invalidate_cache_for_layers(all_layer_ids)
-
-        map_model = self.db.get(MapModel, map_id)
-        if map_model:
-            map_model.tile_version += 1
+        # Between handler return and now, clients may have rendered and cached tiles
+        # against pre-recompute geometry. Those carry the current generation; moving
+        # the map to the next one in this transaction retires them unless they lie
+        # outside the changed regions, so hot unaffected tiles survive.
+        mvt_cache.advance_generation(self.db, map_id, regions)
 
         job.status = "complete"
         job.step = None
@@ -289,23 +385,27 @@ def import_map_task(self: DatabaseTask, map_id: str) -> None:  # type: ignore[mi
     if not upload:
         raise RuntimeError(f"import_map_task: upload record missing for map {map_id}")
 
+    profiler = _ImportProfiler(self.db.get_bind())
     try:
         layer_configs: list[dict[str, Any]] = upload.layer_config or []
         data_field_cfgs: list[dict[str, Any]] = upload.data_config or []
         warnings: list[str] = []
 
-        _set_import_step(self, upload, "Downloading file")
+        _set_import_step(self, upload, "Downloading file", profiler)
         df = _download_and_parse(upload.s3_key, upload.tab_index)
+        profiler.add_rows(len(df))
 
-        _set_import_step(self, upload, "Parsing spreadsheet")
+        _set_import_step(self, upload, "Parsing spreadsheet", profiler)
+        profiler.add_rows(len(df))
         layer_configs, data_field_cfgs, col_warnings = _validate_columns(df, layer_configs, data_field_cfgs)
         warnings.extend(col_warnings)
 
-        _set_import_step(self, upload, "Normalizing data")
+        _set_import_step(self, upload, "Normalizing data", profiler)
+        profiler.add_rows(len(df))
         for col in [lc["header"] for lc in layer_configs]:
             df[col] = df[col].apply(_normalize_cell)
 
-        _set_import_step(self, upload, "Inserting nodes")
+        _set_import_step(self, upload, "Inserting nodes", profiler)
         layer_rows = (
             self.db
             .execute(select(LayerModel).where(LayerModel.map_id == map_id).order_by(LayerModel.order.asc()))
@@ -344,15 +444,23 @@ def import_map_task(self: DatabaseTask, map_id: str) -> None:  # type: ignore[mi
                 rows_df["parent_node_id"] = None
 
             if order == 0:
-                _insert_zip_layer(self, layer_id, header, rows_df, number_fields, warnings, source_df=df)
+                profiler.add_rows(
+                    _insert_zip_layer(self, layer_id, header, rows_df, number_fields, warnings, source_df=df)
+                )
             else:
                 previous_nodes = _insert_node_layer(self, layer_id, header, rows_df)
+                profiler.add_rows(len(previous_nodes))
 
             previous_header = header
 
         self.db.flush()
 
-        _set_import_step(self, upload, "Computing geometry")
+        node_count = self.db.execute(
+            select(func.count(NodeModel.id)).join(LayerModel).where(LayerModel.map_id == map_id)
+        ).scalar_one()
+
+        _set_import_step(self, upload, "Computing geometry", profiler)
+        profiler.add_rows(node_count)
         computation = ComputationService(db=self.db)
         computation.recompute_all_layers(map_id)
         all_layer_ids = set(self.db.execute(select(LayerModel.id).where(LayerModel.map_id == map_id)).scalars().all())
@@ -361,11 +469,16 @@ def import_map_task(self: DatabaseTask, map_id: str) -> None:  # type: ignore[mi
             map_model.tile_version += 1
             self.db.flush()
 
-        _set_import_step(self, upload, "Computing data")
-        computation.compute_data_for_map(map_id)
+        _set_import_step(self, upload, "Computing data", profiler)
+        profiler.add_rows(node_count)
+        # zip_assignments were committed by _set_import_step, so wide data configs
+        # can be rolled up on a few extra pooled connections.
+        computation.compute_data_for_map(map_id, max_connections=4)
 
+        profiler.finish()
         upload.status = "complete"
         upload.import_step = None
+        upload.import_profile = profiler.stages
         upload.warnings = list(dict.fromkeys(warnings))[:100]
         self.db.commit()
         logger.info("import_map_task [%s]: complete", map_id)
@@ -375,21 +488,25 @@ def import_map_task(self: DatabaseTask, map_id: str) -> None:  # type: ignore[mi
         # If the DB aborted the transaction (e.g. unique constraint violation), the
         # session is deactivated and must be rolled back before we can write anything.
         self.db.rollback()
+        profiler.finish()
         upload.status = "failed"
         upload.import_step = None
+        upload.import_profile = profiler.stages
         upload.error = type(exc).__name__
         upload.error_reason = str(exc)
         self.db.commit()
         raise
+    finally:
+        profiler.close()
 
 
 @celery_app.task(base=DatabaseTask, bind=True, queue="terramaps")
 def warm_map_mvt_cache_task(self: DatabaseTask, map_id: str) -> None:  # type: ignore[misc]
     """Pre-warm the MVT tile cache for all layers in a map at z3–z7.
 
-    Assumes the cache has already been cleared for this map. Renders every
-    tile in the continental US bbox per layer and batches inserts in groups
-    of 50 to keep transactions small.
+    Renders every tile in the continental US bbox per layer, replacing cached
+    tiles from older generations, and batches inserts in groups of 50 to keep
+    transactions small.
     """
     map_model = self.db.get(MapModel, map_id)
     if not map_model:
@@ -412,13 +529,23 @@ def warm_map_mvt_cache_task(self: DatabaseTask, map_id: str) -> None:  # type: i
         len(layers) * len(tiles),
     )
 
+    # Read before rendering, so tiles rendered across a recompute commit are stamped stale.
+    generation = map_model.tile_version
     t0 = time.monotonic()
     for layer in layers:
         layer_t0 = time.monotonic()
         batch: list[dict[str, Any]] = []
         for z, x, y in tiles:
             tile_bytes = mvt_service.render_tile(self.db, layer, map_model, z, x, y)
-            batch.append({"layer_id": layer.id, "endpoint": "fill", "z": z, "x": x, "y": y, "tile_bytes": tile_bytes})
+            batch.append({
+                "layer_id": layer.id,
+                "endpoint": "fill",
+                "z": z,
+                "x": x,
+                "y": y,
+                "tile_bytes": tile_bytes,
+                "generation": generation,
+            })
             if len(batch) >= 50:
                 mvt_cache.save_tiles_batch(self.db, batch)
                 self.db.commit()
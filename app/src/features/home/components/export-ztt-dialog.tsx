@@ -15,6 +15,25 @@ import type { components } from "@/lib/api/v1"
 
 type Layer = components["schemas"]["Layer"]
 
+interface ZttExportStatus {
+  id: string
+  status: "generating" | "complete" | "failed"
+  url: string | null
+  filename: string | null
+  error: string | null
+}
+
+async function fetchZttStatus(
+  url: string,
+  init: RequestInit,
+): Promise<ZttExportStatus> {
+  const response = await fetch(url, init)
+  if (!response.ok) {
+    throw new Error(`Export failed (${response.status.toString()})`)
+  }
+  return (await response.json()) as ZttExportStatus
+}
+
 interface ExportZttDialogProps {
   open: boolean
   onOpenChange: (open: boolean) => void
@@ -39,22 +58,34 @@ export function ExportZttDialog({
     setIsExporting(true)
     setError(null)
     try {
-      const baseUrl = config.get("api_base_url")
-      const response = await fetch(`${baseUrl}/maps/${mapId}/export/ztt`, {
-        credentials: "include",
-      })
-      if (!response.ok) {
-        throw new Error(`Export failed (${response.status})`)
+      const base = config.get("api_base_url")
+      // The file is built by a worker and cached per map state, so an
+      // unchanged map comes back complete on the first request.
+      const POLL_INTERVAL_MS = 1500
+
+      let status = await fetchZttStatus(
+        `${base}/maps/${mapId}/exports/ztt?format=xlsx`,
+        { method: "POST", credentials: "include" },
+      )
+      while (status.status === "generating") {
+        await new Promise((r) => setTimeout(r, POLL_INTERVAL_MS))
+        status = await fetchZttStatus(
+          `${base}/maps/${mapId}/exports/ztt/${status.id}`,
+          { credentials: "include" },
+        )
       }
-      const blob = await response.blob()
-      const url = URL.createObjectURL(blob)
+      if (status.status === "failed" || !status.url) {
+        throw new Error(status.error ?? "Export failed.")
+      }
+
       const anchor = document.createElement("a")
-      anchor.href = url
-      anchor.download = `${mapName.replace(/\s+/g, "_").toLowerCase()}_ztt.xlsx`
+      anchor.href = status.url
+      anchor.download =
+        status.filename ??
+        `${mapName.replace(/\s+/g, "_").toLowerCase()}_ztt.xlsx`
       document.body.appendChild(anchor)
       anchor.click()
       document.body.removeChild(anchor)
-      URL.revokeObjectURL(url)
       onOpenChange(false)
     } catch (err) {
       setError(err instanceof Error ? err.message : "Something went wrong.")
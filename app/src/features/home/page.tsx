@@ -973,7 +973,11 @@ function HomePageContent() {
               onLassoComplete={(geojson, additive) => {
                 if (activeLayerId != null) {
                   spatialSelectMutation.mutate(
-                    { lasso: geojson, layerId: activeLayerId },
+                    {
+                      lasso: geojson,
+                      layerId: activeLayerId,
+                      zoom: mapRef.current?.getMap().getZoom(),
+                    },
                     {
                       onSuccess: (response) => {
                         if (!mapRef.current) return
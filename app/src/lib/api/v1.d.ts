@@ -1733,6 +1733,8 @@ export interface components {
             /** Layer Id */
             layer_id: number;
             polygon: components["schemas"]["Polygon"];
+            /** Zoom */
+            zoom?: number | null;
         };
         /** SpatialSelectResponse */
         SpatialSelectResponse: {
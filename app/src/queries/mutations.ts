@@ -519,12 +519,17 @@ export const useRemoveMapMemberMutation = () => {
 
 export const useSpatialSelectMutation = () => {
   return useMutation({
-    mutationFn: async (vars: { layerId: number; lasso: Polygon }) => {
+    mutationFn: async (vars: {
+      layerId: number
+      lasso: Polygon
+      zoom?: number
+    }) => {
       const response = await fetchClient.POST("/spatial/select", {
         body: {
           layer_id: vars.layerId,
           polygon:
             vars.lasso as components["schemas"]["SpatialSelectRequest"]["polygon"],
+          zoom: vars.zoom,
         },
       })
       if (response.response.status !== 200 || !response.data) {